@@ -1,31 +1,52 @@
 #!/usr/bin/env python3
 """
-Req3 — Move oldest closed PCAP from ring -> dest (export drive or backlog).
-- Export-aware: if drive is mounted, moves to drive; else moves to backlog.
+Req3 — Move oldest closed PCAPs from ring -> dest (export drive or backlog).
+- One os.scandir pass per run (the DirEntry stat is reused for age, size and ordering); in batch mode
+  (mover_batch, default on) every file needed to get back under buffer_threshold moves in the same run
+- Export-aware: if a drive is mounted, each file goes to the best one (seer_drives.py, detected once per
+  run); else to backlog. Files are moved grouped by destination.
+- Moves go through seer_copy.transfer_file, the exporter's engine: onto a drive that is a streaming
+  copy + sha256 + fsync + verify re-read + rename before the ring file is removed (resumable .part),
+  recorded in the drive's index and in the same MANIFEST.txt / MERKLE.json / TRANSFER.LOG the exporter
+  writes (seer_manifest.py); a file that fails to copy or verify goes to backlog in the same run
+- Copies run in the idle I/O class, paced to the SSD bandwidth capture leaves spare (seer_io.py, io.*).
 - "Closed" = file mtime older than QUIET_SECS (not being written).
-- Writes a simple log line to mover_log.
+- Writes one summary line per run to mover_log (plus one per failed file, and a [verified] line with
+  sha256/bytes per drive copy).
+- detect/select/move spans (and seer_copy's copy/hash) accumulate across runs in PERF_DIR/mover.json
+  (seer_perf.py); --profile per run.
 """
 
+import argparse
 import os
-import shutil
 import time
-from datetime import datetime
 from pathlib import Path
 
-import yaml
-
-CFG = yaml.safe_load(open("/opt/seer/etc/seer.yml"))
+import seer_config
+import seer_io
+import seer_perf as perf
+from seer_backlog import capture_day
+from seer_copy import DriveIndex, transfer_file
+from seer_drives import DriveInventory, DriveSelector
+from seer_manifest import transfer_log_entry, write_records
+from seer_perf import span
+
+CONFIG_PATH = os.environ.get("SEER_CONFIG", "/opt/seer/etc/seer.yml")
+CFG = seer_config.load(CONFIG_PATH)
 RING = Path(CFG["ring_dir"])
 BACKLOG = Path(CFG.get("backlog_dir", "/opt/seer/var/backlog"))
 THRESH = int(CFG["buffer_threshold"])
 LOGPATH = Path(CFG["mover_log"])
 QUIET_SECS = 3  # consider file closed if not touched for >= 3s
 
-# Export drive candidates (in priority order)
+# Export drive candidates (all usable ones are considered)
 MOUNT_CANDIDATES = CFG.get("export", {}).get(
     "mount_candidates", ["/mnt/seer_external", "/mnt/SEER_EXT", "/media/seer_external"]
 )
 MIN_FREE_PCT = CFG.get("export", {}).get("min_free_pct", 2)
+# Also any mount under these roots whose volume label matches (Req 4)
+DISCOVER_ROOTS = CFG.get("export", {}).get("discover_roots", ["/mnt", "/media"])
+LABEL_PATTERNS = CFG.get("export", {}).get("label_patterns", ["SEER", "EXT"])
 
 
 def log(msg: str):
@@ -35,85 +56,195 @@ def log(msg: str):
         f.write(f"{ts} {msg}\n")
 
 
-def detect_export_drive():
+def detect_export_selector():
     """
-    Detect writable export drive with sufficient space.
-    Returns (mount_path, dest_pcap_dir) or (None, None).
+    All writable export candidates with space (configured mounts plus SEER/EXT-labelled mounts
+    under /mnt or /media), weighted by measured write throughput and free headroom; see
+    seer_drives.py. Returns a DriveSelector, or None when no drive is usable.
     """
-    for candidate in MOUNT_CANDIDATES:
-        if not os.path.ismount(candidate):
-            continue
-        if not os.access(candidate, os.W_OK):
-            continue
-
-        try:
-            stat = os.statvfs(candidate)
-            free_bytes = stat.f_bavail * stat.f_frsize
-            total_bytes = stat.f_blocks * stat.f_frsize
-            free_pct = (free_bytes / total_bytes * 100) if total_bytes > 0 else 0
-
-            if free_pct >= MIN_FREE_PCT:
-                # Use dated subdirectory on drive
-                date_dir = datetime.now().strftime("%Y%m%d")
-                pcap_dir = Path(candidate) / "pcap" / date_dir
-                return (candidate, pcap_dir)
-        except Exception:
-            continue
-
-    return (None, None)
+    with span("detect"):
+        inventory = DriveInventory()
+        candidates = inventory.candidates(MOUNT_CANDIDATES, DISCOVER_ROOTS, LABEL_PATTERNS)
+        selector = DriveSelector.detect(candidates, MIN_FREE_PCT, inventory=inventory)
+    return selector if selector.mounts() else None
+
+
+def scan_ring():
+    """One os.scandir pass over RING: [(mtime, size, name)] of its *.pcap files, oldest first."""
+    files = []
+    with os.scandir(RING) as it:
+        for entry in it:
+            if not entry.name.endswith(".pcap"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()  # cached on the DirEntry; the only stat() per file this run
+            except FileNotFoundError:
+                continue  # rotated away mid-scan
+            files.append((st.st_mtime, st.st_size, entry.name))
+    files.sort()
+    return files
+
+
+def eviction_set(files, now, batch=True):
+    """
+    The oldest closed files (mtime at least QUIET_SECS ago) that bring the ring back under the
+    threshold; only the oldest one when not batching. Empty below the threshold.
+    """
+    excess = len(files) - THRESH + 1
+    if excess <= 0:
+        return []
+    evict = [f for f in files if now - f[0] >= QUIET_SECS]
+    return evict[: excess if batch else 1]
 
 
-def closed(p: Path) -> bool:
+def plan(evict, selector):
+    """
+    Group the files by destination: {(route, dest_dir, mount): [(name, size)]}. Each file reserves
+    its bytes on the best drive (selector.pick); files no drive has room for go to the backlog.
+    """
+    groups = {}
+    with span("select"):
+        for mtime, size, name in evict:
+            mount = selector.pick(size) if selector else None
+            if mount:
+                # Same pcap/<capture day> as the exporter, so either one finds the other's copy
+                key = (f"export({mount})", Path(mount) / "pcap" / capture_day(name, mtime), mount)
+            else:
+                key = ("backlog", BACKLOG, None)
+            groups.setdefault(key, []).append((name, size))
+    return groups
+
+
+def move_group(route, dest_dir, mount, files, selector, shaper=None):
+    """
+    Move one destination's files with seer_copy.transfer_file: a rename on the same filesystem,
+    otherwise copy + hash + fsync + verify + rename before the source is removed (drive copies
+    also go into the drive's index, so the exporter recognises them without hashing them again).
+    On a drive the group's bookkeeping is written as the exporter writes it (seer_manifest.py):
+    dest_dir's MANIFEST.txt and MERKLE.json, and a TRANSFER.LOG line per file.
+    shaper (seer_io.Shaper) paces cross-filesystem copies.
+    Returns (moved [(name, size, dst, sha256)], failed [(name, size)] for the backlog fallback).
+    """
+    moved, failed, transfers = [], [], []
+    index = DriveIndex(mount) if mount else None
     try:
-        age = time.time() - p.stat().st_mtime
-        return age >= QUIET_SECS
+        same_fs = os.stat(RING).st_dev == os.stat(dest_dir).st_dev
     except FileNotFoundError:
-        return False
-
-
-def pick_oldest_closed():
-    files = [p for p in RING.glob("*.pcap") if p.is_file()]
-    files.sort(key=lambda p: p.stat().st_mtime)
-    for p in files:
-        if closed(p):
-            return p
-    return None
-
-
-def main():
+        same_fs = False  # transfer_file creates dest_dir
+    for name, size in files:
+        t0 = time.monotonic()
+        waited = shaper.waited() if shaper else 0.0
+        with span("move"):
+            result, sha, dst, error = transfer_file(
+                str(RING / name), str(dest_dir), verify=bool(mount), index=index, shaper=shaper
+            )
+        if mount:
+            transfers.append(transfer_log_entry(str(RING / name), dst, size, sha, result))
+        if result in ("OK", "SKIP_EXISTS"):
+            moved.append((name, size, dst, sha))
+            if selector and mount:
+                # Feed the copy time into the drive's throughput estimate shared with the exporter
+                seconds = None
+                if result == "OK" and not same_fs:
+                    seconds = time.monotonic() - t0 - ((shaper.waited() if shaper else 0.0) - waited)
+                selector.done(mount, size, seconds, written=result == "OK")
+            continue
+        log(f"[error] move {name} -> {route}: {result} {error}")
+        if selector and mount:
+            selector.done(mount, size, written=False)
+        if mount and os.path.exists(RING / name):
+            failed.append((name, size))
+    if transfers:
+        with span("manifest"):
+            manifest = [(os.path.basename(dst), sha) for _name, _size, dst, sha in moved]
+            trees = {os.path.basename(dst): index.pop_tree(dst) for _name, _size, dst, _sha in moved}
+            trees = {name: leaves for name, leaves in trees.items() if leaves is not None}
+            manifests = {str(dest_dir): manifest} if manifest else {}
+            for where in write_records(manifests, {str(dest_dir): trees}, {mount: transfers}):
+                log(f"[error] bookkeeping in {where} not written (see the journal)")
+    return moved, failed
+
+
+def main(batch=None):
+    """
+    One timer tick. Batch mode (mover_batch, default on) moves every file needed to get the ring
+    back under buffer_threshold in this run, grouped by destination, and logs one summary line;
+    otherwise only the oldest closed file moves, as before. A file that fails to copy or verify
+    onto a drive goes to the backlog in the same run (Req 3a).
+    """
+    if batch is None:
+        batch = bool(CFG.get("mover_batch", True))
     RING.mkdir(parents=True, exist_ok=True)
     BACKLOG.mkdir(parents=True, exist_ok=True)
 
-    files = [p for p in RING.glob("*.pcap") if p.is_file()]
+    files = scan_ring()
     count = len(files)
     if count < THRESH:
         log(f"[noop] ring has {count} files (< threshold {THRESH})")
         return
 
-    target = pick_oldest_closed()
-    if not target:
+    evict = eviction_set(files, time.time(), batch)
+    if not evict:
         log("[noop] no closed file to move")
         return
 
-    # Determine destination: export drive (if present) or backlog
-    drive_mount, drive_dest = detect_export_drive()
+    # Drives are detected once per run, however many files move
+    selector = detect_export_selector()
+    shaper, _desc = seer_io.configure(CFG, RING)
+    groups = plan(evict, selector)
+
+    t0 = time.monotonic()
+    parts = []
+    moved_all = []
+    fallback = []
+    for (route, dest_dir, mount), group in groups.items():
+        moved, failed = move_group(route, dest_dir, mount, group, selector, shaper)
+        moved_all += [(route, *m) for m in moved]
+        fallback += failed
+        if moved:
+            parts.append(f"{len(moved)} -> {route} ({dest_dir})")
+    if fallback:
+        moved, _failed = move_group("backlog", BACKLOG, None, fallback, None, shaper)
+        moved_all += [("backlog", *m) for m in moved]
+        if moved:
+            parts.append(f"{len(moved)} -> backlog after drive errors ({BACKLOG})")
+    if selector:
+        selector.save()
+    if not moved_all:
+        return
 
-    if drive_dest:
-        # Drive is present: move directly to drive
-        drive_dest.mkdir(parents=True, exist_ok=True)
-        dest_path = drive_dest / target.name
-        route = f"export({drive_mount})"
-    else:
-        # No drive: move to backlog
-        dest_path = BACKLOG / target.name
-        route = "backlog"
+    def detail(sha, size):
+        return f" sha256={sha} bytes={size}" if sha else ""
 
-    try:
-        shutil.move(str(target), str(dest_path))
-        log(f"[moved] {target.name} -> {route} ({dest_path})")
-    except Exception as e:
-        log(f"[error] move {target.name} -> {route}: {e}")
+    if len(evict) == 1:
+        route, name, size, dst, sha = moved_all[0]
+        log(f"[moved] {name} -> {route} ({dst}){detail(sha, size)}")
+        return
+    total_bytes = sum(m[2] for m in moved_all)
+    throttled = f", throttled {shaper.throttled:.1f}s" if shaper and shaper.throttled >= 0.1 else ""
+    log(
+        f"[moved] {len(moved_all)} files, {total_bytes} bytes in {time.monotonic() - t0:.1f}s{throttled}: "
+        f"{', '.join(parts)}; ring {count} -> {count - len(moved_all)} (threshold {THRESH}), oldest {evict[0][2]}"
+    )
+    # Checksums of verified copies, for the exporter and whoever audits the drive
+    for route, name, size, dst, sha in moved_all:
+        if sha:
+            log(f"[verified] {name} -> {dst}{detail(sha, size)}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Move the oldest closed PCAPs out of the ring")
+    parser.add_argument("--profile", action="store_true", help=f"Write cProfile/tracemalloc dumps to {perf.PERF_DIR}")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", dest="batch", action="store_true", default=None, help="Drain to under threshold")
+    mode.add_argument("--single", dest="batch", action="store_false", help="Move only the oldest closed file")
+    args = parser.parse_args()
+    if args.profile:
+        perf.start_profile("mover")
+    try:
+        main(args.batch)
+    finally:
+        perf.merge_into(os.path.join(perf.PERF_DIR, "mover.json"))
+        perf.dump_profile()
@@ -0,0 +1,771 @@
+"""
+SEER backlog manager — keeps backlog_dir within budget while no export drive takes the PCAPs
+- DirIndex: a PCAP directory held in memory (name -> size/mtime, running byte total), kept current
+  by inotify after one scan; shared with seer_metrics.py, which indexes the ring the same way
+- Budget: backlog_max_bytes (0 = unlimited) and capture.disk_hard_pct of the backlog filesystem
+- Over budget, oldest first, backlog_policy decides: drop | downsample (rewrite to backlog_snaplen,
+  headers only) | compress (gzip -> .pcap.gz); once every file is reduced, the oldest are dropped
+- Rewrites run in a pool of niced processes sized by backlog_cpu_budget (fraction of the cores);
+  downsampling mmaps each file and writes it in one pass (vectorised with NumPy when installed)
+- Optional coalescing (backlog_coalesce_seconds, e.g. 3600): closed PCAPs of one finished time
+  bucket are concatenated into one <first>.seg.pcap (record data streamed past the duplicate global
+  headers), with a <segment>.idx JSON sub-index of the original files' boundaries; export then
+  does fewer, larger writes and drive directories stay small
+- Every decision is appended to <backlog_dir>/TRANSFER.LOG (JSON lines, like a drive's TRANSFER.LOG)
+"""
+
+import ctypes
+import errno
+import gzip
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+from seer_perf import Histogram
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # optional: vectorised truncate_pcap, the stdlib path gives the same bytes
+    np = None
+
+# inotify(7)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+DIR_EVENTS = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+EVENT_HDR = struct.Struct("iIII")
+
+POLICIES = ("drop", "downsample", "compress")
+HEADERS_SNAPLEN = 68  # Ethernet + IPv4 + TCP with options
+HYSTERESIS = 0.02  # free this fraction of the limit beyond the overshoot, so each file doesn't re-trigger
+GZIP_LEVEL = 6
+REWRITE_WINDOW = 16 * 1024 * 1024  # output bytes per vectorised batch in truncate_pcap (bounds its scratch arrays)
+WRITE_BUFFER = 1024 * 1024
+STOP_POLL = 0.2  # seconds between stop checks while a rewrite batch runs
+CPU_BUDGET = 0.5  # default backlog_cpu_budget: share of the cores the rewrite pool may use
+WORKER_NICE = 10  # rewrite workers yield the CPU to capture, Zeek and the exporter
+PCAP_HDR_LEN = 24
+SEGMENT_TAG = ".seg"  # coalesced segments: <first file's stem>.seg.pcap
+INDEX_SUFFIX = ".idx"  # segment sub-index, next to it and exported with it
+COALESCE_GRACE = 120  # seconds a file (and its bucket) must be quiet before it is merged
+NAME_TS = re.compile(r"(\d{8}-\d{6})")  # tcpdump -G names: SEER-YYYYmmdd-HHMMSS.pcap
+# Magic as read little-endian -> byte order of the file (usec and nsec variants)
+PCAP_ENDIAN = {0xA1B2C3D4: "<", 0xA1B23C4D: "<", 0xD4C3B2A1: ">", 0x4D3CB2A1: ">"}
+PCAP_NSEC = (0xA1B23C4D, 0x4D3CB2A1)
+
+
+class Inotify:
+    """Minimal inotify(7) binding (ctypes); raises OSError where unavailable."""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch {path}: {os.strerror(err)}")
+        return wd
+
+    def read(self):
+        """Pending events as (wd, mask, name); [] when none."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        out = []
+        off = 0
+        while off + EVENT_HDR.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HDR.unpack_from(data, off)
+            off += EVENT_HDR.size
+            name = data[off : off + length].rstrip(b"\0").decode(errors="replace")
+            off += length
+            out.append((wd, mask, name))
+        return out
+
+
+class DirIndex:
+    """
+    The *.pcap* files of one directory as name -> [size, mtime] plus their byte total, kept current
+    from inotify events. Files still being written (created, not yet closed) are in `open` and
+    stat'ed only when totals are read. `evictions`/`lag` count files leaving (lag = time since close).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.files = {}
+        self.bytes = 0
+        self.open = set()
+        self.wd = None
+        self.evictions = 0
+        self.lag = Histogram()
+
+    @staticmethod
+    def wanted(name):
+        leftovers = (".tmp", ".part", ".progress", INDEX_SUFFIX)  # temp files, partial copies, sub-indexes
+        return ".pcap" in name and not name.startswith(".") and not name.endswith(leftovers)
+
+    def rescan(self):
+        files = {}
+        try:
+            with os.scandir(self.path) as it:
+                for e in it:
+                    if self.wanted(e.name) and e.is_file(follow_symlinks=False):
+                        st = e.stat(follow_symlinks=False)
+                        files[e.name] = [st.st_size, st.st_mtime]
+        except FileNotFoundError:
+            pass
+        self.files = files
+        self.bytes = sum(e[0] for e in files.values())
+        self.open &= set(files)
+
+    def watch(self, inotify):
+        """Start watching (once the directory exists); True when watched. Rescans right after the watch."""
+        if self.wd is None:
+            try:
+                self.wd = inotify.add_watch(self.path, DIR_EVENTS)
+            except OSError as e:
+                if e.errno == errno.ENOENT:
+                    return False
+                raise
+            self.rescan()  # after the watch is in place, so nothing falls between
+        return True
+
+    def _set(self, name, size, mtime):
+        old = self.files.get(name)
+        self.bytes += size - (old[0] if old else 0)
+        self.files[name] = [size, mtime]
+
+    def remove(self, name):
+        self.open.discard(name)
+        entry = self.files.pop(name, None)
+        if entry is not None:
+            self.bytes -= entry[0]
+        return entry
+
+    def update(self, name):
+        try:
+            st = os.stat(self.path / name)
+        except FileNotFoundError:
+            self.remove(name)
+            return
+        self._set(name, st.st_size, st.st_mtime)
+
+    def event(self, mask, name, now):
+        if mask & IN_ISDIR or not self.wanted(name):
+            return
+        if mask & IN_CREATE:
+            if name not in self.files:
+                self._set(name, 0, now)
+            self.open.add(name)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self.open.discard(name)
+            self.update(name)
+        elif mask & IN_ATTRIB:
+            if name in self.files and name not in self.open:
+                self.update(name)  # e.g. copy2 restoring the original mtime after the copy
+        elif mask & (IN_MOVED_FROM | IN_DELETE):
+            entry = self.remove(name)
+            if entry is not None:
+                self.evictions += 1
+                self.lag.observe(max(0.0, now - entry[1]))
+
+    def totals(self):
+        """(files, bytes, oldest mtime or None); open files are stat'ed for their current size."""
+        for name in list(self.open):
+            self.update(name)
+        if not self.files:
+            return (0, 0, None)
+        return (len(self.files), self.bytes, min(e[1] for e in self.files.values()))
+
+    def oldest_first(self):
+        return sorted(self.files, key=lambda name: self.files[name][1])
+
+
+def pcap_snaplen(path):
+    """Snaplen from the pcap file header, or None if it isn't a classic pcap."""
+    try:
+        with open(path, "rb") as f:
+            hdr = f.read(PCAP_HDR_LEN)
+    except OSError:
+        return None
+    if len(hdr) < PCAP_HDR_LEN:
+        return None
+    endian = PCAP_ENDIAN.get(struct.unpack_from("<I", hdr)[0])
+    return struct.unpack_from(endian + "I", hdr, 16)[0] if endian else None
+
+
+def _record_offsets(mm, endian):
+    """Offsets of the complete records after the global header (array 'q'); a cut-off last record is left out."""
+    caplen_at = struct.Struct(endian + "I").unpack_from
+    offs = array("q")
+    append = offs.append
+    end = len(mm)
+    off = PCAP_HDR_LEN
+    while off + 16 <= end:
+        nxt = off + 16 + caplen_at(mm, off + 8)[0]
+        if nxt > end:
+            break
+        append(off)
+        off = nxt
+    return offs
+
+
+def _truncate_numpy(mm, endian, snaplen, fout):
+    """
+    Record headers are walked once with struct (each offset depends on the previous caplen); the
+    copying is vectorised per batch: the first 16 + snaplen bytes of every record are gathered as
+    rows of a sliding-window view (no index arrays), the new caplens written into the header
+    columns, and each row masked to 16 + keep. Only kept bytes are touched, so the cost follows the
+    output size, not the input.
+    """
+    data = np.frombuffer(mm, dtype=np.uint8)
+    offs = np.frombuffer(_record_offsets(mm, endian), dtype=np.int64)
+    caplen_dtype = np.dtype(endian + "u4")
+    width = np.arange(16 + snaplen)
+    windows = sliding_window_view(data, len(width)) if len(data) >= len(width) else data[:0].reshape(0, len(width))
+    rows = max(1, REWRITE_WINDOW // len(width))
+    for i in range(0, len(offs), rows):
+        starts = offs[i : i + rows]
+        full = int(np.searchsorted(starts, len(windows), side="left"))
+        recs = np.zeros((len(starts), len(width)), dtype=np.uint8)
+        recs[:full] = windows[starts[:full]]
+        for r, off in enumerate(starts[full:].tolist(), full):  # the last few records, within a row of EOF
+            tail = mm[off : off + len(width)]
+            recs[r, : len(tail)] = np.frombuffer(tail, dtype=np.uint8)
+        caplen = np.ascontiguousarray(recs[:, 8:12]).view(caplen_dtype).ravel()
+        keep = np.minimum(caplen, snaplen).astype(caplen_dtype)
+        recs[:, 8:12] = keep.view(np.uint8).reshape(-1, 4)
+        fout.write(recs[width < (16 + keep.astype(np.int64))[:, None]].data)
+
+
+def _truncate_stdlib(mm, endian, snaplen, fout):
+    """Same output as _truncate_numpy; runs of records already within snaplen go out as one slice."""
+    rec = struct.Struct(endian + "IIII")
+    unpack_from, pack = rec.unpack_from, rec.pack
+    end = len(mm)
+    off = run = PCAP_HDR_LEN
+    with memoryview(mm) as view:
+        while off + 16 <= end:
+            sec, frac, caplen, wire = unpack_from(mm, off)
+            body = off + 16
+            if body + caplen > end:
+                break
+            if caplen > snaplen:
+                if run < off:
+                    fout.write(view[run:off])
+                fout.write(pack(sec, frac, snaplen, wire))
+                fout.write(view[body : body + snaplen])
+                run = body + caplen
+            off = body + caplen
+        if run < off:
+            fout.write(view[run:off])
+
+
+def truncate_pcap(src, dst, snaplen, backend=None):
+    """
+    Rewrite src to dst keeping at most `snaplen` bytes of each packet (original lengths are kept,
+    so tools still see the wire size). A truncated last record (cut-off capture) is dropped.
+    The input is mmap'ed and written in one buffered pass; backend "numpy" (default when installed)
+    or "stdlib".
+    """
+    backend = backend or ("numpy" if np is not None else "stdlib")
+    rewrite = {"numpy": _truncate_numpy, "stdlib": _truncate_stdlib}[backend]
+    with open(src, "rb") as fin:
+        hdr = fin.read(PCAP_HDR_LEN)
+        endian = PCAP_ENDIAN.get(struct.unpack_from("<I", hdr)[0]) if len(hdr) == PCAP_HDR_LEN else None
+        if endian is None:
+            raise ValueError(f"{src}: not a pcap file")
+        with (
+            mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+            open(dst, "wb", buffering=WRITE_BUFFER) as fout,
+        ):
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            fout.write(hdr[:16] + struct.pack(endian + "I", snaplen) + hdr[20:])
+            rewrite(mm, endian, snaplen, fout)
+            fout.flush()
+            os.fsync(fout.fileno())
+
+
+def sidecar(name):
+    """Sub-index file of a segment (compressed or not)."""
+    return name.removesuffix(".gz") + INDEX_SUFFIX
+
+
+def capture_start(name, mtime):
+    """Capture start from a tcpdump -G name (local time), else the file's mtime."""
+    m = NAME_TS.search(name)
+    if m:
+        try:
+            return datetime.strptime(m.group(1), "%Y%m%d-%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return mtime
+
+
+def capture_day(name, mtime):
+    """YYYYmmdd of capture_start(): the pcap/<day>/ directory the file goes to on an export drive."""
+    return datetime.fromtimestamp(capture_start(name, mtime)).strftime("%Y%m%d")
+
+
+def pcap_header_key(path):
+    """What pcaps must share to be concatenated (magic, version, link type), or None if not a pcap."""
+    try:
+        with open(path, "rb") as f:
+            hdr = f.read(PCAP_HDR_LEN)
+    except OSError:
+        return None
+    if len(hdr) < PCAP_HDR_LEN or struct.unpack_from("<I", hdr)[0] not in PCAP_ENDIAN:
+        return None
+    return hdr[:8] + hdr[20:]
+
+
+def merge_pcaps(srcs, dst, stop=None):
+    """
+    Concatenate pcaps sharing a pcap_header_key into dst behind one global header (snaplen: the
+    largest), streaming each file's records in one write; cut-off last records are left out.
+    Returns the sub-index: per source {name, offset, bytes, packet, packets, first_ts, last_ts}
+    (offset/bytes of its records within dst, packet = index of its first packet in dst).
+    Raises InterruptedError between sources once `stop` (an Event) is set.
+    """
+    files, key, snaplen = [], None, 0
+    try:
+        for src in srcs:
+            f = open(src, "rb")
+            files.append(f)
+            hdr = f.read(PCAP_HDR_LEN)
+            if len(hdr) < PCAP_HDR_LEN or (key is not None and hdr[:8] + hdr[20:] != key):
+                raise ValueError(f"{src}: not a pcap matching {srcs[0]}")
+            key = hdr[:8] + hdr[20:]
+            snaplen = max(snaplen, struct.unpack_from(PCAP_ENDIAN[struct.unpack_from("<I", hdr)[0]] + "I", hdr, 16)[0])
+        magic = struct.unpack_from("<I", key)[0]
+        endian = PCAP_ENDIAN[magic]
+        tick = 1e9 if magic in PCAP_NSEC else 1e6
+        ts_at = struct.Struct(endian + "II").unpack_from
+        subindex = []
+        offset, packet = PCAP_HDR_LEN, 0
+        with open(dst, "wb", buffering=WRITE_BUFFER) as fout:
+            fout.write(key[:8] + bytes(8) + struct.pack(endian + "I", snaplen) + key[8:])
+            for src, f in zip(srcs, files):
+                if stop is not None and stop.is_set():
+                    raise InterruptedError(f"{dst}: stopped")
+                entry = {"name": os.path.basename(src), "offset": offset, "bytes": 0, "packet": packet, "packets": 0}
+                entry.update(first_ts=None, last_ts=None)
+                if os.fstat(f.fileno()).st_size > PCAP_HDR_LEN:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        offs = _record_offsets(mm, endian)
+                        if offs:
+                            last = offs[-1]
+                            end = last + 16 + struct.unpack_from(endian + "I", mm, last + 8)[0]
+                            with memoryview(mm) as view:
+                                fout.write(view[PCAP_HDR_LEN:end])
+                            (sec, frac), (last_sec, last_frac) = ts_at(mm, offs[0]), ts_at(mm, last)
+                            entry.update(
+                                bytes=end - PCAP_HDR_LEN,
+                                packets=len(offs),
+                                first_ts=sec + frac / tick,
+                                last_ts=last_sec + last_frac / tick,
+                            )
+                subindex.append(entry)
+                offset += entry["bytes"]
+                packet += entry["packets"]
+            fout.flush()
+            os.fsync(fout.fileno())
+    finally:
+        for f in files:
+            f.close()
+    return subindex
+
+
+def reindex_segment(path, subindex):
+    """Recompute a sub-index's offsets/bytes after the segment was rewritten (packet numbers hold)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        endian = PCAP_ENDIAN[struct.unpack_from("<I", mm)[0]]
+        offs = _record_offsets(mm, endian)
+        ends = list(offs[1:]) + [len(mm)]
+    for e in subindex:
+        if e["packets"]:
+            e["offset"] = offs[e["packet"]]
+            e["bytes"] = ends[e["packet"] + e["packets"] - 1] - e["offset"]
+    return subindex
+
+
+def _write_json(path, data, mtime_ns=None):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    if mtime_ns is not None:
+        os.utime(tmp, ns=(mtime_ns, mtime_ns))
+    os.replace(tmp, path)
+
+
+def gzip_file(src, dst):
+    with open(src, "rb") as fin, gzip.open(dst, "wb", compresslevel=GZIP_LEVEL) as fout:
+        shutil.copyfileobj(fin, fout, 1024 * 1024)
+    with open(dst, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def rewrite_file(action, src, dst, snaplen):
+    """One compress/downsample rewrite to dst, keeping src's times (capture age orders the backlog)."""
+    if action == "compress":
+        gzip_file(src, dst)
+    else:
+        truncate_pcap(src, dst, snaplen)
+    st = os.stat(src)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def pool_workers(cpu_budget):
+    """Rewrite processes for a CPU budget given as a fraction of the cores (at least one)."""
+    return max(1, int((os.cpu_count() or 1) * cpu_budget))
+
+
+def _worker_init():
+    os.nice(WORKER_NICE)
+
+
+def _stopped(stop):
+    return stop is not None and stop.is_set()
+
+
+def _kill_pool(pool):
+    """Shut the rewrite pool down without waiting: queued rewrites are cancelled, running ones killed."""
+    procs = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proc in procs:
+        proc.terminate()
+
+
+class BacklogManager:
+    """Enforces the backlog budget from an in-memory DirIndex (see module docstring)."""
+
+    def __init__(
+        self,
+        backlog_dir,
+        max_bytes=0,
+        hard_pct=90,
+        policy="drop",
+        snaplen=HEADERS_SNAPLEN,
+        cpu_budget=CPU_BUDGET,
+        segment_seconds=0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"backlog_policy must be one of {', '.join(POLICIES)}, not {policy!r}")
+        self.index = DirIndex(backlog_dir)
+        self.max_bytes = int(max_bytes or 0)
+        self.hard_pct = hard_pct
+        self.policy = policy
+        self.snaplen = int(snaplen)
+        self.workers = pool_workers(float(cpu_budget))
+        self.segment_seconds = int(segment_seconds or 0)
+        self.log_path = self.index.path / "TRANSFER.LOG"
+        self._clean_tmp()
+        try:
+            self.inotify = Inotify()
+            self.index.watch(self.inotify)
+        except (OSError, AttributeError):
+            self.inotify = None  # no inotify: rescan on every sync()
+        if self.index.wd is None:
+            self.index.rescan()
+        if self.segment_seconds:
+            self._recover()
+
+    def _clean_tmp(self):
+        """Delete rewrite and merge outputs (.<name>.tmp) a killed run left half-written."""
+        for tmp in self.index.path.glob(".*.tmp"):
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def fileno(self):
+        """inotify fd to poll alongside other events, or None."""
+        return self.inotify.fd if self.inotify else None
+
+    def sync(self):
+        """Apply pending directory events (or rescan without inotify)."""
+        if self.inotify is None or not self.index.watch(self.inotify):
+            self.index.rescan()
+            return
+        now = time.time()
+        for wd, mask, name in self.inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                self.index.rescan()
+            elif wd != self.index.wd:
+                continue
+            elif mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                self.index.wd = None  # directory replaced; re-watched on the next sync
+            else:
+                self.index.event(mask, name, now)
+
+    def excess(self):
+        """(bytes to free, reason) — (0, None) when within budget."""
+        need, reason = 0, None
+        _files, size, _oldest = self.index.totals()
+        if self.max_bytes and size > self.max_bytes:
+            need, reason = size - self.max_bytes * (1 - HYSTERESIS), "backlog_max_bytes"
+        if self.hard_pct:
+            try:
+                vfs = os.statvfs(self.index.path)
+            except OSError:
+                vfs = None
+            if vfs and vfs.f_blocks:
+                limit = vfs.f_blocks * vfs.f_frsize * self.hard_pct / 100
+                used = (vfs.f_blocks - vfs.f_bavail) * vfs.f_frsize
+                if used > limit and used - limit * (1 - HYSTERESIS) > need:
+                    need, reason = used - limit * (1 - HYSTERESIS), "disk_hard_pct"
+        return (int(need), reason)
+
+    def _reduced(self, name):
+        if name.endswith(".gz"):
+            return True
+        if self.policy == "downsample":
+            snaplen = pcap_snaplen(self.index.path / name)
+            return snaplen is None or snaplen <= self.snaplen
+        return False
+
+    def _drop(self, name):
+        size = self.index.files[name][0]
+        (self.index.path / name).unlink()
+        if SEGMENT_TAG in name:
+            (self.index.path / sidecar(name)).unlink(missing_ok=True)
+        return (size, None)
+
+    def _commit(self, name, dst_name):
+        """Move a finished rewrite into place. Returns (bytes freed, new name)."""
+        src = self.index.path / name
+        os.replace(self.index.path / f".{dst_name}.tmp", self.index.path / dst_name)
+        if dst_name != name:
+            src.unlink()
+        elif SEGMENT_TAG in name:
+            self._reindex(name)
+        return (self.index.files[name][0] - os.path.getsize(self.index.path / dst_name), dst_name)
+
+    def _reindex(self, name):
+        """Point a downsampled segment's sub-index at its new offsets (best effort)."""
+        idx = self.index.path / sidecar(name)
+        try:
+            with open(idx) as f:
+                data = json.load(f)
+            reindex_segment(self.index.path / name, data["files"])
+            _write_json(idx, data, os.stat(idx).st_mtime_ns)
+        except (OSError, ValueError, KeyError, IndexError):
+            pass
+
+    def _record(self, entries, name, reason, outcome):
+        """Update the index for one decision and log it; outcome is (bytes freed, new name, action)."""
+        size = self.index.files[name][0]
+        freed, dst, result = outcome
+        self.index.remove(name)
+        if dst:
+            self.index.update(dst)
+        entries.append(self._entry(name, dst, size, size - freed, result, reason))
+        return freed
+
+    def _reduce_pass(self, need, reason, entries, stop=None):
+        """
+        Apply backlog_policy to the oldest files not yet reduced, `workers` at a time in a pool of
+        niced processes, until `need` is met. A rewrite that fails (e.g. ENOSPC) drops the file.
+        Once `stop` is set the running batch is killed and its outputs removed; sources are untouched.
+        """
+        todo = [n for n in self.index.oldest_first() if n not in self.index.open and not self._reduced(n)]
+        if not todo:
+            return need
+        dst_names = {n: n + ".gz" if self.policy == "compress" else n for n in todo}
+        with ProcessPoolExecutor(self.workers, initializer=_worker_init) as pool:
+            while todo and need > 0 and not _stopped(stop):
+                batch, todo = todo[: self.workers], todo[self.workers :]
+                jobs = {
+                    name: pool.submit(
+                        rewrite_file,
+                        self.policy,
+                        self.index.path / name,
+                        self.index.path / f".{dst_names[name]}.tmp",
+                        self.snaplen,
+                    )
+                    for name in batch
+                }
+                pending = set(jobs.values())
+                while pending and not _stopped(stop):
+                    _done, pending = wait(pending, timeout=STOP_POLL)
+                if pending:
+                    _kill_pool(pool)
+                    for name in batch:
+                        (self.index.path / f".{dst_names[name]}.tmp").unlink(missing_ok=True)
+                    break
+                for name, job in jobs.items():
+                    try:
+                        job.result()
+                        outcome = (*self._commit(name, dst_names[name]), self.policy)
+                    except (OSError, ValueError):
+                        (self.index.path / f".{dst_names[name]}.tmp").unlink(missing_ok=True)
+                        try:
+                            outcome = (*self._drop(name), "drop")
+                        except OSError:
+                            self.index.update(name)  # vanished or undeletable: re-read it and move on
+                            continue
+                    need -= self._record(entries, name, reason, outcome)
+        return need
+
+    def enforce(self, stop=None):
+        """
+        Bring the backlog back within budget, oldest first: a pass applying backlog_policy to
+        files not yet reduced (see _reduce_pass), then dropping. Files being written are left
+        alone. `stop` (an Event) ends it early, between files. Returns the log entries.
+        """
+        need, reason = self.excess()
+        if need <= 0:
+            return []
+        entries = []
+        if self.policy != "drop":
+            need = self._reduce_pass(need, reason, entries, stop)
+        for name in self.index.oldest_first():
+            if need <= 0 or _stopped(stop):
+                break
+            if name in self.index.open:
+                continue
+            try:
+                outcome = (*self._drop(name), "drop")
+            except OSError:
+                self.index.update(name)
+                continue
+            need -= self._record(entries, name, reason, outcome)
+        self._append_log(entries)
+        return entries
+
+    def _segment_groups(self, now):
+        """Closed, unmerged pcaps of finished buckets as lists of names (2+ files, one header key each)."""
+        groups = {}
+        for name in self.index.oldest_first():
+            if name in self.index.open or SEGMENT_TAG in name or name.endswith(".gz"):
+                continue
+            mtime = self.index.files[name][1]
+            start = capture_start(name, mtime)
+            bucket = start // self.segment_seconds * self.segment_seconds
+            if now - mtime < COALESCE_GRACE or bucket + self.segment_seconds + COALESCE_GRACE > now:
+                continue
+            key = pcap_header_key(self.index.path / name)
+            if key is not None:
+                groups.setdefault((bucket, key), []).append((start, name))
+        return [[name for _start, name in sorted(g)] for _bucket_key, g in sorted(groups.items()) if len(g) > 1]
+
+    def _recover(self):
+        """
+        Delete sources a merge had written into a segment but not yet deleted (interrupted between
+        the two): those listed, at the same size, in the sub-index of a segment that exists.
+        """
+        for idx in list(self.index.path.glob(f"*{INDEX_SUFFIX}")):
+            segment = idx.name.removesuffix(INDEX_SUFFIX)
+            if not ((self.index.path / segment).exists() or (self.index.path / f"{segment}.gz").exists()):
+                continue
+            try:
+                with open(idx) as f:
+                    listed = json.load(f)["files"]
+            except (OSError, ValueError, KeyError):
+                continue
+            for e in listed:
+                entry = self.index.files.get(e.get("name"))
+                if entry and entry[0] == e.get("size"):
+                    try:
+                        (self.index.path / e["name"]).unlink()
+                    except OSError:
+                        continue
+                    self.index.remove(e["name"])
+
+    def coalesce(self, now=None, stop=None):
+        """
+        Merge the closed PCAPs of each finished backlog_coalesce_seconds bucket into one segment
+        (see merge_pcaps) plus its sub-index; the segment keeps the newest source's mtime. Sources
+        are deleted once both are in place. `stop` (an Event) abandons the merge in progress
+        (between its sources). Returns the log entries (one per source).
+        """
+        if not self.segment_seconds:
+            return []
+        entries = []
+        for names in self._segment_groups(now or time.time()):
+            if _stopped(stop):
+                break
+            dst = names[0].split(".pcap")[0] + SEGMENT_TAG + ".pcap"
+            tmp = self.index.path / f".{dst}.tmp"
+            sizes = {n: self.index.files[n][0] for n in names}
+            try:
+                subindex = merge_pcaps([self.index.path / n for n in names], tmp, stop)
+                for e in subindex:
+                    e["size"] = sizes[e["name"]]
+                mtime_ns = max(os.stat(self.index.path / n).st_mtime_ns for n in names)
+                os.utime(tmp, ns=(mtime_ns, mtime_ns))
+                # Segment first: sources listed by a sub-index count as merged (see _recover)
+                os.replace(tmp, self.index.path / dst)
+                _write_json(
+                    self.index.path / sidecar(dst),
+                    {"segment": dst, "created": datetime.now().isoformat(), "files": subindex},
+                    mtime_ns,
+                )
+            except (OSError, ValueError):
+                tmp.unlink(missing_ok=True)
+                continue
+            self.index.update(dst)
+            for e in subindex:
+                try:
+                    (self.index.path / e["name"]).unlink()
+                except OSError:
+                    pass
+                self.index.remove(e["name"])
+                entries.append(self._entry(e["name"], dst, e["size"], e["bytes"], "coalesce", "coalesce"))
+        self._append_log(entries)
+        return entries
+
+    def _entry(self, name, dst, size, size_after, result, reason):
+        return {
+            "ts": datetime.now().isoformat(),
+            "hostname": os.uname().nodename,
+            "src": str(self.index.path / name),
+            "dst": str(self.index.path / dst) if dst else None,
+            "size": size,
+            "size_after": size_after,
+            "sha256": None,
+            "result": {
+                "drop": "DROPPED",
+                "downsample": "DOWNSAMPLED",
+                "compress": "COMPRESSED",
+                "coalesce": "COALESCED",
+            }[result],
+            "reason": reason,
+        }
+
+    def _append_log(self, entries):
+        if not entries:
+            return
+        try:
+            with open(self.log_path, "a") as f:
+                f.writelines(json.dumps(e) + "\n" for e in entries)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            pass  # the disk may be the problem; decisions are still returned for the journal
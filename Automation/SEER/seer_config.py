@@ -0,0 +1,75 @@
+"""
+SEER configuration loader with a precompiled cache (shared by the console, mover and daemons)
+- load(path): seer.yml as a dict, as yaml.safe_load would return it
+- The parsed config is kept in CACHE_FILE as marshal data keyed by the YAML's path, mtime, size and
+  inode; while seer.yml is unchanged no process imports or runs PyYAML (the console's cold start and
+  every mover tick skip it). Editing seer.yml (setup_wizard, by hand) changes the key
+- Within a process the parse is memoized on the same key, so re-reading the config each loop is one stat()
+- Every call returns a fresh dict (callers may modify it)
+- The cache is best effort: a missing, damaged, foreign-owned or unwritable cache just means parsing
+"""
+
+import marshal
+import os
+
+CONFIG_PATH = "/opt/seer/etc/seer.yml"
+CACHE_FILE = os.environ.get("SEER_CONFIG_CACHE", "/var/cache/seer/seer.yml.cache")
+MAGIC = b"SEERCFG1"
+
+_memo = {}  # path -> (key, marshal bytes)
+
+
+def _key(path):
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _read_cache(key):
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            st = os.fstat(f.fileno())
+            owners = (0, os.getuid(), os.stat(os.path.dirname(CACHE_FILE)).st_uid)
+            if st.st_uid not in owners or st.st_mode & 0o022:
+                return None  # only trust a cache the installer's users could have written
+            data = f.read()
+        if not data.startswith(MAGIC):
+            return None
+        cached_key, blob = marshal.loads(data[len(MAGIC) :])
+        return blob if tuple(cached_key) == key else None
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(key, blob):
+    tmp = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + marshal.dumps((key, blob)))
+        os.replace(tmp, CACHE_FILE)  # no fsync: a cache lost in a crash is rebuilt on the next load
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def load(path=CONFIG_PATH):
+    """seer.yml at path as a dict ({} when empty). Raises OSError / yaml.YAMLError like yaml.safe_load(open(path))."""
+    key = _key(path)
+    memo = _memo.get(path)
+    if memo is not None and memo[0] == key:
+        return marshal.loads(memo[1])
+    blob = _read_cache(key)
+    if blob is None:
+        import yaml  # deferred: only needed when seer.yml changed since the cache was written
+
+        with open(path) as f:
+            cfg = yaml.safe_load(f) or {}
+        try:
+            blob = marshal.dumps(cfg)
+        except ValueError:
+            return cfg  # holds types marshal can't store (YAML timestamps): parse every time
+        _write_cache(key, blob)
+    _memo[path] = (key, blob)
+    return marshal.loads(blob)
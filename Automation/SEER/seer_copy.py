@@ -0,0 +1,298 @@
+"""
+SEER verified copy engine (shared by the exporter, seer_hotswap.py, and the mover, move_oldest.py)
+- transfer_file(): onto a drive without overwriting; same filesystem = rename, otherwise a streaming
+  copy to <dst>.part that hashes the source as it goes, fsync, a verify re-read (sha256 + 4 MiB chunk
+  hashes, seer_hash.py), rename into place, fsync of the directory, and only then unlink the source
+- .part copies checkpoint every CHECKPOINT_BYTES (fsync + <dst>.part.progress) and resume after a
+  yank or a stop; `stop` (an Event) makes copies and hashes checkpoint and raise CopyCancelled
+- `shaper` (seer_io.Shaper) meters the source reads of a copy, so a drain yields the SSD to capture
+- DriveIndex: <drive>/.seer/index.jsonl, sha256/size of every verified file, so a file already on
+  the drive (written by either side) is recognised without hashing it again
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from seer_hash import sha256_file, sha256_tree
+from seer_perf import span
+
+log = logging.getLogger("seer-copy")
+
+INDEX_DIR = ".seer"
+PART_SUFFIX = ".part"
+COPY_CHUNK = 1024 * 1024
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+TAIL_CHECK_BYTES = 1024 * 1024
+
+
+class CopyCancelled(Exception):
+    """Stop was requested; a .part copy was checkpointed and resumes next time."""
+
+
+def hash_file(path, stop=None):
+    """Streaming sha256 (seer_hash.sha256_file); CopyCancelled once stop is set."""
+    with span("hash"):
+        sha = sha256_file(path, stop=stop)
+    if sha is None:
+        raise CopyCancelled(path)
+    return sha
+
+
+def hash_tree(path, stop=None):
+    """hash_file plus the MERKLE_LEAF chunk hashes, from the same read: (sha256, leaves)."""
+    with span("hash"):
+        tree = sha256_tree(path, stop=stop)
+    if tree is None:
+        raise CopyCancelled(path)
+    return tree
+
+
+class DriveIndex:
+    """
+    Record of verified files on a drive: <drive>/.seer/index.jsonl, one JSON line per file
+    ({"path", "size", "sha256", "ts"}, path relative to the drive root; later lines win).
+    Lets the exporter and the mover recognise files already on the drive without re-reading them.
+    Chunk hashes from the verify pass are held in `trees` (not in the index) until the exporter or
+    the mover pops them into the directory's MERKLE.json (seer_manifest.py).
+    """
+
+    def __init__(self, drive_root):
+        self.drive_root = drive_root
+        self.path = os.path.join(drive_root, INDEX_DIR, "index.jsonl")
+        self.entries = {}
+        self.trees = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["path"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue  # torn last line after a yank
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.warning(f"Failed to read drive index {self.path}: {e}")
+
+    def _key(self, dst):
+        return os.path.relpath(dst, self.drive_root)
+
+    def get(self, dst):
+        return self.entries.get(self._key(dst))
+
+    def pop_tree(self, dst):
+        return self.trees.pop(self._key(dst), None)
+
+    def record(self, dst, size, sha, leaves=None):
+        entry = {"path": self._key(dst), "size": size, "sha256": sha, "ts": datetime.now().isoformat()}
+        if leaves is not None:
+            self.trees[entry["path"]] = leaves
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[entry["path"]] = entry
+
+
+def fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        with span("fsync"):
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_progress(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _write_progress(path, record):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(record, f)
+    os.replace(tmp, path)
+
+
+def discard_part(dst):
+    for path in (dst + PART_SUFFIX, dst + PART_SUFFIX + ".progress"):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _resume_hash(fin, fout, offset, stop=None, shaper=None):
+    """
+    Rebuild the sha256 state for src[:offset] from the local source (hashlib state can't be
+    persisted) and check the last TAIL_CHECK_BYTES on the drive still match the source.
+    Returns (offset, hash); offset is 0 when the partial copy can't be trusted.
+    """
+    h = hashlib.sha256()
+    fin.seek(0)
+    remaining = offset
+    while remaining:
+        if stop is not None and stop.is_set():
+            raise CopyCancelled(fout.name)
+        chunk = fin.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            return (0, hashlib.sha256())
+        if shaper:
+            shaper.take(len(chunk), stop)
+        h.update(chunk)
+        remaining -= len(chunk)
+
+    tail_start = max(0, offset - TAIL_CHECK_BYTES)
+    fin.seek(tail_start)
+    fout.seek(tail_start)
+    if fin.read(offset - tail_start) != fout.read(offset - tail_start):
+        return (0, hashlib.sha256())
+    return (offset, h)
+
+
+def copy_resumable(src, dst, on_bytes=None, stop=None, shaper=None):
+    """
+    Copy src to dst.part, hashing the source bytes as they stream. Every CHECKPOINT_BYTES the
+    part file is fsynced and its length recorded in dst.part.progress, so a copy cut short by
+    a yanked drive resumes from the last checkpoint. on_bytes(n) is called as bytes land
+    (including the resumed prefix). Returns the source sha256. Once `stop` (an Event) is set the
+    copy checkpoints where it is and raises CopyCancelled. `shaper` (seer_io.Shaper) holds each
+    chunk back until the rate allows it.
+    """
+    part = dst + PART_SUFFIX
+    progress_path = part + ".progress"
+    st = os.stat(src)
+    ident = {"src": src, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    offset = 0
+    progress = _read_progress(progress_path)
+    if progress and os.path.exists(part) and all(progress.get(k) == v for k, v in ident.items()):
+        offset = min(int(progress.get("offset", 0)), os.path.getsize(part))
+
+    h = hashlib.sha256()
+    buf = bytearray(COPY_CHUNK)
+    view = memoryview(buf)
+    with open(src, "rb") as fin, open(part, "r+b" if offset else "wb") as fout:
+        if offset:
+            offset, h = _resume_hash(fin, fout, offset, stop, shaper)
+            log.info(f"Resuming {os.path.basename(dst)} at {offset // (1024**2)} MB")
+            if on_bytes:
+                on_bytes(offset)
+        fin.seek(offset)
+        fout.seek(offset)
+        fout.truncate(offset)
+
+        def checkpoint():
+            fout.flush()
+            with span("fsync"):
+                os.fsync(fout.fileno())
+            _write_progress(progress_path, {**ident, "offset": offset})
+
+        since_checkpoint = 0
+        while n := fin.readinto(buf):
+            if shaper:
+                shaper.take(n, stop)
+            chunk = view[:n]
+            h.update(chunk)
+            fout.write(chunk)
+            offset += n
+            since_checkpoint += n
+            if on_bytes:
+                on_bytes(n)
+            if stop is not None and stop.is_set():
+                checkpoint()
+                raise CopyCancelled(part)
+            if since_checkpoint >= CHECKPOINT_BYTES:
+                checkpoint()
+                since_checkpoint = 0
+        fout.flush()
+        with span("fsync"):
+            os.fsync(fout.fileno())
+    view.release()
+    return h.hexdigest()
+
+
+def _already_on_drive(dst, size, sha, index, stop=None):
+    """True if dst holds exactly this content (index lookup; hashes dst only if unindexed)."""
+    entry = index.get(dst) if index else None
+    if entry is not None:
+        return entry.get("size") == size and entry.get("sha256") == sha
+    # Not indexed (e.g. cut between rename and index append): fall back to reading it once
+    if os.path.getsize(dst) == size:
+        dst_sha, leaves = hash_tree(dst, stop)
+        if dst_sha == sha:
+            if index:
+                index.record(dst, size, sha, leaves)
+            return True
+    return False
+
+
+def transfer_file(src, dst_dir, verify=True, index=None, on_bytes=None, stop=None, shaper=None):
+    """
+    Transfer file from src to dst_dir with integrity check (the exporter's and the mover's path onto a drive).
+    - Content already on the drive under the same name is skipped (SKIP_EXISTS) and the source removed
+    - A different file with the same name is never overwritten; the copy gets a -N suffix
+    - Cross-filesystem copies go through a resumable .part file and are renamed into place after verify
+    - verify re-reads the copy (sha256 + MERKLE_LEAF chunk hashes) before the source is removed
+    - shaper (seer_io.Shaper) paces the copy's reads of the source
+    Returns (result, sha256, dst, error_msg); result is OK, SKIP_EXISTS, VERIFY_FAIL, IO_ERROR or
+    CANCELLED (`stop` was set; the source stays in place). sha256 is None only for a same-filesystem
+    rename without verify.
+    """
+    dst = None
+    try:
+        os.makedirs(dst_dir, exist_ok=True)
+        size = os.path.getsize(src)
+        stem, ext = os.path.splitext(os.path.basename(src))
+        dst = os.path.join(dst_dir, stem + ext)
+
+        src_sha = None
+        n = 0
+        while os.path.exists(dst):
+            src_sha = src_sha or hash_file(src, stop)
+            if _already_on_drive(dst, size, src_sha, index, stop):
+                os.unlink(src)
+                return ("SKIP_EXISTS", src_sha, dst, None)
+            n += 1
+            dst = os.path.join(dst_dir, f"{stem}-{n}{ext}")
+
+        # Same filesystem: atomic rename
+        if os.stat(src).st_dev == os.stat(dst_dir).st_dev:
+            os.rename(src, dst)
+            sha, leaves = hash_tree(dst, stop) if verify else (src_sha, None)
+            if index and sha:
+                index.record(dst, size, sha, leaves)
+            return ("OK", sha, dst, None)
+
+        # Cross-filesystem: copy to .part, verify, rename, delete source
+        with span("copy"):
+            sha = copy_resumable(src, dst, on_bytes, stop, shaper)
+        leaves = None
+        if verify:
+            dst_sha, leaves = hash_tree(dst + PART_SUFFIX, stop)
+            if sha != dst_sha:
+                discard_part(dst)
+                return ("VERIFY_FAIL", None, dst, f"Checksum mismatch: {sha[:8]} != {dst_sha[:8]}")
+
+        os.replace(dst + PART_SUFFIX, dst)
+        fsync_dir(dst_dir)
+        if index:
+            index.record(dst, size, sha, leaves)
+        discard_part(dst)
+
+        # Verify success; safe to remove source
+        os.unlink(src)
+        return ("OK", sha, dst, None)
+
+    except CopyCancelled:
+        return ("CANCELLED", None, dst, "stopping")
+    except Exception as e:
+        return ("IO_ERROR", None, dst, str(e))
@@ -0,0 +1,423 @@
+"""
+SEER export drive selection — shared by the mover (move_oldest.py) and exporter (seer_hotswap.py)
+- Every writable mount in export.mount_candidates is a target, not just the first one found
+- Files go to the drive expected to finish them first: queued bytes / measured write throughput,
+  scaled by how much free headroom the drive has left (fuller drives get proportionally less)
+- Spillover: a drive that would drop below min_free_pct for a file is skipped for that file
+- Per-drive write throughput (EWMA of observed copies, keyed by drive UUID) persists in
+  /var/log/seer/drives.state
+- probe_write_bps(): short fsynced write on insertion, since a mount path may be a different stick
+- MountWatcher: sleeps in poll() until the kernel flags a mount table change (no periodic statvfs)
+- DriveInventory: cached mountinfo + /dev/disk/by-label|by-uuid (no lsblk/blkid forks); discovers
+  mounts under /mnt or /media labelled SEER/EXT and gives each drive a stable identity (UUID)
+"""
+
+import json
+import os
+import re
+import select
+import threading
+import time
+
+DRIVE_STATS = "/var/log/seer/drives.state"
+MOUNTINFO = "/proc/self/mountinfo"
+DISK_BY = "/dev/disk"
+SYS_BLOCK = "/sys/class/block"
+DISCOVER_ROOTS = ("/mnt", "/media")
+LABEL_PATTERNS = ("SEER", "EXT")
+DEFAULT_WRITE_BPS = 30 * 1024**2  # assumed until a drive has been measured
+MIN_SAMPLE_BYTES = 8 * 1024**2  # smaller copies are dominated by open/fsync latency
+PROBE_BYTES = 32 * 1024**2
+EWMA_ALPHA = 0.3
+
+
+def _unescape_octal(s):
+    """mountinfo escapes space, tab, newline and backslash as \\ooo."""
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), s)
+
+
+def _unescape_hex(s):
+    """udev escapes unsafe characters in /dev/disk/by-label names as \\xHH."""
+    return re.sub(r"\\x([0-9a-fA-F]{2})", lambda m: chr(int(m.group(1), 16)), s)
+
+
+def parse_mountinfo(path=MOUNTINFO):
+    """{mount_point: {"dev": "major:minor", "fstype", "source"}}; a later (stacked) mount wins."""
+    mounts = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            try:
+                sep = parts.index("-", 6)
+            except ValueError:
+                continue
+            mounts[_unescape_octal(parts[4])] = {
+                "dev": parts[2],
+                "fstype": parts[sep + 1],
+                "source": _unescape_octal(parts[sep + 2]),
+            }
+    return mounts
+
+
+def _sys_int(name, attr):
+    try:
+        with open(os.path.join(SYS_BLOCK, name, attr)) as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def block_disks(name):
+    """Whole disk(s) backing a block device: sdb1 -> {sdb}; dm/md devices resolve via slaves/."""
+    path = os.path.realpath(os.path.join(SYS_BLOCK, name))
+    try:
+        slaves = os.listdir(os.path.join(path, "slaves"))
+    except OSError:
+        slaves = []
+    if slaves:
+        return set().union(*(block_disks(s) for s in slaves))
+    if os.path.exists(os.path.join(path, "partition")):
+        return {os.path.basename(os.path.dirname(path))}
+    return {name}
+
+
+def disk_queue(path):
+    """
+    (queue depth, rotational) of the disk(s) holding path, for sizing parallel I/O: the device's
+    queue_depth (SCSI/UAS; usb-storage is 1), else the block layer's nr_requests. (0, False) when
+    there is no block device (tmpfs, network filesystems).
+    """
+    dev = os.stat(path).st_dev
+    name = os.path.basename(os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"))
+    disks = block_disks(name)
+    depth = min(_sys_int(d, "device/queue_depth") or _sys_int(d, "queue/nr_requests") for d in disks)
+    return (depth, any(_sys_int(d, "queue/rotational") for d in disks))
+
+
+def _active_swaps():
+    try:
+        with open("/proc/swaps") as f:
+            return {os.path.realpath(line.split()[0]) for line in f.readlines()[1:] if line.strip()}
+    except OSError:
+        return set()
+
+
+class DriveInventory:
+    """
+    Cached view of mounted filesystems and labelled/UUID'd block devices. refresh() re-reads
+    mountinfo and the two /dev/disk/by-* directories (a file and two readdirs, no forks); call
+    it when a MountWatcher reports a change.
+    """
+
+    def __init__(self):
+        self.mounts = {}
+        self.devices = {}
+        self.refresh()
+
+    def refresh(self):
+        devices = {}
+        for kind in ("uuid", "label"):
+            by_dir = os.path.join(DISK_BY, f"by-{kind}")
+            try:
+                names = os.listdir(by_dir)
+            except OSError:
+                continue
+            for name in names:
+                try:
+                    node = os.path.realpath(os.path.join(by_dir, name))
+                    rdev = os.stat(node).st_rdev
+                except OSError:
+                    continue
+                key = f"{os.major(rdev)}:{os.minor(rdev)}"
+                devices.setdefault(key, {"node": node})[kind] = _unescape_hex(name)
+        self.devices = devices
+        try:
+            self.mounts = parse_mountinfo()
+        except OSError:
+            self.mounts = {}
+
+    def is_mounted(self, path):
+        return path in self.mounts
+
+    def identity(self, mount):
+        """{"dev", "node", "uuid", "label", "fstype"} for a mount point, or None if not mounted."""
+        m = self.mounts.get(mount)
+        if m is None:
+            return None
+        dev = self.devices.get(m["dev"], {})
+        return {
+            "dev": m["dev"],
+            "node": dev.get("node", m["source"]),
+            "uuid": dev.get("uuid"),
+            "label": dev.get("label"),
+            "fstype": m["fstype"],
+        }
+
+    def discover(self, roots=DISCOVER_ROOTS, patterns=LABEL_PATTERNS):
+        """Mounts under `roots` whose volume label contains one of `patterns` (case-insensitive)."""
+        prefixes = tuple(r.rstrip("/") + "/" for r in roots)
+        found = []
+        for mount, m in self.mounts.items():
+            label = (self.devices.get(m["dev"], {}).get("label") or "").upper()
+            if mount.startswith(prefixes) and any(p.upper() in label for p in patterns):
+                found.append(mount)
+        return sorted(found)
+
+    def candidates(self, configured, roots=DISCOVER_ROOTS, patterns=LABEL_PATTERNS):
+        """Configured mount_candidates first, then discovered labelled mounts."""
+        out = list(configured)
+        out += [m for m in self.discover(roots, patterns) if m not in out]
+        return out
+
+    def system_disks(self):
+        """Disks backing /, /boot and /boot/efi (never offered as export drives)."""
+        disks = set()
+        for mount in ("/", "/boot", "/boot/efi"):
+            m = self.mounts.get(mount)
+            if m is None:
+                continue
+            name = os.path.basename(os.path.realpath(f"/sys/dev/block/{m['dev']}"))
+            if os.path.exists(os.path.join(SYS_BLOCK, name)):
+                disks |= block_disks(name)
+        return disks
+
+    def unmounted(self):
+        """
+        Block devices carrying a filesystem (they have a UUID) that are neither mounted nor
+        active swap, with their disk(s), removable flag and size from sysfs.
+        """
+        mounted = {m["dev"] for m in self.mounts.values()}
+        swaps = _active_swaps()
+        out = []
+        for key, dev in self.devices.items():
+            name = os.path.basename(dev["node"])
+            if key in mounted or not dev.get("uuid") or dev["node"] in swaps:
+                continue
+            if name.startswith(("loop", "ram", "zram", "sr", "dm-")):
+                continue
+            disks = block_disks(name)
+            out.append(
+                dict(
+                    dev,
+                    dev=key,
+                    name=name,
+                    disks=disks,
+                    removable=any(_sys_int(d, "removable") == 1 for d in disks),
+                    size=_sys_int(name, "size") * 512,
+                )
+            )
+        return out
+
+
+def drive_id(target):
+    """Stable identity for a target: filesystem UUID when known, else its device number."""
+    return target.get("uuid") or target.get("dev") or target["mount"]
+
+
+def list_export_targets(candidates, min_free_pct=2, inventory=None):
+    """
+    Every mounted, writable candidate above min_free_pct, in candidate order. With an inventory,
+    mount checks come from its cache and targets carry the drive's identity.
+    Returns [{"mount", "free", "total", "st_dev", "dev", "uuid", "label"}] (bytes).
+    """
+    targets = []
+    for candidate in candidates:
+        mounted = inventory.is_mounted(candidate) if inventory else os.path.ismount(candidate)
+        if not mounted or not os.access(candidate, os.W_OK):
+            continue
+        try:
+            st = os.statvfs(candidate)
+            st_dev = os.stat(candidate).st_dev
+        except OSError:
+            continue
+        free = st.f_bavail * st.f_frsize
+        total = st.f_blocks * st.f_frsize
+        if total > 0 and free / total * 100 >= min_free_pct:
+            ident = (inventory.identity(candidate) if inventory else None) or {}
+            targets.append(
+                {
+                    "mount": candidate,
+                    "free": free,
+                    "total": total,
+                    "st_dev": st_dev,
+                    "dev": ident.get("dev") or f"{os.major(st_dev)}:{os.minor(st_dev)}",
+                    "uuid": ident.get("uuid"),
+                    "label": ident.get("label"),
+                }
+            )
+    return targets
+
+
+def probe_write_bps(mount, size=PROBE_BYTES):
+    """
+    Sustained write speed of a drive: write `size` bytes of incompressible data to .seer/ on it,
+    fsync, time it, delete. Returns bytes/sec or None if the drive could not be written.
+    """
+    path = os.path.join(mount, ".seer", f"probe.{os.getpid()}")
+    chunk = os.urandom(1024 * 1024)
+    written = 0
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        t0 = time.monotonic()
+        with open(path, "wb") as f:
+            while written < size:
+                written += f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        seconds = time.monotonic() - t0
+        return written / seconds if seconds > 0 else None
+    except OSError:
+        return None
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def load_stats(path=None):
+    try:
+        with open(path or DRIVE_STATS) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_stats(stats, path=None):
+    """Atomic write; the mover and exporter both update this file."""
+    path = path or DRIVE_STATS
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+class DriveSelector:
+    """
+    Assigns files to export drives. pick() reserves space and queues the bytes on the chosen
+    drive; done() releases them and feeds the observed copy time into the throughput estimate.
+    Thread-safe, so per-drive writer threads can report back concurrently.
+    """
+
+    def __init__(self, targets, min_free_pct=2, stats_path=None):
+        self.min_free_pct = min_free_pct
+        self.stats_path = stats_path
+        self.stats = load_stats(stats_path)
+        self.drives = {t["mount"]: dict(t) for t in targets}
+        self.queued = dict.fromkeys(self.drives, 0)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def detect(cls, candidates, min_free_pct=2, stats_path=None, inventory=None):
+        return cls(list_export_targets(candidates, min_free_pct, inventory), min_free_pct, stats_path)
+
+    def mounts(self):
+        return list(self.drives)
+
+    def drive_id(self, mount):
+        return drive_id(self.drives[mount])
+
+    def write_bps(self, mount):
+        return self.stats.get(self.drive_id(mount), {}).get("write_bps") or DEFAULT_WRITE_BPS
+
+    def same_drive(self, mount):
+        """False once the filesystem at `mount` is no longer the one this selector was built for."""
+        try:
+            return os.stat(mount).st_dev == self.drives[mount].get("st_dev")
+        except OSError:
+            return False
+
+    def headroom(self, mount):
+        """Bytes that can still be written before the drive hits min_free_pct (minus reservations)."""
+        d = self.drives[mount]
+        return d["free"] - self.queued[mount] - d["total"] * self.min_free_pct / 100
+
+    def pick(self, size):
+        """Reserve `size` bytes on the best drive and return its mount, or None if no drive has room."""
+        with self._lock:
+            best, best_score = None, None
+            for mount, d in self.drives.items():
+                room = self.headroom(mount) - size
+                if room < 0:
+                    continue
+                finish = (self.queued[mount] + size) / self.write_bps(mount)
+                score = finish / (room / d["total"]) if room > 0 else float("inf")
+                if best_score is None or score < best_score:
+                    best, best_score = mount, score
+            if best is not None:
+                self.queued[best] += size
+            return best
+
+    def done(self, mount, size, seconds=None, written=True):
+        """
+        Release a reservation from pick(). written=False when nothing landed on the drive
+        (failure, or the file was already there). seconds = wall time of a real copy.
+        """
+        with self._lock:
+            self.queued[mount] = max(0, self.queued[mount] - size)
+            if written:
+                self.drives[mount]["free"] -= size
+            if seconds and size >= MIN_SAMPLE_BYTES:
+                bps = size / seconds
+                key = self.drive_id(mount)
+                prev = self.stats.get(key, {}).get("write_bps")
+                est = bps if prev is None else prev + EWMA_ALPHA * (bps - prev)
+                self.stats[key] = {"write_bps": round(est), "updated": time.time()}
+
+    def probe(self, mount, size=PROBE_BYTES):
+        """Measure a drive with probe_write_bps() and restart its estimate from the result."""
+        bps = probe_write_bps(mount, size)
+        if bps:
+            with self._lock:
+                self.stats[self.drive_id(mount)] = {"write_bps": round(bps), "updated": time.time()}
+        return bps
+
+    def save(self):
+        with self._lock:
+            save_stats(self.stats, self.stats_path)
+
+
+class MountWatcher:
+    """
+    Wait for mount/unmount events. The kernel raises POLLPRI|POLLERR on an open mountinfo
+    file whenever the mount namespace changes, so wait() costs nothing while idle and returns
+    within milliseconds of a drive being mounted. Without mountinfo it degrades to sleeping.
+    """
+
+    def __init__(self, path=MOUNTINFO):
+        self._poll = None
+        try:
+            self._f = open(path, "rb")
+            self._poll = select.poll()
+            self._poll.register(self._f, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self._f = None
+
+    @property
+    def event_driven(self):
+        return self._poll is not None
+
+    def watch(self, fd):
+        """Also return from wait() early when fd is readable (its owner drains it). No-op when polling."""
+        if self._poll is not None and fd is not None:
+            self._poll.register(fd, select.POLLIN)
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds; True if the mount table changed (always True when polling)."""
+        if self._poll is None:
+            time.sleep(timeout)
+            return True
+        events = self._poll.poll(timeout * 1000)
+        if not any(fd == self._f.fileno() for fd, _ in events):
+            return False
+        self._f.seek(0)
+        self._f.read()
+        return True
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
@@ -0,0 +1,115 @@
+"""
+SEER file hashing (shared by seer_hotswap.py and seer_verify_drive.py)
+- sha256_file() streams a file through hashlib in HASH_CHUNK pieces: readinto() a reused buffer
+  (posix_fadvise SEQUENTIAL for readahead) or slices of an mmap; hashlib drops the GIL on
+  large updates, so threads and processes both scale
+- stop (a threading/multiprocessing Event) is checked between chunks; on_bytes(n) reports progress
+- sha256_tree() adds the sha256 of every MERKLE_LEAF chunk in the same read; merkle_root() folds
+  leaf (or file) hashes into one root, leaf_hashes() re-hashes only chosen leaves
+"""
+
+import hashlib
+import mmap
+import os
+from contextlib import closing
+
+HASH_CHUNK = 4 * 1024 * 1024
+MERKLE_LEAF = 4 * 1024 * 1024  # a spot check or a "which part is corrupt" query reads this much per leaf
+METHODS = ("readinto", "mmap")
+
+
+def _fadvise_sequential(fd):
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def _pieces(f, chunk, method):
+    """The file as successive memoryviews of at most `chunk` bytes (released as the caller moves on)."""
+    size = os.fstat(f.fileno()).st_size
+    _fadvise_sequential(f.fileno())
+    if method == "mmap" and size:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for off in range(0, size, chunk):
+                with view[off : off + chunk] as piece:
+                    yield piece
+        return
+    buf = bytearray(chunk)
+    with memoryview(buf) as view:
+        while n := f.readinto(buf):
+            with view[:n] as piece:
+                yield piece
+
+
+def sha256_file(path, chunk=HASH_CHUNK, method="readinto", stop=None, on_bytes=None):
+    """Hex sha256 of path, or None if `stop` was set before it finished."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f, closing(_pieces(f, chunk, method)) as pieces:
+        for piece in pieces:
+            if stop is not None and stop.is_set():
+                return None
+            h.update(piece)
+            if on_bytes:
+                on_bytes(len(piece))
+    return h.hexdigest()
+
+
+def sha256_tree(path, leaf=MERKLE_LEAF, method="readinto", stop=None, on_bytes=None):
+    """
+    (hex sha256 of path, [hex sha256 of each `leaf`-byte chunk]) in one read, or None if `stop`
+    was set. The last leaf may be short; an empty file has no leaves.
+    """
+    h = hashlib.sha256()
+    leaves = []
+    lh, filled = hashlib.sha256(), 0
+    with open(path, "rb") as f, closing(_pieces(f, leaf, method)) as pieces:
+        for piece in pieces:
+            if stop is not None and stop.is_set():
+                return None
+            h.update(piece)
+            pos = 0
+            while pos < len(piece):
+                take = min(leaf - filled, len(piece) - pos)
+                lh.update(piece[pos : pos + take])
+                pos += take
+                filled += take
+                if filled == leaf:
+                    leaves.append(lh.hexdigest())
+                    lh, filled = hashlib.sha256(), 0
+            if on_bytes:
+                on_bytes(len(piece))
+    if filled:
+        leaves.append(lh.hexdigest())
+    return (h.hexdigest(), leaves)
+
+
+def leaf_hashes(path, indices, leaf=MERKLE_LEAF):
+    """{index: hex sha256} of just the given leaves of path (seeks; reads nothing else)."""
+    out = {}
+    buf = bytearray(leaf)
+    with open(path, "rb") as f, memoryview(buf) as view:
+        for i in sorted(indices):
+            f.seek(i * leaf)
+            n = f.readinto(buf)
+            out[i] = hashlib.sha256(view[:n]).hexdigest()
+    return out
+
+
+def merkle_root(hashes):
+    """
+    Root over hex sha256 hashes, in order: parents are sha256(0x01 + left + right), an odd node
+    is carried up unchanged, a single hash is its own root and no hashes give sha256(b"").
+    """
+    level = [bytes.fromhex(x) for x in hashes]
+    if not level:
+        return hashlib.sha256(b"").hexdigest()
+    while len(level) > 1:
+        nxt = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0].hex()
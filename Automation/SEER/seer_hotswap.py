@@ -3,44 +3,84 @@
 SEER Hot-Swap / Export Service
 Monitors for external drive presence and manages PCAP export flow:
 - When drive is present: drains backlog to drive, then mover writes directly to drive
+- With several drives attached, transfers are striped across all of them (see seer_drives.py)
+- Each drain is planned up front (what fits, oldest first); progress/ETA/safe-to-remove go to the state file
 - When drive is absent: mover writes to backlog, waiting for drive return
-- Generates integrity manifests (SHA256) and maintains transfer log
+- Generates integrity manifests (SHA256) and maintains transfer log; the verify pass also records 4 MiB
+  chunk hashes per file in MERKLE.json, with a per-directory (per-day) Merkle root in the manifest header
+  (seer_manifest.py, which the mover writes through as well)
+- Drive detection is event-driven (mountinfo POLLPRI); idle costs no CPU and no state writes
+- Exports resume from .part checkpoints after a yank; files already on the drive are skipped (verified
+  copy engine and drive index in seer_copy.py, shared with the mover)
+- Backlog is kept within backlog_max_bytes / capture.disk_hard_pct (seer_backlog.py: drop, downsample
+  or compress the oldest; decisions go to <backlog_dir>/TRANSFER.LOG); with backlog_coalesce_seconds
+  set, finished buckets of small PCAPs are merged into segments (+ .idx sub-index) before export
+- asyncio service (HotswapService): detection, export and state publication are separate tasks, file
+  I/O runs on threads; SIGTERM/SIGINT checkpoint in-flight copies, write manifests and exit
+- Runs in the idle I/O class and paces copies to the SSD bandwidth capture leaves spare (seer_io.py,
+  seer.yml io.*); the shaper's current rate goes to the state file
+- Hot paths are timed (seer_perf.py): histograms go to the state file and PERF_DIR on SIGUSR1; --profile adds
+  cProfile/tracemalloc snapshots
 """
 
-import hashlib
+import argparse
+import asyncio
 import json
 import logging
 import os
-import shutil
+import signal
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
-import yaml
+import seer_config
+import seer_io
+import seer_perf as perf
+from seer_backlog import POLICIES, BacklogManager, capture_day, sidecar
+from seer_copy import PART_SUFFIX, DriveIndex, discard_part, hash_file, transfer_file
+from seer_drives import DriveInventory, DriveSelector, MountWatcher, drive_id, list_export_targets
+from seer_manifest import transfer_log_entry, write_records
+from seer_perf import span
 
-# Ensure log/state directories exist early (before configuring logging)
-os.makedirs("/var/log/seer", exist_ok=True)
-
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout), logging.FileHandler("/var/log/seer/hotswap.log", mode="a")],
-)
 log = logging.getLogger("seer-hotswap")
 
 # Config path
-CONFIG_PATH = "/opt/seer/etc/seer.yml"
+CONFIG_PATH = os.environ.get("SEER_CONFIG", "/opt/seer/etc/seer.yml")
+LOG_FILE = "/var/log/seer/hotswap.log"
 LOCK_FILE = "/var/log/seer/seer-hotswap.lock"
 STATE_FILE = "/var/log/seer/hotswap_state.json"
 
+PROGRESS_INTERVAL = 1.0  # seconds between state-file progress updates during an export
+STATE_HEARTBEAT = 60  # rewrite an unchanged state file at most this often
+STALE_PART_SECONDS = 900  # a .part nobody resumes is left alone this long after its last write
+
+_last_state = {"body": None, "ts": 0.0}
+# Cumulative since service start; published in the state file for seer_metrics.py
+_counters = {"exported_bytes": 0, "verify_ok": 0, "verify_fail": 0, "io_error": 0, "skipped": 0}
+# Set on SIGTERM/SIGINT: copies and hashes stop at their next chunk (seer_copy.CopyCancelled)
+_cancel = threading.Event()
+# Bandwidth shaper shared by the writer threads (seer_io.Shaper; None = unshaped), set by HotswapService
+_shaper = None
+
+
+def setup_logging():
+    """Journal (stdout) plus LOG_FILE; only for the service (main), so importing the module has no side effects."""
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout), logging.FileHandler(LOG_FILE, mode="a")],
+    )
+
 
 def read_config():
     """Load seer.yml configuration."""
     try:
-        with open(CONFIG_PATH) as f:
-            return yaml.safe_load(f) or {}
+        return seer_config.load(CONFIG_PATH)
     except Exception as e:
         log.error(f"Failed to read config {CONFIG_PATH}: {e}")
         return {}
@@ -74,258 +114,613 @@ def release_lock():
         pass
 
 
-def detect_export_target(candidates, min_free_pct=2):
-    """
-    Detect writable external mount with sufficient space.
-    Returns (mount_path, free_bytes) or (None, 0).
-    """
-    for candidate in candidates:
-        if not os.path.ismount(candidate):
-            continue
-        if not os.access(candidate, os.W_OK):
-            continue
-
-        try:
-            stat = os.statvfs(candidate)
-            free_bytes = stat.f_bavail * stat.f_frsize
-            total_bytes = stat.f_blocks * stat.f_frsize
-            free_pct = (free_bytes / total_bytes * 100) if total_bytes > 0 else 0
-
-            if free_pct >= min_free_pct:
-                return (candidate, free_bytes)
-        except Exception as e:
-            log.warning(f"Failed to stat {candidate}: {e}")
-            continue
-
-    return (None, 0)
-
-
 def compute_sha256(filepath):
-    """Streaming SHA256 computation."""
-    h = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        while chunk := f.read(8192):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def is_file_active(filepath, rotate_seconds):
-    """Check if file was modified recently (likely still being written)."""
-    try:
-        mtime = os.path.getmtime(filepath)
-        age = time.time() - mtime
-        return age < (rotate_seconds * 1.5)
-    except Exception:
-        return True  # Assume active if can't determine
+    """Streaming SHA256 computation (seer_copy.hash_file); CopyCancelled when the service is stopping."""
+    return hash_file(filepath, _cancel)
 
 
-def transfer_file(src, dst_dir, verify=True):
+class ExportProgress:
     """
-    Transfer file from src to dst_dir with optional integrity check.
-    Returns (success, sha256, error_msg).
+    Byte-level progress of one export plan. ETA is the slowest drive's remaining bytes over its
+    current write-speed estimate (drives copy in parallel, and the estimate tracks the drain).
+    copy_bps is each drive's measured rate: bytes actually copied over the last PROGRESS_INTERVAL
+    or more (renames, skips and failures settle progress but are not counted).
     """
-    try:
-        os.makedirs(dst_dir, exist_ok=True)
-        dst = os.path.join(dst_dir, os.path.basename(src))
-
-        # Same filesystem: atomic rename
-        if os.stat(src).st_dev == os.stat(dst_dir).st_dev:
-            shutil.move(src, dst)
-            sha = compute_sha256(dst) if verify else None
-            return (True, sha, None)
-
-        # Cross-filesystem: copy, verify, delete
-        shutil.copy2(src, dst)
-        os.sync()
-
-        if verify:
-            src_sha = compute_sha256(src)
-            dst_sha = compute_sha256(dst)
-            if src_sha != dst_sha:
-                os.unlink(dst)
-                return (False, None, f"Checksum mismatch: {src_sha[:8]} != {dst_sha[:8]}")
-
-            # Verify success; safe to remove source
-            os.unlink(src)
-            return (True, src_sha, None)
-        else:
-            os.unlink(src)
-            return (True, None, None)
 
-    except Exception as e:
-        return (False, None, str(e))
+    def __init__(self, plan, selector):
+        self.selector = selector
+        self.started = datetime.now().isoformat()
+        self.finished = False
+        self.files = sum(1 for job in plan if job[3])
+        self.unplanned = [job for job in plan if not job[3]]
+        self.planned = {}
+        for _src, _rel_dir, size, mount in plan:
+            if mount:
+                self.planned[mount] = self.planned.get(mount, 0) + size
+        self.copied = dict.fromkeys(self.planned, 0)
+        self.written = dict.fromkeys(self.planned, 0)
+        now = time.monotonic()
+        self._rates = {m: (now, 0, 0) for m in self.planned}  # mount -> (ts, written then, bytes/s)
+        self._lock = threading.Lock()
+
+    def add(self, mount, n, written=True):
+        with self._lock:
+            self.copied[mount] += n
+            if written:
+                self.written[mount] += n
+
+    def _copy_rates(self, now):
+        for m, (ts, seen, bps) in self._rates.items():
+            if now - ts >= PROGRESS_INTERVAL:
+                self._rates[m] = (now, self.written[m], round((self.written[m] - seen) / (now - ts)))
+        return {m: 0 if self.finished else bps for m, (_ts, _seen, bps) in self._rates.items()}
+
+    def snapshot(self):
+        with self._lock:
+            remaining = {m: max(0, self.planned[m] - self.copied[m]) for m in self.planned}
+            copy_bps = self._copy_rates(time.monotonic())
+        eta = max((r / self.selector.write_bps(m) for m, r in remaining.items()), default=0)
+        return {
+            "state": "done" if self.finished else "copying",
+            "started": self.started,
+            "files": self.files,
+            "unplanned_files": len(self.unplanned),
+            "unplanned_bytes": sum(job[2] for job in self.unplanned),
+            "planned_bytes": sum(self.planned.values()),
+            "done_bytes": sum(self.planned.values()) - sum(remaining.values()),
+            "remaining_bytes": sum(remaining.values()),
+            "eta_seconds": 0 if self.finished else round(eta),
+            "write_bps": {m: self.selector.write_bps(m) for m in self.planned},
+            "copy_bps": copy_bps,
+        }
 
 
-def write_manifest(directory, files_with_hashes):
-    """Write MANIFEST.txt in directory with sha256 checksums."""
-    manifest_path = os.path.join(directory, "MANIFEST.txt")
+def plan_export(jobs, selector, order="oldest"):
+    """
+    Decide up front which (src, rel_dir) jobs go to which drive, oldest first (order="newest"
+    to favour recent captures). Space is reserved per drive, so the plan is exactly what fits;
+    jobs that fit nowhere get mount None and stay where they are.
+    Returns [(src, rel_dir, size, mount)].
+    """
+    sized = []
+    for src, rel_dir in jobs:
+        try:
+            st = os.stat(src)
+        except FileNotFoundError:
+            continue
+        sized.append((st.st_mtime, src, rel_dir, st.st_size))
+    sized.sort(reverse=order == "newest")
+    with span("select"):
+        return [(src, rel_dir, size, selector.pick(size)) for _mtime, src, rel_dir, size in sized]
+
+
+def _timed_transfer(src, dst_dir, index, selector, mount, size, progress):
+    """transfer_file on a drive's writer thread; reports the outcome back to the selector."""
+    if _cancel.is_set():
+        selector.done(mount, size, written=False)
+        progress.add(mount, size, written=False)
+        return ("CANCELLED", None, None, "service stopping")
+    if not selector.same_drive(mount):
+        # Drive swapped under the same mountpoint mid-session: never write into the wrong one
+        selector.done(mount, size, written=False)
+        progress.add(mount, size, written=False)
+        return ("IO_ERROR", None, None, f"export drive at {mount} changed during the session")
     try:
-        with open(manifest_path, "w") as f:
-            f.write("# SEER PCAP Export Manifest\n")
-            f.write(f"# Generated: {datetime.now().isoformat()}\n")
-            f.write("# Format: sha256  filename\n\n")
-            for fname, sha in sorted(files_with_hashes):
-                f.write(f"{sha}  {fname}\n")
-        log.info(f"Wrote manifest: {manifest_path} ({len(files_with_hashes)} files)")
-    except Exception as e:
-        log.error(f"Failed to write manifest {manifest_path}: {e}")
-
-
-def append_transfer_log(drive_root, entries):
-    """Append transfer entries to TRANSFER.LOG on the drive."""
-    log_path = os.path.join(drive_root, "TRANSFER.LOG")
+        same_fs = os.stat(src).st_dev == os.stat(mount).st_dev
+    except OSError as e:
+        # Source gone since planning, or the drive went away: fails this file, not the batch
+        selector.done(mount, size, written=False)
+        progress.add(mount, size, written=False)
+        return ("IO_ERROR", None, None, str(e))
+    copied = 0
+
+    def on_bytes(n):
+        nonlocal copied
+        copied += n
+        progress.add(mount, n)
+
+    t0 = time.monotonic()
+    waited = _shaper.waited() if _shaper else 0.0
+    with perf.thread_profile():
+        result = transfer_file(src, dst_dir, verify=True, index=index, on_bytes=on_bytes, stop=_cancel, shaper=_shaper)
+    seconds = None
+    if result[0] == "OK" and not same_fs:
+        # Time spent held back by the shaper says nothing about the drive's speed
+        seconds = time.monotonic() - t0 - ((_shaper.waited() if _shaper else 0.0) - waited)
+    selector.done(mount, size, seconds, written=result[0] == "OK")
+    progress.add(mount, size - copied, written=False)  # renames, skips and failures settle the whole file
+    return result
+
+
+def stripe_transfers(plan, selector, indexes, progress, publish=None):
+    """
+    Run a plan with one writer thread per drive so a slow stick never stalls a fast one.
+    publish() is called every PROGRESS_INTERVAL while copies are in flight.
+    Returns [(src, mount, size, result, sha, dst, error)] in plan order; an unexpected error in
+    one transfer is that file's IO_ERROR, so the rest of the batch is still recorded.
+    """
+    writers = {m: ThreadPoolExecutor(max_workers=1, thread_name_prefix="export") for m in selector.mounts()}
+    pending = []
     try:
-        with open(log_path, "a") as f:
-            for entry in entries:
-                f.write(json.dumps(entry) + "\n")
-    except Exception as e:
-        log.error(f"Failed to append to {log_path}: {e}")
+        for src, rel_dir, size, mount in plan:
+            if mount is None:
+                pending.append((src, None, size, None))
+                continue
+            dst_dir = os.path.join(mount, rel_dir)
+            fut = writers[mount].submit(_timed_transfer, src, dst_dir, indexes[mount], selector, mount, size, progress)
+            pending.append((src, mount, size, fut))
+
+        futures = [fut for *_, fut in pending if fut is not None]
+        while wait(futures, timeout=PROGRESS_INTERVAL).not_done:
+            if publish:
+                publish()
+    finally:
+        for writer in writers.values():
+            writer.shutdown(wait=True)
+    progress.finished = True
+    selector.save()
+
+    results = []
+    for src, mount, size, fut in pending:
+        if fut is None:
+            results.append((src, None, size, "NO_SPACE", None, None, "no export drive has room"))
+        elif fut.exception() is not None:
+            log.error(f"Export of {src} to {mount} failed: {fut.exception()!r}")
+            results.append((src, mount, size, "IO_ERROR", None, None, str(fut.exception())))
+        else:
+            results.append((src, mount, size, *fut.result()))
+    return results
 
 
-def export_batch(backlog_dir, drive_root, rotate_seconds):
+def record_transfers(results, what, indexes=None):
     """
-    Export all eligible PCAPs from backlog to drive.
-    Returns (success_count, fail_count).
+    Log a striped batch and write its per-drive bookkeeping: each destination directory's
+    MANIFEST.txt (+ MERKLE.json, trees from the drive's index) and each drive's TRANSFER.LOG
+    only list what landed on that drive.
+    Returns (success_count, fail_count); files already on a drive, or left for the next drain
+    because the service is stopping, count as neither.
     """
-    pcaps = sorted(Path(backlog_dir).glob("*.pcap*"))
-    if not pcaps:
-        return (0, 0)
-
-    log.info(f"Found {len(pcaps)} PCAPs in backlog; starting export to {drive_root}")
-
-    # Organize by date
-    date_today = datetime.now().strftime("%Y%m%d")
-    dest_dir = os.path.join(drive_root, "pcap", date_today)
-
     success_count = 0
     fail_count = 0
-    transferred = []
-    transfer_log_entries = []
+    skip_count = 0
+    cancel_count = 0
+    manifests = {}
+    trees = {}
+    transfer_log_entries = {}
+
+    for src, mount, size, result, sha, dst, error in results:
+        name = os.path.basename(src)
+        if result == "CANCELLED":
+            cancel_count += 1
+            continue
+        if mount:
+            transfer_log_entries.setdefault(mount, []).append(transfer_log_entry(src, dst, size, sha, result))
+        if result == "OK":
+            log.info(f"Exported {name} → {dst} (sha256={sha[:8]})")
+            success_count += 1
+            _counters["verify_ok"] += 1
+            _counters["exported_bytes"] += size
+        elif result == "SKIP_EXISTS":
+            log.info(f"Already on drive: {name} (sha256={sha[:8]})")
+            skip_count += 1
+            _counters["skipped"] += 1
+        elif result == "NO_SPACE":
+            fail_count += 1
+        else:
+            log.error(f"Failed to export {what} {name}: {error}")
+            fail_count += 1
+            _counters["verify_fail" if result == "VERIFY_FAIL" else "io_error"] += 1
+        if result in ("OK", "SKIP_EXISTS"):
+            manifests.setdefault(os.path.dirname(dst), []).append((os.path.basename(dst), sha))
+            leaves = indexes[mount].pop_tree(dst) if indexes and indexes.get(mount) else None
+            if leaves is not None:
+                trees.setdefault(os.path.dirname(dst), {})[os.path.basename(dst)] = leaves
+
+    if skip_count:
+        log.info(f"Skipped {skip_count} {what} files already present on drive")
+    if cancel_count:
+        log.info(f"Stopping: {cancel_count} {what} files left for the next drain (partial copies resume)")
+
+    with span("manifest"):
+        # Merge this batch into each directory's manifest; append to each drive's transfer log
+        write_records(manifests, trees, transfer_log_entries)
+
+    return (success_count, fail_count)
 
-    for pcap in pcaps:
-        pcap_path = str(pcap)
 
+def backlog_jobs(index, rotate_seconds):
+    """
+    Eligible backlog PCAPs as (src, rel_dir) jobs, under pcap/<capture day> on the drive (a fixed
+    path per file, so resumes and skips find it on a later day too). Taken from the backlog's
+    DirIndex (seer_backlog.py), which leaves out dotfiles and .tmp/.part leftovers; a coalesced
+    segment brings its .idx sub-index along.
+    """
+    now = time.time()
+    jobs = []
+    for name, (_size, mtime) in sorted(index.files.items()):
         # Skip active files
-        if is_file_active(pcap_path, rotate_seconds):
-            log.debug(f"Skipping active file: {pcap.name}")
+        if name in index.open or now - mtime < rotate_seconds * 1.5:
+            log.debug(f"Skipping active file: {name}")
             continue
+        rel_dir = os.path.join("pcap", capture_day(name, mtime))
+        jobs.append((str(index.path / name), rel_dir))
+        idx = index.path / sidecar(name)
+        if idx.is_file():
+            jobs.append((str(idx), rel_dir))
+    return jobs
 
-        # Transfer with verification
-        success, sha, error = transfer_file(pcap_path, dest_dir, verify=True)
-
-        entry = {
-            "ts": datetime.now().isoformat(),
-            "hostname": os.uname().nodename,
-            "src": pcap_path,
-            "dst": os.path.join(dest_dir, pcap.name),
-            "size": pcap.stat().st_size if pcap.exists() else 0,
-            "sha256": sha[:16] if sha else None,
-            "result": "OK" if success else "VERIFY_FAIL" if "mismatch" in (error or "") else "IO_ERROR",
-        }
-        transfer_log_entries.append(entry)
 
-        if success:
-            log.info(f"Exported {pcap.name} → {dest_dir} (sha256={sha[:8]})")
-            transferred.append((pcap.name, sha))
-            success_count += 1
-        else:
-            log.error(f"Failed to export {pcap.name}: {error}")
-            fail_count += 1
+def discard_stale_parts(mount, keep):
+    """
+    Delete partial copies (.part and its .progress) under <mount>/pcap/ that nothing will resume:
+    no file of that name in keep (backlog and ring names) and untouched for STALE_PART_SECONDS
+    (a mover copy of a file that closed after keep was listed is still fresh). Returns (files, bytes).
+    """
+    now = time.time()
+    parts = {}
+    for path in Path(mount).glob(f"pcap/*/*{PART_SUFFIX}*"):
+        if path.name.endswith((PART_SUFFIX, PART_SUFFIX + ".progress")):
+            parts.setdefault(str(path).removesuffix(".progress").removesuffix(PART_SUFFIX), []).append(path)
+    files = freed = 0
+    for dst, paths in parts.items():
+        try:
+            stats = [p.stat() for p in paths]
+        except OSError:
+            continue
+        if os.path.basename(dst) in keep or now - max(st.st_mtime for st in stats) < STALE_PART_SECONDS:
+            continue
+        discard_part(dst)
+        files += 1
+        freed += sum(st.st_size for st in stats)
+    return (files, freed)
 
-    # Write manifest for this batch
-    if transferred:
-        write_manifest(dest_dir, transferred)
 
-    # Append to transfer log on drive
-    if transfer_log_entries:
-        append_transfer_log(drive_root, transfer_log_entries)
+def rollup_jobs(rollup_dir):
+    """Compacted Zeek rollups (see seer_rollup.py) as jobs for zeek/YYYYmmdd/<log>/ on the drive."""
+    parts = sorted(p for p in Path(rollup_dir).glob("*/*/*") if p.suffix in (".scol", ".parquet"))
+    return [(str(part), os.path.join("zeek", part.parent.name, part.parent.parent.name)) for part in parts]
 
-    return (success_count, fail_count)
 
+def export_batch(jobs, selector, indexes, order="oldest", publish=None):
+    """
+    Plan and run one export across the selector's drives. jobs maps a label ("PCAP", "rollup")
+    to its (src, rel_dir) list; everything is planned together so the ETA covers the whole drain.
+    publish(progress_snapshot) is called as the export advances.
+    Returns ({label: (success_count, fail_count)}, final progress snapshot or None).
+    """
+    kinds = {src: what for what, items in jobs.items() for src, _rel_dir in items}
+    if not kinds:
+        return ({}, None)
+
+    plan = plan_export([job for items in jobs.values() for job in items], selector, order)
+    progress = ExportProgress(plan, selector)
+    snap = progress.snapshot()
+    log.info(
+        f"Export plan: {snap['files']} files, {snap['planned_bytes'] // (1024**2)} MB to "
+        f"{', '.join(selector.mounts())}, ETA {snap['eta_seconds']}s"
+    )
+    if progress.unplanned:
+        log.warning(
+            f"{snap['unplanned_files']} files ({snap['unplanned_bytes'] // (1024**2)} MB) "
+            "do not fit on the attached drives; leaving them in place"
+        )
+
+    if publish:
+        publish(snap)
+    results = stripe_transfers(plan, selector, indexes, progress, publish and (lambda: publish(progress.snapshot())))
+
+    by_kind = {what: [] for what in jobs}
+    for r in results:
+        by_kind[kinds[r[0]]].append(r)
+    counts = {what: record_transfers(rs, what, indexes) for what, rs in by_kind.items() if rs}
+    return (counts, progress.snapshot())
 
-def update_state(drive_present, last_export_ts, total_exported):
-    """Update persistent state file."""
+
+def update_state(drives, last_export_ts, total_exported, export=None):
+    """
+    Update persistent state file (atomic; the console polls it). `export` is the current or last
+    export's progress; drives are safe to remove once it is done (all copies fsynced).
+    Unchanged state is only rewritten every STATE_HEARTBEAT seconds; each write carries the current
+    span timings ("perf") and the shaper's rate ("io"), which do not count as a change.
+    """
     state = {
-        "drive_present": drive_present,
+        "drive_present": bool(drives),
+        "drives": drives,
         "last_export_ts": last_export_ts,
         "total_exported": total_exported,
-        "updated": datetime.now().isoformat(),
+        "export": export,
+        "safe_to_remove": bool(drives) and (export or {}).get("state") != "copying",
+        "counters": dict(_counters),
     }
+    body = json.dumps(state, sort_keys=True)
+    now = time.monotonic()
+    if body == _last_state["body"] and now - _last_state["ts"] < STATE_HEARTBEAT:
+        return
+    state["updated"] = datetime.now().isoformat()
+    state["perf"] = perf.snapshot()
+    state["io"] = _shaper.snapshot() if _shaper else None
     try:
         os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
-        with open(STATE_FILE, "w") as f:
+        tmp = STATE_FILE + ".tmp"
+        with span("state_write"), open(tmp, "w") as f:
             json.dump(state, f, indent=2)
+        os.replace(tmp, STATE_FILE)
+        _last_state.update(body=body, ts=now)
     except Exception as e:
         log.warning(f"Failed to write state file {STATE_FILE}: {e}")
 
 
-def main_loop():
-    """Main hotswap monitoring loop."""
-    cfg = read_config()
-    backlog_dir = cfg.get("backlog_dir", "/opt/seer/var/backlog")
-    rotate_seconds = cfg.get("capture", {}).get("rotate_seconds", 20)
-    mount_candidates = cfg.get("export", {}).get(
-        "mount_candidates", ["/mnt/seer_external", "/mnt/SEER_EXT", "/media/seer_external"]
-    )
-    min_free_pct = cfg.get("export", {}).get("min_free_pct", 2)
-    poll_interval = cfg.get("export", {}).get("poll_interval", 2)
-
-    log.info("SEER hotswap service started")
-    log.info(f"  Backlog: {backlog_dir}")
-    log.info(f"  Mount candidates: {', '.join(mount_candidates)}")
-    log.info(f"  Poll interval: {poll_interval}s")
-
-    total_exported = 0
-    last_drive_state = False
+def enforce_backlog(backlog):
+    """
+    Apply pending backlog events, the budget and coalescing; summarise any decisions in the journal.
+    Stops early (rewrite pool killed, partial outputs removed) once the service is stopping.
+    """
+    with span("backlog"):
+        backlog.sync()
+        entries = backlog.enforce(_cancel)
+    with span("coalesce"):
+        merged = backlog.coalesce(stop=_cancel)
+    if merged:
+        segments = len({e["dst"] for e in merged})
+        log.info(f"Backlog coalesced: {len(merged)} PCAPs into {segments} segment(s)")
+    if entries:
+        freed = sum(e["size"] - e["size_after"] for e in entries)
+        results = ", ".join(f"{n} {r.lower()}" for r, n in Counter(e["result"] for e in entries).items())
+        log.warning(
+            f"Backlog over {entries[0]['reason']}: {results}, {freed // (1024**2)} MB freed "
+            f"(oldest {os.path.basename(entries[0]['src'])}); see {backlog.log_path}"
+        )
+
+
+class HotswapService:
+    """
+    The export service as asyncio tasks on one event loop:
+    - detect: backlog budget/coalescing, drive detection, then waits for a mount/backlog event
+      (MountWatcher.wait on a thread; a self-pipe wakes it early)
+    - export: at most one drain at a time, file I/O on the per-drive writer threads; detection and
+      state keep running while it copies, and a drive added meanwhile gets the next drain
+    - state: writes the state file whenever something changed (at least every STATE_HEARTBEAT)
+    - SIGTERM/SIGINT: in-flight copies checkpoint their .part at the next chunk, manifests and
+      TRANSFER.LOG are written for what landed, then the tasks are cancelled
+    """
 
-    while True:
+    def __init__(self, cfg):
+        global _shaper
+        export = cfg.get("export", {})
+        self.backlog_dir = cfg.get("backlog_dir", "/opt/seer/var/backlog")
+        self.rollup_dir = cfg.get("rollup_dir", "/var/seer/rollup")
+        self.ring_dir = cfg.get("ring_dir", "/var/seer/pcap_ring")
+        self.rotate_seconds = cfg.get("capture", {}).get("rotate_seconds", 20)
+        self.mount_candidates = export.get(
+            "mount_candidates", ["/mnt/seer_external", "/mnt/SEER_EXT", "/media/seer_external"]
+        )
+        self.min_free_pct = export.get("min_free_pct", 2)
+        self.poll_interval = export.get("poll_interval", 2)
+        self.plan_order = export.get("plan_order", "oldest")
+        # With mount events, rescan only to catch drives filling up past min_free_pct
+        self.rescan_interval = export.get("rescan_interval", 30)
+        # Besides mount_candidates: any mount under these roots whose volume label matches
+        self.discover_roots = export.get("discover_roots", ["/mnt", "/media"])
+        self.label_patterns = export.get("label_patterns", ["SEER", "EXT"])
+        self.watcher = MountWatcher()
+        self.inventory = DriveInventory()
+        # Before any thread starts, so writer threads and rewrite workers inherit the I/O class
+        _shaper, self.io_desc = seer_io.configure(cfg, self.ring_dir)
+        # Backlog budget; its directory events wake the detect task like mount events do
+        backlog_policy = cfg.get("backlog_policy", "drop")
+        if backlog_policy not in POLICIES:
+            log.error(f"Unknown backlog_policy {backlog_policy!r} (expected {', '.join(POLICIES)}); using drop")
+            backlog_policy = "drop"
+        self.backlog = BacklogManager(
+            self.backlog_dir,
+            max_bytes=cfg.get("backlog_max_bytes", 0),
+            hard_pct=cfg.get("capture", {}).get("disk_hard_pct", 90),
+            policy=backlog_policy,
+            snaplen=cfg.get("backlog_snaplen", 68),
+            cpu_budget=cfg.get("backlog_cpu_budget", 0.5),
+            segment_seconds=cfg.get("backlog_coalesce_seconds", 0),
+        )
+        self.watcher.watch(self.backlog.fileno())
+        self._wake_r, self._wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self.watcher.watch(self._wake_r)
+
+        self.total_exported = 0
+        self.last_export_ts = None
+        self.export_status = None
+        self.mounts = []
+        # Export session: mount -> drive identity pinned when the drive was first seen
+        self.session = {}
+        self.drain_pending = False
+        self.refresh_inventory = False
+        self.export_task = None
+        self.stop_started = None
+
+    def wake(self):
+        """Return the detect task from its wait (any thread)."""
         try:
-            # Detect external drive
-            drive_path, free_bytes = detect_export_target(mount_candidates, min_free_pct)
-            drive_present = drive_path is not None
-
-            # Drive state transition: absent → present
-            if drive_present and not last_drive_state:
-                log.info(f"Drive detected: {drive_path} (free: {free_bytes // (1024**2)} MB)")
-
-                # Drain backlog to drive
-                success, fail = export_batch(backlog_dir, drive_path, rotate_seconds)
-                total_exported += success
-
-                if success > 0:
-                    log.info(f"Backlog drained: {success} PCAPs exported, {fail} failed")
-
-                # Update state to show drive present
-                update_state(True, datetime.now().isoformat() if success > 0 else None, total_exported)
-
-            # Drive state transition: present → absent
-            elif not drive_present and last_drive_state:
-                log.info("Drive removed; mover will now stage to backlog")
-                update_state(False, None, total_exported)
-
-            # Drive remains present - update state to keep it current
-            elif drive_present and last_drive_state:
-                update_state(True, None, total_exported)
-
-            last_drive_state = drive_present
-            time.sleep(poll_interval)
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # already pending
+
+    def stop(self, signum):
+        if self.stopping.is_set():
+            return
+        log.info(f"Received {signal.Signals(signum).name}; stopping after in-flight copies checkpoint")
+        self.stop_started = time.monotonic()
+        _cancel.set()
+        self.stopping.set()
+        self.wake()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.dirty = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.stop, signum)
+
+        log.info("SEER hotswap service started")
+        log.info(
+            f"  Backlog: {self.backlog_dir} (policy {self.backlog.policy}, "
+            f"max {self.backlog.max_bytes // (1024**2) or '-'} MB, {self.backlog.workers} rewrite workers)"
+        )
+        log.info(f"  Mount candidates: {', '.join(self.mount_candidates)}")
+        log.info(f"  Export I/O: {self.io_desc}")
+        if self.watcher.event_driven:
+            log.info(f"  Drive detection: mount events (rescan every {self.rescan_interval}s)")
+        else:
+            log.info(f"  Poll interval: {self.poll_interval}s")
+
+        tasks = [asyncio.create_task(self.detect(), name="detect"), asyncio.create_task(self.state(), name="state")]
+        await self.stopping.wait()
+        if self.export_task:
+            await self.export_task
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        update_state(self.mounts, self.last_export_ts, self.total_exported, self.export_status)
+        log.info(f"Stopped in {time.monotonic() - self.stop_started:.2f}s")
+
+    async def state(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # A timer rather than wait_for(): that can swallow the cancel when both land together
+            heartbeat = loop.call_later(STATE_HEARTBEAT, self.dirty.set)
+            await self.dirty.wait()
+            heartbeat.cancel()
+            self.dirty.clear()
+            update_state(self.mounts, self.last_export_ts, self.total_exported, self.export_status)
+
+    async def detect(self):
+        timeout = self.rescan_interval if self.watcher.event_driven else self.poll_interval
+        while not self.stopping.is_set():
+            try:
+                await self.detect_pass()
+            except Exception as e:
+                log.error(f"Error in detection: {e}", exc_info=True)
+            if await asyncio.to_thread(self.watcher.wait, timeout):
+                self.refresh_inventory = True
+            try:
+                os.read(self._wake_r, 4096)
+            except BlockingIOError:
+                pass
+
+    def _targets(self):
+        """Every usable external drive (configured or discovered by label)."""
+        if self.refresh_inventory:
+            self.refresh_inventory = False
+            self.inventory.refresh()
+        with span("detect"):
+            candidates = self.inventory.candidates(self.mount_candidates, self.discover_roots, self.label_patterns)
+            return list_export_targets(candidates, self.min_free_pct, self.inventory)
+
+    async def detect_pass(self):
+        if self.export_task is None:
+            await asyncio.to_thread(enforce_backlog, self.backlog)
+        else:
+            self.backlog.sync()  # keep the index current; the budget waits for the drain
+
+        targets = await asyncio.to_thread(self._targets)
+        mounts = [t["mount"] for t in targets]
+        ids = {t["mount"]: drive_id(t) for t in targets}
+        added = [m for m in mounts if self.session.get(m) != ids[m]]
+        gone = [m for m in self.session if m not in ids]
+        for m in added:
+            if m in self.session:
+                log.warning(f"Drive at {m} changed ({self.session[m]} -> {ids[m]}); starting a new export session")
+        self.session = ids
+        self.mounts = mounts
+
+        if gone:
+            log.info(f"Drive removed or full: {', '.join(gone)}")
+            if not mounts:
+                log.info("No export drive left; mover will now stage to backlog")
+                self.export_status = None
+        # A drive appeared: drain backlog across everything that is present (after any running drain)
+        if added:
+            self.drain_pending = True
+        if self.drain_pending and mounts and self.export_task is None and not self.stopping.is_set():
+            self.drain_pending = False
+            self.export_task = asyncio.create_task(self.export(targets, added), name="export")
+        self.dirty.set()
+
+    def _drain(self, targets, added, pcaps, backlog, publish):
+        """One export of the backlog and rollups (writer threads); runs off the event loop."""
+        selector = DriveSelector(targets, self.min_free_pct)
+        for t in targets:
+            if t["mount"] in added:
+                bps = selector.probe(t["mount"])
+                speed = f"{bps / 1024**2:.0f} MB/s" if bps else "unknown"
+                label = f"{t['label'] or '-'} uuid={t['uuid'] or t['dev']}"
+                log.info(f"Drive detected: {t['mount']} [{label}] (free: {t['free'] // (1024**2)} MB, write: {speed})")
+        # Resumes partial copies and skips files already there (per-drive index)
+        indexes = {t["mount"]: DriveIndex(t["mount"]) for t in targets}
+        try:
+            keep = backlog | set(os.listdir(self.ring_dir))
+        except OSError:
+            keep = None  # can't tell what the mover may still resume
+        for t in targets if keep is not None else ():
+            files, freed = discard_stale_parts(t["mount"], keep)
+            if files:
+                log.info(f"Discarded {files} stale partial copies ({freed // (1024**2)} MB) on {t['mount']}")
+        jobs = {"PCAP": pcaps, "rollup": rollup_jobs(self.rollup_dir)}
+        return export_batch(jobs, selector, indexes, self.plan_order, publish)
+
+    def _progress(self, snapshot):
+        self.export_status = snapshot
+        self.dirty.set()
+
+    async def export(self, targets, added):
+        loop = asyncio.get_running_loop()
+
+        def publish(snapshot):
+            loop.call_soon_threadsafe(self._progress, snapshot)
 
-        except KeyboardInterrupt:
-            log.info("Received interrupt; shutting down")
-            break
+        try:
+            # The backlog index is only touched on the event loop (detect_pass syncs it meanwhile)
+            pcaps = backlog_jobs(self.backlog.index, self.rotate_seconds)
+            backlog = set(self.backlog.index.files)
+            counts, status = await asyncio.to_thread(self._drain, targets, added, pcaps, backlog, publish)
+            self.export_status = status or self.export_status
+            success, fail = counts.get("PCAP", (0, 0))
+            self.total_exported += success
+            if success > 0:
+                self.last_export_ts = datetime.now().isoformat()
+                log.info(f"Backlog drained: {success} PCAPs exported, {fail} failed")
+            r_success, r_fail = counts.get("rollup", (0, 0))
+            if r_success or r_fail:
+                log.info(f"Rollups exported: {r_success} parts, {r_fail} failed")
+            # Final snapshot (state "done") marks the drives safe to remove
+            if status and not _cancel.is_set():
+                log.info("Export plan finished; drives are safe to remove")
         except Exception as e:
-            log.error(f"Error in main loop: {e}", exc_info=True)
-            time.sleep(poll_interval)
+            log.error(f"Error in export: {e}", exc_info=True)
+        finally:
+            self.export_task = None
+            self.dirty.set()
+            self.wake()  # a drive added meanwhile gets its drain now
 
 
 def main():
     """Entry point."""
+    parser = argparse.ArgumentParser(description="SEER hot-swap export service")
+    parser.add_argument(
+        "--profile", action="store_true", help=f"Record cProfile/tracemalloc; dumped to {perf.PERF_DIR} on SIGUSR1/exit"
+    )
+    args = parser.parse_args()
+
+    setup_logging()
     if not acquire_lock():
         sys.exit(1)
 
+    perf.install("hotswap", log)
+    if args.profile:
+        perf.start_profile("hotswap")
+        log.info(f"Profiling enabled; send SIGUSR1 to dump to {perf.PERF_DIR}")
     try:
-        main_loop()
+        asyncio.run(HotswapService(read_config()).run())
     finally:
+        if args.profile:
+            perf.dump("hotswap")
         release_lock()
 
 
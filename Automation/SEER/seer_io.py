@@ -0,0 +1,184 @@
+"""
+SEER background I/O priority and bandwidth shaping (shared by the exporter, seer_hotswap.py, and the
+mover, move_oldest.py), so evacuating the ring never starves tcpdump/Zeek writes on the same SSD
+- set_ioprio(): the process's I/O scheduling class (ioprio_set). "idle" only gets the disk when
+  nothing else wants it; "best-effort" levels 0 (high) to 7 (low). Threads started later inherit it
+- CaptureRate: the capture write rate, from how much the ring's files grew between samples (the
+  first estimate comes from the ring's sizes and mtimes); no hooks into tcpdump needed
+- Shaper: one token bucket for all copy threads of a process. Every ADAPT_SECONDS its rate is reset
+  to io.disk_mbps minus the capture rate x (1 + io.headroom_pct), never below io.min_mbps, so a
+  drain uses the spare bandwidth and backs off as soon as capture speeds up
+- seer_copy.copy_resumable() meters its source reads through the shaper (verify re-reads come from
+  the export drive, not the SSD); waits are timed as the "throttle" span (seer_perf.py)
+"""
+
+import ctypes
+import logging
+import os
+import platform
+import threading
+import time
+
+import seer_perf as perf
+
+log = logging.getLogger("seer-io")
+
+IOPRIO_CLASSES = {"none": 0, "best-effort": 2, "idle": 3}  # realtime (1) is never right for background copies
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+# ioprio_set syscall numbers (no libc wrapper)
+SYS_IOPRIO_SET = {"x86_64": 251, "aarch64": 30, "armv7l": 314, "armv6l": 314, "i686": 289, "i386": 289}
+
+ADAPT_SECONDS = 1.0  # how often the shaper re-measures capture and resets its rate
+BURST_SECONDS = 0.25  # bucket depth: a copy may run this far ahead of the rate
+MIN_RATE_BPS = 64 * 1024  # the rate never reaches 0: a drain under full capture load still crawls
+DEFAULT_MIN_MBPS = 4
+MB = 1024**2
+
+
+def set_ioprio(ioclass="idle", level=7):
+    """Set this process's I/O class ("none" leaves it alone). Returns True if the kernel accepted it."""
+    cls = IOPRIO_CLASSES.get(ioclass)
+    if cls is None:
+        raise ValueError(f"unknown io.class {ioclass!r} (expected {', '.join(IOPRIO_CLASSES)})")
+    if cls == 0:
+        return False
+    nr = SYS_IOPRIO_SET.get(platform.machine())
+    if nr is None:
+        return False
+    libc = ctypes.CDLL(None, use_errno=True)
+    value = (cls << IOPRIO_CLASS_SHIFT) | (0 if cls == 3 else max(0, min(7, int(level))))
+    if libc.syscall(nr, IOPRIO_WHO_PROCESS, 0, value) != 0:
+        log.warning(f"ioprio_set({ioclass}, {level}) failed: {os.strerror(ctypes.get_errno())}")
+        return False
+    return True
+
+
+class CaptureRate:
+    """Bytes/sec being written into ring_dir: per-file growth between samples, smoothed (EWMA)."""
+
+    ALPHA = 0.5
+
+    def __init__(self, ring_dir):
+        self.ring_dir = ring_dir
+        self.sizes = None
+        self.ts = None
+        self.bps = 0.0
+
+    def _scan(self):
+        sizes, mtimes = {}, []
+        try:
+            with os.scandir(self.ring_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".pcap") and entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        sizes[entry.name] = st.st_size
+                        mtimes.append((st.st_mtime, st.st_size))
+        except FileNotFoundError:
+            pass
+        return sizes, mtimes
+
+    def sample(self, now=None):
+        now = time.monotonic() if now is None else now
+        sizes, mtimes = self._scan()
+        if self.sizes is None:
+            # First look: the ring holds the last few rotations; everything after the oldest
+            # file's close was written in (newest mtime - oldest mtime)
+            mtimes.sort()
+            span = mtimes[-1][0] - mtimes[0][0] if len(mtimes) > 1 else 0
+            self.bps = sum(size for _m, size in mtimes[1:]) / span if span > 0 else 0.0
+        elif now > self.ts:
+            # Files the mover took away don't count; new files count whole
+            grown = sum(max(0, size - self.sizes.get(name, 0)) for name, size in sizes.items())
+            self.bps += self.ALPHA * (grown / (now - self.ts) - self.bps)
+        self.sizes, self.ts = sizes, now
+        return self.bps
+
+
+class Shaper:
+    """
+    Token bucket shared by a process's copy threads. take(n) blocks until n bytes may move.
+    With a CaptureRate the rate follows the capture load every ADAPT_SECONDS (see module docstring);
+    without one it stays at disk_bps (a fixed cap). disk_bps 0 = unlimited. min_bps is at least
+    MIN_RATE_BPS, so capture at or above disk_bps slows copies to a crawl but never stops them.
+    waited() is the calling thread's total wait, so copy timings that feed drive speed estimates
+    can leave it out.
+    """
+
+    def __init__(self, disk_bps, min_bps=0, headroom=0.25, capture=None):
+        self.disk_bps = disk_bps
+        self.min_bps = max(MIN_RATE_BPS, min_bps)
+        self.headroom = headroom
+        self.capture = capture
+        self.capture_bps = 0.0
+        self.rate = disk_bps
+        self.throttled = 0.0
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._adapted = 0.0
+        self._local = threading.local()
+
+    def _adapt(self, now):
+        self._adapted = now
+        self.capture_bps = self.capture.sample(now)
+        self.rate = max(self.min_bps, self.disk_bps - self.capture_bps * (1 + self.headroom))
+
+    def take(self, n, stop=None):
+        if not self.disk_bps:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self.capture and now - self._adapted >= ADAPT_SECONDS:
+                self._adapt(now)
+            rate = self.rate
+            self._tokens = min(rate * BURST_SECONDS, self._tokens + (now - self._last) * rate) - n
+            self._last = now
+            # Debt is paid by sleeping; later callers queue behind it
+            delay = -self._tokens / rate if self._tokens < 0 else 0.0
+            self.throttled += delay
+        if delay > 0:
+            self._local.waited = self.waited() + delay
+            perf.observe("throttle", delay)
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                time.sleep(delay)
+
+    def waited(self):
+        return getattr(self._local, "waited", 0.0)
+
+    def snapshot(self):
+        return {
+            "rate_mbps": round(self.rate / MB, 1) if self.disk_bps else None,
+            "capture_mbps": round(self.capture_bps / MB, 1),
+            "throttled_s": round(self.throttled, 1),
+        }
+
+
+def configure(cfg, ring_dir):
+    """
+    Apply seer.yml `io` to this process: set_ioprio(io.class, io.level), and a Shaper following the
+    capture rate in ring_dir (None when io.disk_mbps is 0). Returns (shaper, one-line description).
+    """
+    io = cfg.get("io", {})
+    ioclass = io.get("class", "idle")
+    level = io.get("level", 7)
+    try:
+        applied = set_ioprio(ioclass, level)
+    except ValueError as e:
+        log.error(f"{e}; leaving I/O priority unchanged")
+        ioclass, applied = "none", False
+    what = ioclass if ioclass in ("none", "idle") else f"{ioclass}/{level}"
+    desc = f"ioprio {what}" if applied or ioclass == "none" else f"ioprio {what} (not applied)"
+
+    disk_mbps = float(io.get("disk_mbps", 200))
+    if disk_mbps <= 0:
+        return None, desc + ", unshaped"
+    min_mbps = float(io.get("min_mbps", DEFAULT_MIN_MBPS))
+    if min_mbps <= 0:
+        log.error(f"io.min_mbps must be > 0 (got {min_mbps:g}); using {DEFAULT_MIN_MBPS}")
+        min_mbps = DEFAULT_MIN_MBPS
+    headroom = float(io.get("headroom_pct", 25)) / 100
+    shaper = Shaper(disk_mbps * MB, min_mbps * MB, headroom, CaptureRate(ring_dir))
+    return shaper, desc + f", shaped to {disk_mbps:g} MB/s - capture x {1 + headroom:g} (min {min_mbps:g} MB/s)"
@@ -0,0 +1,154 @@
+"""
+SEER export drive bookkeeping, shared by the exporter (seer_hotswap.py) and the mover (move_oldest.py)
+- MANIFEST.txt per destination directory (sha256sum format), merged with earlier batches; its header
+  carries the directory's Merkle root
+- MERKLE.json next to it: the 4 MiB chunk hash trees (seer_hash.MERKLE_LEAF) of verified copies,
+  taken from seer_copy.DriveIndex.pop_tree()
+- TRANSFER.LOG at the drive root: one JSON line per transfer, failures included
+- Both processes write into the same pcap/YYYYmmdd directories: a directory's manifest and tree are
+  rewritten under an flock on the directory, so a mover run and a drain never drop each other's entries
+- seer_verify_drive.py checks a drive against all three
+"""
+
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from seer_hash import MERKLE_LEAF, merkle_root
+
+log = logging.getLogger("seer-manifest")
+
+MANIFEST_FILE = "MANIFEST.txt"
+MERKLE_FILE = "MERKLE.json"  # per-directory chunk hash trees next to MANIFEST.txt
+TRANSFER_LOG = "TRANSFER.LOG"
+
+
+@contextmanager
+def _dir_lock(directory):
+    """Exclusive flock on the directory itself (no lock file for seer_verify_drive to trip over)."""
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _write_json_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_merkle(directory, entries, trees):
+    """
+    Merge chunk hash trees into MERKLE.json in directory and return the directory's root:
+    {"leaf_bytes", "root", "files": {name: {"sha256", "size", "root", "leaves"}}}. `root` is
+    merkle_root() over every manifest entry's sha256 in name order (so one comparison confirms
+    the whole day); files exported without a verify pass have no tree but still count in it.
+    """
+    path = os.path.join(directory, MERKLE_FILE)
+    try:
+        with open(path) as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+    kept = old.get("files", {}) if old.get("leaf_bytes") == MERKLE_LEAF else {}
+    files = {}
+    for fname, sha in entries.items():
+        if fname in trees:
+            leaves = trees[fname]
+            try:
+                size = os.path.getsize(os.path.join(directory, fname))
+            except OSError:
+                continue
+            files[fname] = {"sha256": sha, "size": size, "root": merkle_root(leaves), "leaves": leaves}
+        elif kept.get(fname, {}).get("sha256") == sha:
+            files[fname] = kept[fname]
+    root = merkle_root([entries[fname] for fname in sorted(entries)])
+    _write_json_atomic(path, {"leaf_bytes": MERKLE_LEAF, "root": root, "files": files})
+    return root
+
+
+def write_manifest(directory, files_with_hashes, trees=None):
+    """
+    Merge sha256 checksums into MANIFEST.txt in directory (earlier batches are kept), after
+    merging `trees` ({filename: leaf hashes}) into MERKLE.json; the manifest header carries the
+    directory's Merkle root. Returns the root, or None when the manifest could not be written.
+    """
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with _dir_lock(directory):
+            entries = {}
+            try:
+                with open(manifest_path) as f:
+                    for line in f:
+                        if line.startswith("#") or not line.strip():
+                            continue
+                        sha, _, fname = line.rstrip("\n").partition("  ")
+                        entries[fname] = sha
+            except FileNotFoundError:
+                pass
+            entries.update(dict(files_with_hashes))
+            root = write_merkle(directory, entries, trees or {})
+
+            tmp = manifest_path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write("# SEER PCAP Export Manifest\n")
+                f.write(f"# Generated: {datetime.now().isoformat()}\n")
+                f.write(f"# Merkle root: {root} ({MERKLE_FILE}, {MERKLE_LEAF // 1024**2} MiB leaves)\n")
+                f.write("# Format: sha256  filename\n\n")
+                for fname, sha in sorted(entries.items()):
+                    f.write(f"{sha}  {fname}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, manifest_path)
+        log.info(f"Wrote manifest: {manifest_path} ({len(entries)} files, Merkle root {root})")
+        return root
+    except Exception as e:
+        log.error(f"Failed to write manifest {manifest_path}: {e}")
+        return None
+
+
+def append_transfer_log(drive_root, entries):
+    """Append transfer entries to TRANSFER.LOG on the drive (one write, so concurrent appends don't interleave)."""
+    log_path = os.path.join(drive_root, TRANSFER_LOG)
+    try:
+        with open(log_path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+    except Exception as e:
+        log.error(f"Failed to append to {log_path}: {e}")
+        return False
+
+
+def transfer_log_entry(src, dst, size, sha, result):
+    return {
+        "ts": datetime.now().isoformat(),
+        "hostname": os.uname().nodename,
+        "src": src,
+        "dst": dst,
+        "size": size,
+        "sha256": sha[:16] if sha else None,
+        "result": result,
+    }
+
+
+def write_records(manifests, trees, transfer_logs):
+    """
+    Write one batch's bookkeeping: manifests {dest_dir: [(filename, sha256)]} with trees
+    {dest_dir: {filename: leaves}} into each directory's MANIFEST.txt/MERKLE.json, and
+    transfer_logs {drive_root: [transfer_log_entry()]} onto each drive's TRANSFER.LOG.
+    Returns the directories and drives that could not be written.
+    """
+    failed = [d for d, files in manifests.items() if write_manifest(d, files, trees.get(d)) is None]
+    failed += [m for m, entries in transfer_logs.items() if not append_transfer_log(m, entries)]
+    return failed
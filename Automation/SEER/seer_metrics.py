@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+SEER Metrics Exporter
+Serves sensor health and throughput as OpenMetrics text for a local scrape agent:
+- Listens on metrics.listen: "127.0.0.1:9477" (TCP) or "unix:/run/seer/metrics.sock"
+- Ring and backlog depth/bytes/age come from inotify-maintained indexes (seer_backlog.DirIndex): one
+  directory scan at start (and on queue overflow or every metrics.resync_interval), none per scrape
+- Evictions and eviction lag (close -> mover took it) are counted as the ring empties
+- Export bytes, verify_ok/verify_fail and each drive's measured write rate come from the hotswap state file
+  (re-read only when it changes)
+- Capture drops are the NIC's rx counters (sysfs); Zeek drops are summed from stats.log in json_spool
+- Service states come from the D-Bus unit watcher (seer_systemd.py); without a system bus, from one
+  batched `systemctl is-active`, cached for metrics.service_ttl seconds
+"""
+
+import json
+import logging
+import os
+import select
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import seer_config
+import seer_systemd
+from seer_backlog import IN_DELETE_SELF, IN_IGNORED, IN_MOVE_SELF, IN_Q_OVERFLOW, DirIndex, Inotify
+from seer_perf import BUCKETS
+from seer_zeeklog import LogTail
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+log = logging.getLogger("seer-metrics")
+
+CONFIG_PATH = "/opt/seer/etc/seer.yml"
+HOTSWAP_STATE = "/var/log/seer/hotswap_state.json"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+NIC_STATS = ("rx_packets", "rx_bytes", "rx_dropped", "rx_missed_errors", "rx_fifo_errors")
+
+
+def read_config():
+    """Load seer.yml configuration."""
+    try:
+        return seer_config.load(CONFIG_PATH)
+    except Exception as e:
+        log.error(f"Failed to read config {CONFIG_PATH}: {e}")
+        return {}
+
+
+class ServiceStates:
+    """
+    Unit ActiveStates from the D-Bus watcher (seer_systemd; current on every scrape, no forks), or
+    without a system bus, systemctl is-active for all units in one call, cached for `ttl` seconds.
+    """
+
+    def __init__(self, units, ttl):
+        self.units = units
+        self.ttl = ttl
+        self.ts = 0.0
+        self.states = {}
+        self.watcher = seer_systemd.connect(units)
+
+    def get(self):
+        if self.watcher is not None:
+            try:
+                states = self.watcher.all_states()
+                return {u: states.get(u, "unknown") for u in self.units}
+            except (OSError, seer_systemd.DBusError) as e:
+                log.warning(f"Lost the system bus ({e}); polling systemctl")
+                self.watcher.close()
+                self.watcher = None
+        now = time.monotonic()
+        if now - self.ts >= self.ttl:
+            try:
+                r = subprocess.run(
+                    ["systemctl", "is-active", *self.units],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+                lines = r.stdout.split()
+            except OSError:
+                lines = []
+            self.states = {u: (lines[i] if i < len(lines) else "unknown") for i, u in enumerate(self.units)}
+            self.ts = now
+        return self.states
+
+
+class JsonFile:
+    """A JSON state file re-read only when its mtime changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.data = {}
+
+    def get(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self.mtime, self.data = None, {}
+            return self.data
+        if mtime != self.mtime:
+            try:
+                with open(self.path) as f:
+                    self.data = json.load(f)
+                self.mtime = mtime
+            except (OSError, ValueError):
+                pass  # mid-replace or torn; keep the last good copy
+        return self.data
+
+
+def read_nic(iface):
+    stats = {}
+    for name in NIC_STATS:
+        try:
+            with open(f"/sys/class/net/{iface}/statistics/{name}") as f:
+                stats[name] = int(f.read())
+        except (OSError, ValueError):
+            pass
+    return stats
+
+
+def escape_label(value):
+    """OpenMetrics label value escaping (mount paths may hold any byte but NUL)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Family:
+    """One OpenMetrics metric family being rendered."""
+
+    def __init__(self, out, name, mtype, help_text):
+        self.out = out
+        self.name = name
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {mtype}")
+
+    def sample(self, value, suffix="", **labels):
+        if value is None:
+            return
+        lbl = ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+        self.out.append(f"{self.name}{suffix}{{{lbl}}} {value}" if lbl else f"{self.name}{suffix} {value}")
+
+
+def histogram_samples(fam, h):
+    cumulative = 0
+    for bound, n in zip(BUCKETS, h.buckets):
+        cumulative += n
+        fam.sample(cumulative, "_bucket", le=f"{float(bound)}")
+    fam.sample(h.count, "_bucket", le="+Inf")
+    fam.sample(h.count, "_count")
+    fam.sample(round(h.total, 6), "_sum")
+
+
+class Collector:
+    """All incrementally maintained values; render() is what a scrape costs."""
+
+    def __init__(self, cfg):
+        mcfg = cfg.get("metrics", {}) or {}
+        self.lock = threading.Lock()
+        self.ring = DirIndex(cfg.get("ring_dir", "/var/seer/pcap_ring"))
+        self.backlog = DirIndex(cfg.get("backlog_dir", "/opt/seer/var/backlog"))
+        self.iface = cfg.get("interface", "enp2s0")
+        spool = Path(cfg.get("json_spool", "/var/seer/json_spool"))
+        self.zeek_stats = LogTail(spool / "stats.log", ("pkts_proc", "pkts_dropped"))
+        self.zeek = {"pkts_proc": 0, "pkts_dropped": 0}
+        self.hotswap = JsonFile(HOTSWAP_STATE)
+        units = [
+            f"seer-capture@{self.iface}.service",
+            f"seer-zeek@{self.iface}.service",
+            "seer-move-oldest.timer",
+            "seer-hotswap.service",
+            "seer-summary.service",
+        ]
+        self.services = ServiceStates(units, float(mcfg.get("service_ttl", 15)))
+        self.started = time.time()
+
+    def poll_zeek(self):
+        with self.lock:
+            for proc, dropped in self.zeek_stats.poll():
+                self.zeek["pkts_proc"] += proc or 0
+                self.zeek["pkts_dropped"] += dropped or 0
+
+    def render(self):
+        now = time.time()
+        out = []
+        with self.lock:
+            for label, idx in (("ring", self.ring), ("backlog", self.backlog)):
+                files, size, oldest = idx.totals()
+                Family(out, f"seer_{label}_files", "gauge", f"PCAP files in the {label}").sample(files)
+                Family(out, f"seer_{label}_bytes", "gauge", f"Bytes of PCAP in the {label}").sample(size)
+                Family(out, f"seer_{label}_oldest_age_seconds", "gauge", f"Age of the oldest {label} PCAP").sample(
+                    round(now - oldest, 1) if oldest else 0
+                )
+            Family(out, "seer_ring_evictions", "counter", "PCAPs moved out of the ring").sample(
+                self.ring.evictions, "_total"
+            )
+            histogram_samples(
+                Family(out, "seer_eviction_lag_seconds", "histogram", "Time a closed PCAP waited in the ring"),
+                self.ring.lag,
+            )
+            zeek = dict(self.zeek)
+        try:
+            vfs = os.statvfs(self.ring.path)
+            used = 1 - vfs.f_bavail / vfs.f_blocks if vfs.f_blocks else None
+        except OSError:
+            used = None
+        Family(out, "seer_ring_fs_used_ratio", "gauge", "Used fraction of the ring filesystem").sample(
+            round(used, 4) if used is not None else None
+        )
+
+        hs = self.hotswap.get()
+        counters = hs.get("counters") or {}
+        export = hs.get("export") or {}
+        copying = export.get("state") == "copying"
+        Family(out, "seer_export_drives", "gauge", "Export drives attached").sample(len(hs.get("drives") or []))
+        Family(out, "seer_export_in_progress", "gauge", "1 while an export is copying").sample(int(copying))
+        fam = Family(out, "seer_export_write_bytes_per_second", "gauge", "Measured export write rate per drive")
+        copy_bps = export.get("copy_bps") if copying else None
+        if isinstance(copy_bps, dict):
+            for mount, bps in sorted(copy_bps.items()):
+                fam.sample(bps, drive=mount)
+        Family(out, "seer_export_bytes", "counter", "Bytes exported to drives").sample(
+            counters.get("exported_bytes", 0), "_total"
+        )
+        fam = Family(out, "seer_export_files", "counter", "Export outcomes by result")
+        for result in ("verify_ok", "verify_fail", "io_error", "skipped"):
+            fam.sample(counters.get(result, 0), "_total", result=result)
+
+        nic = read_nic(self.iface)
+        for name, help_text in (
+            ("rx_packets", "Packets received on the capture interface"),
+            ("rx_bytes", "Bytes received on the capture interface"),
+            ("rx_dropped", "Packets dropped by the kernel/driver on the capture interface"),
+            ("rx_missed_errors", "Packets missed by the NIC (ring full) on the capture interface"),
+            ("rx_fifo_errors", "NIC FIFO overruns on the capture interface"),
+        ):
+            Family(out, f"seer_capture_{name}", "counter", help_text).sample(nic.get(name), "_total", iface=self.iface)
+
+        Family(out, "seer_zeek_packets_processed", "counter", "Packets processed by Zeek (stats.log)").sample(
+            zeek["pkts_proc"], "_total"
+        )
+        Family(out, "seer_zeek_packets_dropped", "counter", "Packets Zeek reports dropped (stats.log)").sample(
+            zeek["pkts_dropped"], "_total"
+        )
+
+        fam = Family(out, "seer_service_active", "gauge", "1 if the systemd unit is active")
+        for unit, state in self.services.get().items():
+            fam.sample(int(state == "active"), unit=unit)
+        Family(out, "seer_metrics_start_time_seconds", "gauge", "Exporter start time").sample(round(self.started))
+        out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+
+def make_handler(collector):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = collector.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass  # one line per scrape would flood the journal
+
+        def address_string(self):
+            return str(self.client_address) or "unix"
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def make_server(listen, handler):
+    if listen.startswith("unix:"):
+        path = listen[len("unix:") :]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        server = UnixHTTPServer(path, handler)
+        os.chmod(path, 0o660)
+        return server
+    host, _, port = listen.rpartition(":")
+    return ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+
+
+def main_loop():
+    cfg = read_config()
+    mcfg = cfg.get("metrics", {}) or {}
+    listen = str(mcfg.get("listen", "127.0.0.1:9477"))
+    poll_interval = float(mcfg.get("poll_interval", 5))
+    resync_interval = float(mcfg.get("resync_interval", 300))
+
+    collector = Collector(cfg)
+    indexes = (collector.ring, collector.backlog)
+    try:
+        inotify = Inotify()
+    except (OSError, AttributeError) as e:
+        inotify = None
+        log.warning(f"inotify unavailable ({e}); rescanning every {poll_interval}s instead")
+
+    def watch():
+        for idx in indexes:
+            if inotify is not None:
+                try:
+                    idx.watch(inotify)  # directories that did not exist yet are picked up later
+                except OSError as e:
+                    log.warning(str(e))
+
+    with collector.lock:
+        for idx in indexes:
+            idx.rescan()
+        watch()
+
+    server = make_server(listen, make_handler(collector))
+    threading.Thread(target=server.serve_forever, daemon=True, name="http").start()
+    log.info("SEER metrics exporter started")
+    log.info(f"  Listening: {listen}  ring: {collector.ring.path}  backlog: {collector.backlog.path}")
+
+    last_resync = time.monotonic()
+    next_poll = 0.0
+    while True:
+        try:
+            now = time.monotonic()
+            if now >= next_poll:
+                collector.poll_zeek()
+                with collector.lock:
+                    watch()
+                    resync = inotify is None or now - last_resync >= resync_interval
+                    if resync:
+                        for idx in indexes:
+                            idx.rescan()
+                if resync:
+                    last_resync = now
+                next_poll = now + poll_interval
+
+            if inotify is None:
+                time.sleep(max(0.0, next_poll - time.monotonic()))
+                continue
+            ready, _, _ = select.select([inotify.fd], [], [], max(0.0, next_poll - time.monotonic()))
+            if not ready:
+                continue
+            events = inotify.read()
+            by_wd = {idx.wd: idx for idx in indexes}
+            wall = time.time()
+            with collector.lock:
+                for wd, mask, name in events:
+                    if mask & IN_Q_OVERFLOW:
+                        log.warning("inotify queue overflow; rescanning")
+                        for idx in indexes:
+                            idx.rescan()
+                        continue
+                    idx = by_wd.get(wd)
+                    if idx is None:
+                        continue
+                    if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                        idx.wd = None  # directory went away; re-watched on the next poll
+                        continue
+                    idx.event(mask, name, wall)
+        except KeyboardInterrupt:
+            log.info("Received interrupt; shutting down")
+            break
+        except Exception as e:
+            log.error(f"Error in main loop: {e}", exc_info=True)
+            time.sleep(poll_interval)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main_loop()
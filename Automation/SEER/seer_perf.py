@@ -0,0 +1,245 @@
+"""
+SEER hot-path timing and opt-in profiling (shared by seer_hotswap.py, move_oldest.py, seer_console.py)
+- span(name) times a block into an in-memory histogram (count, sum, max, fixed buckets in seconds);
+  always on: two perf_counter() calls and a dict update per span, and spans wrap whole operations
+  (a file copy, a manifest write), never per-chunk work
+- install(name) dumps every histogram to PERF_DIR/<name>.json on SIGUSR1 (plus profiles when enabled)
+- start_profile(name) (--profile): cProfile and tracemalloc; a dump writes PERF_DIR/<name>-<ts>.prof
+  (pstats/snakeviz) and <name>-<ts>.mem.txt (top allocation sites). Worker threads are covered by
+  wrapping them in thread_profile()
+- cProfile/pstats/tracemalloc are imported only when profiling: every SEER tool imports this module,
+  and they would double the console's cold start
+- merge_into(path) folds a short-lived process's histograms into a persisted file (the mover runs once
+  per timer tick, so its spans accumulate across runs)
+"""
+
+import json
+import os
+import signal
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+PERF_DIR = os.environ.get("SEER_PERF_DIR", "/var/log/seer/perf")
+# Bucket upper bounds in seconds (an extra overflow bucket follows); Prometheus-style "le" semantics
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+TRACEMALLOC_TOP = 25
+
+_lock = threading.RLock()  # re-entrant: the SIGUSR1 dump can interrupt observe() on the main thread
+_hist = {}
+_profile = {"name": None, "main": None, "threads": []}
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds (capped at the observed max)."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self):
+        ms = 1000
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * ms, 3) if self.count else None,
+            "p50_ms": round(self.quantile(0.5) * ms, 3),
+            "p90_ms": round(self.quantile(0.9) * ms, 3),
+            "p99_ms": round(self.quantile(0.99) * ms, 3),
+            "max_ms": round(self.max * ms, 3),
+        }
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.total, "max": self.max, "buckets": list(self.buckets)}
+
+    def merge(self, d):
+        if len(d.get("buckets", ())) != len(self.buckets):
+            return  # bucket layout changed; drop the old counts
+        self.count += d["count"]
+        self.total += d["sum"]
+        self.max = max(self.max, d["max"])
+        self.buckets = [a + b for a, b in zip(self.buckets, d["buckets"])]
+
+
+def observe(name, seconds):
+    """Record one duration for span `name`."""
+    with _lock:
+        h = _hist.get(name)
+        if h is None:
+            h = _hist[name] = Histogram()
+        h.observe(seconds)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block into histogram `name` (recorded whether or not it raises)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0)
+
+
+def snapshot():
+    """{span: {count, total_s, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}} for the status surface."""
+    with _lock:
+        return {name: h.summary() for name, h in sorted(_hist.items())}
+
+
+def histograms():
+    """Raw histograms {span: {count, sum, max, buckets}} (bucket bounds in BUCKETS)."""
+    with _lock:
+        return {name: h.to_dict() for name, h in sorted(_hist.items())}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def dump(name):
+    """
+    Write PERF_DIR/<name>.json (span summaries and raw histograms) and, when profiling, the
+    cProfile/tracemalloc snapshots. Returns the paths written; failures are skipped, not raised.
+    """
+    written = []
+    path = os.path.join(PERF_DIR, f"{name}.json")
+    data = {"pid": os.getpid(), "ts": time.time(), "buckets": BUCKETS, "spans": snapshot(), "histograms": histograms()}
+    try:
+        _write_json(path, data)
+        written.append(path)
+    except OSError:
+        pass
+    return written + dump_profile()
+
+
+def dump_profile():
+    """Write the cProfile/tracemalloc snapshots taken so far (profiling keeps running)."""
+    if _profile["main"] is None:
+        return []
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(PERF_DIR, f"{_profile['name']}-{stamp}")
+    written = []
+    import pstats
+    import tracemalloc
+
+    main = _profile["main"]
+    main.disable()
+    try:
+        with _lock:
+            finished = list(_profile["threads"])
+        stats = pstats.Stats(main, *finished)
+        stats.dump_stats(base + ".prof")
+        written.append(base + ".prof")
+        if tracemalloc.is_tracing():
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]
+            current, peak = tracemalloc.get_traced_memory()
+            with open(base + ".mem.txt", "w") as f:
+                f.write(f"traced current={current} peak={peak}\n")
+                f.writelines(f"{stat}\n" for stat in top)
+            written.append(base + ".mem.txt")
+    except (OSError, TypeError):
+        pass  # TypeError: nothing profiled yet
+    finally:
+        main.enable()
+    return written
+
+
+def start_profile(name):
+    """Enable cProfile (this thread) and tracemalloc until the process exits; dump() writes them."""
+    import cProfile
+    import tracemalloc
+
+    os.makedirs(PERF_DIR, exist_ok=True)
+    tracemalloc.start()
+    prof = cProfile.Profile()
+    prof.enable()
+    _profile.update(name=name, main=prof)
+
+
+@contextmanager
+def thread_profile():
+    """Profile the enclosed block of a worker thread when --profile is on (no-op otherwise)."""
+    if _profile["main"] is None:
+        yield
+        return
+    import cProfile
+
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        # Python 3.12+: the main profiler already sees every thread
+        yield
+        return
+    try:
+        yield
+    finally:
+        prof.disable()
+        with _lock:
+            _profile["threads"].append(prof)
+
+
+def install(name, log=None):
+    """Dump on SIGUSR1 (logging where the files went). Call from the main thread."""
+
+    def handler(signum, frame):
+        paths = dump(name)
+        if log:
+            log.info(f"Perf dump: {', '.join(paths) or 'nothing written'}")
+
+    signal.signal(signal.SIGUSR1, handler)
+
+
+def merge_into(path):
+    """Add this process's histograms to the ones persisted at path (created if missing; untouched if none)."""
+    if not _hist:
+        return
+    try:
+        with open(path) as f:
+            saved = json.load(f).get("histograms", {})
+    except (OSError, ValueError):
+        saved = {}
+    with _lock:
+        merged = {}
+        for name in set(saved) | set(_hist):
+            h = Histogram()
+            if name in saved:
+                h.merge(saved[name])
+            if name in _hist:
+                h.merge(_hist[name].to_dict())
+            merged[name] = h
+    data = {
+        "ts": time.time(),
+        "buckets": BUCKETS,
+        "spans": {n: h.summary() for n, h in sorted(merged.items())},
+        "histograms": {n: h.to_dict() for n, h in sorted(merged.items())},
+    }
+    try:
+        _write_json(path, data)
+    except OSError:
+        pass
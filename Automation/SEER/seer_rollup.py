@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+SEER Zeek Rollup — compact rotated Zeek JSON logs into columnar daily files
+- Scans json_spool for rotated conn/dns logs (e.g. conn.2025-10-12-14-00-00.log)
+- Writes one compressed columnar part per (source, day) under rollup_dir/<log>/<YYYYmmdd>/
+- Parquet (zstd) when pyarrow is installed; otherwise a self-contained stdlib format (.scol)
+- Incremental and idempotent: processed sources are tracked in rollup.state, parts are
+  named after their source and written atomically (tmp -> fsync -> rename)
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import seer_config
+from seer_zeeklog import ZeekLogReader
+
+log = logging.getLogger("seer-rollup")
+
+CONFIG_PATH = "/opt/seer/etc/seer.yml"
+STATE_FILE = "/var/log/seer/rollup.state"
+QUIET_SECS = 10  # rotated file must be untouched this long before compaction
+
+# Rotated Zeek logs carry a timestamp between the stream name and the extension.
+ROTATED_RE = re.compile(r"^(?P<log>[a-z_]+)\.(?P<stamp>[^/]+)\.log$")
+
+# Column layout per Zeek stream: (field, type). Types: float, int, bool, str.
+# Zeek list fields (e.g. dns answers) are joined with "," into a str column.
+SCHEMAS = {
+    "conn": [
+        ("ts", "float"),
+        ("uid", "str"),
+        ("id.orig_h", "str"),
+        ("id.orig_p", "int"),
+        ("id.resp_h", "str"),
+        ("id.resp_p", "int"),
+        ("proto", "str"),
+        ("service", "str"),
+        ("duration", "float"),
+        ("orig_bytes", "int"),
+        ("resp_bytes", "int"),
+        ("conn_state", "str"),
+        ("missed_bytes", "int"),
+        ("history", "str"),
+        ("orig_pkts", "int"),
+        ("orig_ip_bytes", "int"),
+        ("resp_pkts", "int"),
+        ("resp_ip_bytes", "int"),
+    ],
+    "dns": [
+        ("ts", "float"),
+        ("uid", "str"),
+        ("id.orig_h", "str"),
+        ("id.orig_p", "int"),
+        ("id.resp_h", "str"),
+        ("id.resp_p", "int"),
+        ("proto", "str"),
+        ("trans_id", "int"),
+        ("rtt", "float"),
+        ("query", "str"),
+        ("qtype_name", "str"),
+        ("rcode_name", "str"),
+        ("AA", "bool"),
+        ("TC", "bool"),
+        ("RD", "bool"),
+        ("RA", "bool"),
+        ("answers", "str"),
+        ("rejected", "bool"),
+    ],
+}
+
+# ---- self-contained columnar format (.scol) ----
+# magic | u32 header_len | header JSON | zlib-compressed column blocks
+# str columns are dictionary encoded: uint32 codes (0 = null) + JSON dictionary block.
+SCOL_MAGIC = b"SEERCOL1"
+INT_NULL = -(2**63)
+BOOL_NULL = -1
+_ARRAY_CODES = {"float": "d", "int": "q", "bool": "b", "str": "I"}
+
+
+def read_config():
+    """Load seer.yml configuration."""
+    try:
+        return seer_config.load(CONFIG_PATH)
+    except Exception as e:
+        log.error(f"Failed to read config {CONFIG_PATH}: {e}")
+        return {}
+
+
+def have_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_format(fmt):
+    """Map the configured format (auto|parquet|scol) to a concrete one."""
+    fmt = (fmt or "auto").lower()
+    if fmt == "parquet" and not have_pyarrow():
+        log.warning("rollup.format=parquet but pyarrow is not installed; falling back to scol")
+        return "scol"
+    if fmt == "auto":
+        return "parquet" if have_pyarrow() else "scol"
+    return fmt if fmt in ("parquet", "scol") else "scol"
+
+
+def _coerce(value, kind):
+    """Coerce a JSON value to the column type; None stays None."""
+    if value is None:
+        return None
+    if kind == "str":
+        if isinstance(value, list):
+            return ",".join(str(v) for v in value)
+        return str(value)
+    if kind == "float":
+        return float(value)
+    if kind == "int":
+        return int(value)
+    if kind == "bool":
+        return bool(value)
+    return value
+
+
+def _day_of(ts):
+    return datetime.fromtimestamp(float(ts or 0), tz=timezone.utc).strftime("%Y%m%d")
+
+
+def parse_source(path, schema):
+    """Parse a rotated Zeek JSON log into {day: {field: [values]}}."""
+    fields = [name for name, _ in schema]
+    kinds = [kind for _, kind in schema]
+    ts_idx = fields.index("ts")
+    days = defaultdict(lambda: {name: [] for name in fields})
+    reader = ZeekLogReader(path, fields=fields, complete=True)
+    for rec in reader:
+        cols = days[_day_of(rec[ts_idx])]
+        for name, kind, value in zip(fields, kinds, rec, strict=True):
+            try:
+                cols[name].append(_coerce(value, kind))
+            except (TypeError, ValueError):
+                cols[name].append(None)
+    if reader.bad_lines:
+        log.warning(f"{path}: skipped {reader.bad_lines} malformed lines")
+    return days
+
+
+def _encode_column(values, kind):
+    """Return (data_block, dict_block_or_None) for one column."""
+    code = _ARRAY_CODES[kind]
+    if kind == "str":
+        lookup = {}
+        codes = array(code)
+        for v in values:
+            if v is None:
+                codes.append(0)
+                continue
+            idx = lookup.get(v)
+            if idx is None:
+                idx = lookup[v] = len(lookup) + 1
+            codes.append(idx)
+        dictionary = json.dumps(list(lookup), separators=(",", ":")).encode()
+        return zlib.compress(codes.tobytes(), 6), zlib.compress(dictionary, 6)
+    if kind == "float":
+        arr = array(code, (math.nan if v is None else v for v in values))
+    elif kind == "int":
+        arr = array(code, (INT_NULL if v is None else v for v in values))
+    else:
+        arr = array(code, (BOOL_NULL if v is None else int(v) for v in values))
+    return zlib.compress(arr.tobytes(), 6), None
+
+
+def _atomic_write(path, writer):
+    """Write via path.tmp, fsync, rename into place."""
+    tmp = path.with_name(path.name + ".tmp")
+    writer(tmp)
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_scol(path, log_name, source, columns, schema):
+    rows = len(columns[schema[0][0]]) if schema else 0
+    blocks = []
+    meta = []
+    offset = 0
+    for name, kind in schema:
+        data, dictionary = _encode_column(columns[name], kind)
+        entry = {"name": name, "type": kind, "data": [offset, len(data)]}
+        blocks.append(data)
+        offset += len(data)
+        if dictionary is not None:
+            entry["dict"] = [offset, len(dictionary)]
+            blocks.append(dictionary)
+            offset += len(dictionary)
+        meta.append(entry)
+    header = json.dumps(
+        {"log": log_name, "source": source, "rows": rows, "byteorder": sys.byteorder, "columns": meta},
+        separators=(",", ":"),
+    ).encode()
+
+    def writer(tmp):
+        with open(tmp, "wb") as f:
+            f.write(SCOL_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for b in blocks:
+                f.write(b)
+
+    _atomic_write(path, writer)
+
+
+def write_parquet(path, log_name, source, columns, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"float": pa.float64(), "int": pa.int64(), "bool": pa.bool_(), "str": pa.string()}
+    table = pa.table({name: pa.array(columns[name], type=types[kind]) for name, kind in schema})
+    table = table.replace_schema_metadata({"log": log_name, "source": source})
+    _atomic_write(path, lambda tmp: pq.write_table(table, str(tmp), compression="zstd"))
+
+
+def _read_scol_header(f):
+    if f.read(len(SCOL_MAGIC)) != SCOL_MAGIC:
+        raise ValueError("not a SEER columnar file")
+    (hlen,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(hlen))
+    return header, len(SCOL_MAGIC) + 4 + hlen
+
+
+def _read_block(f, base, span):
+    f.seek(base + span[0])
+    return zlib.decompress(f.read(span[1]))
+
+
+def read_scol_codes(path, column):
+    """Return (dictionary, uint32 codes) for a str column without decoding values."""
+    with open(path, "rb") as f:
+        header, base = _read_scol_header(f)
+        for c in header["columns"]:
+            if c["name"] == column:
+                if c["type"] != "str":
+                    raise ValueError(f"{column} is not a string column")
+                codes = array("I")
+                codes.frombytes(_read_block(f, base, c["data"]))
+                if header["byteorder"] != sys.byteorder:
+                    codes.byteswap()
+                return json.loads(_read_block(f, base, c["dict"])), codes
+    raise KeyError(column)
+
+
+def read_columns(path, columns=None):
+    """Read selected columns of a rollup part into {name: [values]}."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(str(path), columns=columns).to_pydict()
+    out = {}
+    with open(path, "rb") as f:
+        header, base = _read_scol_header(f)
+        swap = header["byteorder"] != sys.byteorder
+        for c in header["columns"]:
+            if columns is not None and c["name"] not in columns:
+                continue
+            arr = array(_ARRAY_CODES[c["type"]])
+            arr.frombytes(_read_block(f, base, c["data"]))
+            if swap:
+                arr.byteswap()
+            if c["type"] == "str":
+                dictionary = [None] + json.loads(_read_block(f, base, c["dict"]))
+                out[c["name"]] = [dictionary[i] for i in arr]
+            elif c["type"] == "float":
+                out[c["name"]] = [None if math.isnan(v) else v for v in arr]
+            elif c["type"] == "int":
+                out[c["name"]] = [None if v == INT_NULL else v for v in arr]
+            else:
+                out[c["name"]] = [None if v == BOOL_NULL else bool(v) for v in arr]
+    return out
+
+
+def iter_parts(rollup_dir, log_name, day=None):
+    """Yield rollup part paths for a stream, optionally limited to one YYYYmmdd day."""
+    base = Path(rollup_dir) / log_name
+    days = [base / day] if day else sorted(p for p in base.glob("*") if p.is_dir())
+    for d in days:
+        yield from sorted(p for p in d.glob("*") if p.suffix in (".scol", ".parquet"))
+
+
+def top_values(parts, column, n=10):
+    """Most common values of a str column across parts (top talkers, top queries, ...)."""
+    counts = Counter()
+    for part in parts:
+        if part.suffix == ".parquet":
+            import pyarrow.compute as pc
+            import pyarrow.parquet as pq
+
+            vc = pc.value_counts(pq.read_table(str(part), columns=[column])[column])
+            for item in vc.to_pylist():
+                if item["values"] is not None:
+                    counts[item["values"]] += item["counts"]
+            continue
+        dictionary, codes = read_scol_codes(part, column)
+        for idx, cnt in Counter(codes).items():
+            if idx:
+                counts[dictionary[idx - 1]] += cnt
+    return counts.most_common(n)
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+        state.setdefault("processed", {})
+        return state
+    except Exception:
+        return {"processed": {}}
+
+
+def save_state(state):
+    try:
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        tmp = STATE_FILE + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, STATE_FILE)
+    except Exception as e:
+        log.warning(f"Failed to write state file {STATE_FILE}: {e}")
+
+
+def pending_sources(spool, logs, processed):
+    """Rotated, quiet, not-yet-compacted sources in json_spool."""
+    now = time.time()
+    out = []
+    for p in sorted(Path(spool).glob("*.log")):
+        m = ROTATED_RE.match(p.name)
+        if not m or m.group("log") not in logs:
+            continue
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        if now - st.st_mtime < QUIET_SECS:
+            continue
+        seen = processed.get(p.name)
+        if seen and seen.get("size") == st.st_size and seen.get("mtime") == st.st_mtime:
+            continue
+        out.append((p, m.group("log"), st))
+    return out
+
+
+def compact(spool, rollup_dir, logs, fmt):
+    """Compact all pending rotated logs. Returns (sources, rows)."""
+    state = load_state()
+    processed = state["processed"]
+    ext = ".parquet" if fmt == "parquet" else ".scol"
+    writer = write_parquet if fmt == "parquet" else write_scol
+    n_sources = n_rows = 0
+
+    for src, log_name, st in pending_sources(spool, logs, processed):
+        schema = SCHEMAS[log_name]
+        try:
+            days = parse_source(src, schema)
+            parts = []
+            for day, columns in sorted(days.items()):
+                out_dir = Path(rollup_dir) / log_name / day
+                out_dir.mkdir(parents=True, exist_ok=True)
+                out = out_dir / f"{src.stem}{ext}"
+                writer(out, log_name, src.name, columns, schema)
+                parts.append(str(out))
+                n_rows += len(columns["ts"])
+            processed[src.name] = {"size": st.st_size, "mtime": st.st_mtime, "parts": parts}
+            n_sources += 1
+            log.info(f"Compacted {src.name} -> {len(parts)} part(s)")
+        except Exception as e:
+            log.error(f"Failed to compact {src.name}: {e}")
+
+    # Forget sources that no longer exist in the spool (shipped or purged)
+    for name in [n for n in processed if not (Path(spool) / n).exists()]:
+        del processed[name]
+
+    state["last_run_ts"] = time.time()
+    state["format"] = fmt
+    state["rows_last_run"] = n_rows
+    save_state(state)
+    return n_sources, n_rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compact rotated Zeek JSON logs into columnar daily rollups")
+    ap.add_argument("--top", metavar="COLUMN", help="Query mode: print the most common values of COLUMN")
+    ap.add_argument("--log", default="conn", help="Zeek stream for --top (default: conn)")
+    ap.add_argument("--day", help="Restrict --top to one YYYYmmdd partition")
+    ap.add_argument("-n", type=int, default=10, help="Number of rows for --top")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    cfg = read_config()
+    rollup_dir = cfg.get("rollup_dir", "/var/seer/rollup")
+
+    if args.top:
+        for value, count in top_values(iter_parts(rollup_dir, args.log, args.day), args.top, args.n):
+            print(f"{count:>10}  {value}")
+        return
+
+    spool = cfg.get("json_spool", "/var/seer/json_spool")
+    rcfg = cfg.get("rollup", {}) or {}
+    logs = [name for name in rcfg.get("logs", ["conn", "dns"]) if name in SCHEMAS]
+    fmt = resolve_format(rcfg.get("format", "auto"))
+    sources, rows = compact(spool, rollup_dir, logs, fmt)
+    log.info(f"Rollup run complete: {sources} source(s), {rows} rows, format={fmt}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+SEER metric history — fixed-size ring time series for the console's trend panels
+- Series: one preallocated array("f") of `capacity` buckets of `step` seconds; append() is O(1)
+  (a gap after downtime is NaN-filled, at most one lap of the ring), memory never grows with uptime
+- SeriesStore: name -> Series with a shared step/capacity; record() appends one collector sample
+- save()/load(): a small binary file (header, then per series its name, newest bucket and the raw
+  little-endian float32 ring), written atomically; a file with another step/capacity is ignored
+- sparkline(): newest-last trend string, each column the max of its buckets, gaps left blank
+"""
+
+import math
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"SEERTS1\n"
+HEADER = struct.Struct("<8sdI H")  # magic, step seconds, capacity, series count
+ENTRY = struct.Struct("<Hq")  # name length, newest bucket index
+BLOCKS = "▁▂▃▄▅▆▇█"
+ASCII_BLOCKS = "_.-~=+*#"
+NAN = float("nan")
+
+
+class Series:
+    """Ring of `capacity` buckets, `step` seconds each; a bucket holds the last value seen in it."""
+
+    def __init__(self, capacity, step):
+        self.capacity = capacity
+        self.step = step
+        self.values = array("f", [NAN]) * capacity
+        self.last = None  # bucket index (ts // step) of the newest value
+
+    def append(self, ts, value):
+        bucket = int(ts // self.step)
+        if self.last is None or bucket - self.last >= self.capacity:
+            self.values = array("f", [NAN]) * self.capacity
+        elif bucket > self.last:
+            for b in range(self.last + 1, bucket):
+                self.values[b % self.capacity] = NAN
+        elif bucket < self.last:
+            bucket = self.last  # clock stepped back: keep filling the newest bucket
+        self.last = bucket
+        self.values[bucket % self.capacity] = value
+
+    def window(self, seconds, now):
+        """Values of the buckets covering the last `seconds` up to now, oldest first (NaN = no sample)."""
+        count = min(self.capacity, max(1, int(seconds // self.step)))
+        newest = int(now // self.step)
+        out = []
+        for b in range(newest - count + 1, newest + 1):
+            if self.last is None or b > self.last or b <= self.last - self.capacity:
+                out.append(NAN)
+            else:
+                out.append(self.values[b % self.capacity])
+        return out
+
+
+class SeriesStore:
+    """The console's metric histories: retention = capacity * step seconds, bytes = 4 * capacity per metric."""
+
+    def __init__(self, capacity, step):
+        self.capacity = capacity
+        self.step = step
+        self.series = {}
+
+    def get(self, name):
+        if name not in self.series:
+            self.series[name] = Series(self.capacity, self.step)
+        return self.series[name]
+
+    def record(self, ts, metrics):
+        for name, value in metrics.items():
+            self.get(name).append(ts, value)
+
+    def save(self, path):
+        parts = [HEADER.pack(MAGIC, self.step, self.capacity, len(self.series))]
+        for name, s in self.series.items():
+            raw = name.encode()
+            values = array("f", s.values)
+            if sys.byteorder == "big":
+                values.byteswap()
+            parts += [ENTRY.pack(len(raw), -1 if s.last is None else s.last), raw, values.tobytes()]
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, capacity, step):
+        """The store saved at path, or an empty one (missing, damaged, or saved with another step/capacity)."""
+        store = cls(capacity, step)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, saved_step, saved_capacity, count = HEADER.unpack_from(data)
+            if magic != MAGIC or saved_step != step or saved_capacity != capacity:
+                return store
+            off = HEADER.size
+            for _ in range(count):
+                size, last = ENTRY.unpack_from(data, off)
+                off += ENTRY.size
+                name = data[off : off + size].decode()
+                off += size
+                s = store.get(name)
+                s.values = array("f")
+                s.values.frombytes(data[off : off + 4 * capacity])
+                off += 4 * capacity
+                if len(s.values) != capacity:
+                    return cls(capacity, step)
+                if sys.byteorder == "big":
+                    s.values.byteswap()
+                s.last = None if last < 0 else last
+        except (OSError, struct.error, UnicodeDecodeError, ValueError):
+            return cls(capacity, step)
+        return store
+
+
+def sparkline(values, width, ticks=BLOCKS):
+    """values (oldest first) squeezed into at most `width` columns, scaled between their min and max."""
+    if not values or width <= 0:
+        return ""
+    group = math.ceil(len(values) / width)
+    cols = []
+    for i in range(0, len(values), group):
+        seen = [v for v in values[i : i + group] if not math.isnan(v)]
+        cols.append(max(seen) if seen else None)
+    known = [v for v in cols if v is not None]
+    if not known:
+        return " " * len(cols)
+    lo, hi = min(known), max(known)
+    top = len(ticks) - 1
+    return "".join(" " if v is None else ticks[0 if hi == lo else round((v - lo) / (hi - lo) * top)] for v in cols)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+SEER Traffic Summary Service
+Tails Zeek conn.log/dns.log in json_spool and keeps an on-box view of what the sensor sees:
+- Top hosts, talkers by bytes, ports, services/protocols and DNS names
+- Space-saving heavy hitters per time bucket; sliding windows merge the buckets
+- Memory is bounded by capacity x buckets x dimensions, independent of traffic volume
+- Publishes /var/log/seer/summary.state (atomic JSON) for seer_console.py and the status API
+"""
+
+import heapq
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import seer_config
+from seer_zeeklog import LogTail
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+log = logging.getLogger("seer-summary")
+
+CONFIG_PATH = "/opt/seer/etc/seer.yml"
+STATE_FILE = "/var/log/seer/summary.state"
+
+# Projected fields per log; records arrive as tuples in this order
+CONN_FIELDS = ("id.orig_h", "id.resp_h", "id.resp_p", "proto", "service", "orig_bytes", "resp_bytes")
+DNS_FIELDS = ("query",)
+
+# Dimensions tracked per window: name -> human label (used by the console)
+DIMENSIONS = {
+    "hosts": "Hosts",
+    "talkers": "Talkers (bytes)",
+    "ports": "Ports",
+    "services": "Protocols",
+    "dns": "DNS names",
+}
+
+
+def read_config():
+    """Load seer.yml configuration."""
+    try:
+        return seer_config.load(CONFIG_PATH)
+    except Exception as e:
+        log.error(f"Failed to read config {CONFIG_PATH}: {e}")
+        return {}
+
+
+class SpaceSaving:
+    """
+    Space-saving heavy hitters (Metwally et al.) with at most `capacity` counters.
+    Eviction finds the minimum through a lazy heap: increments leave stale (smaller)
+    heap entries behind, which are refreshed when they surface.
+    """
+
+    __slots__ = ("capacity", "counts", "_heap")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self._heap = []
+
+    def add(self, key, weight=1):
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[key] = weight
+            heapq.heappush(self._heap, (weight, key))
+            return
+        heap = self._heap
+        while True:
+            c, victim = heap[0]
+            current = counts.get(victim)
+            if current == c:
+                break
+            if current is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (current, victim))
+        heapq.heappop(heap)
+        del counts[victim]
+        # The newcomer inherits the evicted count (its maximum possible overestimate)
+        counts[key] = c + weight
+        heapq.heappush(heap, (c + weight, key))
+        if len(heap) > 4 * self.capacity:
+            self._heap = [(v, k) for k, v in counts.items()]
+            heapq.heapify(self._heap)
+
+
+class WindowedTopK:
+    """Ring of per-bucket SpaceSaving sketches; windows are answered by merging buckets."""
+
+    def __init__(self, capacity, bucket_secs, buckets):
+        self.capacity = capacity
+        self.bucket_secs = bucket_secs
+        self.buckets = deque(maxlen=buckets)  # (bucket_id, SpaceSaving)
+
+    def _current(self, now):
+        bid = int(now // self.bucket_secs)
+        if not self.buckets or self.buckets[-1][0] != bid:
+            self.buckets.append((bid, SpaceSaving(self.capacity)))
+        return self.buckets[-1][1]
+
+    def add(self, key, weight, now):
+        self._current(now).add(key, weight)
+
+    def top(self, window_secs, now, n=5):
+        oldest = int(now // self.bucket_secs) - max(1, int(window_secs // self.bucket_secs)) + 1
+        merged = {}
+        for bid, sketch in self.buckets:
+            if bid < oldest:
+                continue
+            for k, v in sketch.counts.items():
+                merged[k] = merged.get(k, 0) + v
+        return heapq.nlargest(n, merged.items(), key=lambda kv: kv[1])
+
+
+class WindowedCounter:
+    """Plain per-bucket totals (records, bytes) for the same ring of buckets."""
+
+    def __init__(self, bucket_secs, buckets):
+        self.bucket_secs = bucket_secs
+        self.buckets = deque(maxlen=buckets)  # [bucket_id, value]
+
+    def add(self, value, now):
+        bid = int(now // self.bucket_secs)
+        if not self.buckets or self.buckets[-1][0] != bid:
+            self.buckets.append([bid, 0])
+        self.buckets[-1][1] += value
+
+    def total(self, window_secs, now):
+        oldest = int(now // self.bucket_secs) - max(1, int(window_secs // self.bucket_secs)) + 1
+        return sum(v for bid, v in self.buckets if bid >= oldest)
+
+
+class TrafficSummary:
+    """Incremental aggregator over Zeek conn/dns records."""
+
+    def __init__(self, capacity=64, bucket_secs=60, buckets=60):
+        self.dims = {name: WindowedTopK(capacity, bucket_secs, buckets) for name in DIMENSIONS}
+        self.totals = {name: WindowedCounter(bucket_secs, buckets) for name in ("conn", "dns", "bytes")}
+        self.records = 0
+
+    def ingest_conn(self, rec, now):
+        """rec: tuple in CONN_FIELDS order."""
+        orig, resp, resp_p, proto, service, orig_bytes, resp_bytes = rec
+        nbytes = (orig_bytes or 0) + (resp_bytes or 0)
+        proto = proto or "?"
+        dims = self.dims
+        if orig:
+            dims["hosts"].add(orig, 1, now)
+            if nbytes:
+                dims["talkers"].add(orig, nbytes, now)
+        if resp:
+            dims["hosts"].add(resp, 1, now)
+        if resp_p is not None:
+            dims["ports"].add(f"{resp_p}/{proto}", 1, now)
+        dims["services"].add(service or proto, 1, now)
+        self.totals["conn"].add(1, now)
+        self.totals["bytes"].add(nbytes, now)
+        self.records += 1
+
+    def ingest_dns(self, rec, now):
+        """rec: tuple in DNS_FIELDS order."""
+        (query,) = rec
+        if query:
+            self.dims["dns"].add(query, 1, now)
+        self.totals["dns"].add(1, now)
+        self.records += 1
+
+    def snapshot(self, windows, now, n=5):
+        out = {}
+        for w in windows:
+            entry = {name: counter.total(w, now) for name, counter in self.totals.items()}
+            for name, dim in self.dims.items():
+                entry[f"top_{name}"] = dim.top(w, now, n)
+            out[window_label(w)] = entry
+        return out
+
+
+def window_label(secs):
+    return f"{secs // 3600}h" if secs % 3600 == 0 else f"{secs // 60}m"
+
+
+def write_state(state):
+    try:
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        tmp = STATE_FILE + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, STATE_FILE)
+    except Exception as e:
+        log.warning(f"Failed to write state file {STATE_FILE}: {e}")
+
+
+def main_loop():
+    cfg = read_config()
+    spool = Path(cfg.get("json_spool", "/var/seer/json_spool"))
+    scfg = cfg.get("summary", {}) or {}
+    bucket_secs = int(scfg.get("bucket_seconds", 60))
+    windows = [int(w) for w in scfg.get("windows", [300, 3600])]
+    buckets = max(windows) // bucket_secs + 1
+    poll_interval = float(scfg.get("poll_interval", 1))
+    publish_interval = float(scfg.get("publish_interval", 5))
+    top_n = int(scfg.get("top_n", 5))
+
+    summary = TrafficSummary(int(scfg.get("capacity", 64)), bucket_secs, buckets)
+    tails = {"conn": LogTail(spool / "conn.log", CONN_FIELDS), "dns": LogTail(spool / "dns.log", DNS_FIELDS)}
+    for t in tails.values():
+        t.skip_to_end()
+
+    log.info("SEER summary service started")
+    log.info(f"  Spool: {spool}  windows: {', '.join(window_label(w) for w in windows)}")
+
+    last_publish = 0.0
+    last_records = 0
+    while True:
+        try:
+            now = time.time()
+            for rec in tails["conn"].poll():
+                summary.ingest_conn(rec, now)
+            for rec in tails["dns"].poll():
+                summary.ingest_dns(rec, now)
+
+            if now - last_publish >= publish_interval:
+                rate = (summary.records - last_records) / (now - last_publish) if last_publish else 0.0
+                write_state(
+                    {
+                        "updated": now,
+                        "records_total": summary.records,
+                        "records_per_sec": round(rate, 1),
+                        "bad_lines": sum(t.bad_lines for t in tails.values()),
+                        "windows": summary.snapshot(windows, now, top_n),
+                    }
+                )
+                last_publish, last_records = now, summary.records
+
+            time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            log.info("Received interrupt; shutting down")
+            break
+        except Exception as e:
+            log.error(f"Error in main loop: {e}", exc_info=True)
+            time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    main_loop()
@@ -0,0 +1,365 @@
+"""
+SEER systemd client: unit state and unit jobs over D-Bus, without forking systemctl
+- Speaks the D-Bus wire protocol on the system bus socket with the standard library only (AF_UNIX,
+  EXTERNAL auth, marshalling of the types systemd uses, either byte order)
+- UnitWatcher loads the SEER units once, calls Manager.Subscribe and keeps each unit's ActiveState
+  cached from PropertiesChanged signals (re-read after a daemon-reload); poll() applies queued signals
+  without blocking and says whether anything changed; fileno() is the bus socket, for select()
+  (call poll() before sleeping: signals read along with a reply are already off the socket)
+- start/stop/restart queue a systemd job and return (the state change arrives as a signal);
+  reload_daemon() is `systemctl daemon-reload`
+- connect() returns None when there is no system bus or no systemd on it (containers, CI); callers
+  fall back to systemctl
+"""
+
+import os
+import select
+import socket
+import struct
+import threading
+from collections import deque, namedtuple
+
+SYSTEM_BUS = "/run/dbus/system_bus_socket"
+CALL_TIMEOUT = 5.0
+
+DBUS = "org.freedesktop.DBus"
+DBUS_PATH = "/org/freedesktop/DBus"
+PROPERTIES = "org.freedesktop.DBus.Properties"
+SYSTEMD = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+MANAGER = "org.freedesktop.systemd1.Manager"
+UNIT = "org.freedesktop.systemd1.Unit"
+MATCHES = (
+    f"type='signal',sender='{SYSTEMD}',interface='{PROPERTIES}',member='PropertiesChanged',"
+    f"path_namespace='{SYSTEMD_PATH}/unit'",
+    f"type='signal',sender='{SYSTEMD}',interface='{MANAGER}',member='Reloading'",
+)
+
+# Message types and header field codes (D-Bus specification, "Message Format")
+METHOD_CALL, METHOD_RETURN, ERROR, SIGNAL = 1, 2, 3, 4
+F_PATH, F_INTERFACE, F_MEMBER, F_ERROR_NAME, F_REPLY_SERIAL, F_DESTINATION, F_SENDER, F_SIGNATURE = range(1, 9)
+
+_FIXED = {"y": "B", "b": "I", "n": "h", "q": "H", "i": "i", "u": "I", "x": "q", "t": "Q", "d": "d", "h": "I"}
+_ALIGN = {**{c: struct.calcsize(f) for c, f in _FIXED.items()}, "s": 4, "o": 4, "g": 1, "v": 1, "a": 4, "(": 8, "{": 8}
+
+Message = namedtuple("Message", "kind serial fields body")
+
+
+class DBusError(Exception):
+    """An error reply (name is the D-Bus error name) or a protocol failure."""
+
+    def __init__(self, name, message=""):
+        super().__init__(f"{name}: {message}" if message else name)
+        self.name = name
+
+
+def _type_end(sig, i):
+    """Index just past the single complete type starting at sig[i]."""
+    c = sig[i]
+    if c == "a":
+        return _type_end(sig, i + 1)
+    if c in "({":
+        close = ")" if c == "(" else "}"
+        i += 1
+        while sig[i] != close:
+            i = _type_end(sig, i)
+    return i + 1
+
+
+def _split(sig):
+    types, i = [], 0
+    while i < len(sig):
+        j = _type_end(sig, i)
+        types.append(sig[i:j])
+        i = j
+    return types
+
+
+def _put(buf, t, v):
+    """Marshal v as type t (little-endian) onto buf; alignment is relative to the start of buf."""
+    c = t[0]
+    buf.extend(b"\0" * (-len(buf) % _ALIGN[c]))
+    if c in _FIXED:
+        buf.extend(struct.pack("<" + _FIXED[c], v))
+    elif c in "so":
+        b = v.encode()
+        buf.extend(struct.pack("<I", len(b)) + b + b"\0")
+    elif c == "g":
+        b = v.encode()
+        buf.extend(bytes([len(b)]) + b + b"\0")
+    elif c == "v":
+        sig, value = v
+        _put(buf, "g", sig)
+        _put(buf, sig, value)
+    elif c == "a":
+        at = len(buf)
+        buf.extend(b"\0\0\0\0")
+        elem = t[1:]
+        buf.extend(b"\0" * (-len(buf) % _ALIGN[elem[0]]))
+        start = len(buf)
+        for item in v.items() if elem[0] == "{" else v:
+            _put(buf, elem, item)
+        struct.pack_into("<I", buf, at, len(buf) - start)
+    else:  # struct or dict entry
+        for sub, item in zip(_split(t[1:-1]), v):
+            _put(buf, sub, item)
+
+
+def _get(data, pos, t, e):
+    """Unmarshal one value of type t at pos (byte order e); returns (value, next pos). Variants yield their value."""
+    c = t[0]
+    pos += -pos % _ALIGN[c]
+    if c in _FIXED:
+        fmt = e + _FIXED[c]
+        (v,) = struct.unpack_from(fmt, data, pos)
+        return (bool(v) if c == "b" else v), pos + struct.calcsize(fmt)
+    if c in "so":
+        (n,) = struct.unpack_from(e + "I", data, pos)
+        return bytes(data[pos + 4 : pos + 4 + n]).decode(errors="replace"), pos + 4 + n + 1
+    if c == "g":
+        n = data[pos]
+        return bytes(data[pos + 1 : pos + 1 + n]).decode(), pos + n + 2
+    if c == "v":
+        sig, pos = _get(data, pos, "g", e)
+        return _get(data, pos, sig, e)
+    if c == "a":
+        (n,) = struct.unpack_from(e + "I", data, pos)
+        elem = t[1:]
+        pos += 4
+        pos += -pos % _ALIGN[elem[0]]
+        end, items = pos + n, []
+        while pos < end:
+            item, pos = _get(data, pos, elem, e)
+            items.append(item)
+        return (dict(items) if elem[0] == "{" else items), end
+    items = []
+    for sub in _split(t[1:-1]):
+        item, pos = _get(data, pos, sub, e)
+        items.append(item)
+    return tuple(items), pos
+
+
+def _encode(kind, serial, fields, sig="", args=()):
+    body = bytearray()
+    for t, v in zip(_split(sig), args):
+        _put(body, t, v)
+    if sig:
+        fields[F_SIGNATURE] = ("g", sig)
+    head = bytearray(b"l" + bytes([kind, 0, 1]) + struct.pack("<II", len(body), serial))
+    _put(head, "a(yv)", sorted(fields.items()))
+    head.extend(b"\0" * (-len(head) % 8))
+    return bytes(head + body)
+
+
+def _message_size(buf):
+    """Total length of the message at the start of buf, or None if its fixed header is incomplete."""
+    if len(buf) < 16:
+        return None
+    e = "<" if buf[0] == ord("l") else ">"
+    body_len, _serial, fields_len = struct.unpack_from(e + "III", buf, 4)
+    return 16 + fields_len + (-(16 + fields_len) % 8) + body_len
+
+
+def _decode(data):
+    e = "<" if data[0] == ord("l") else ">"
+    (serial,) = struct.unpack_from(e + "I", data, 8)
+    fields, pos = _get(data, 12, "a(yv)", e)
+    fields = dict(fields)
+    pos += -pos % 8
+    body = []
+    for t in _split(fields.get(F_SIGNATURE, "")):
+        v, pos = _get(data, pos, t, e)
+        body.append(v)
+    return Message(data[1], serial, fields, body)
+
+
+def system_bus_path():
+    """The system bus socket ($DBUS_SYSTEM_BUS_ADDRESS unix:path=... or SYSTEM_BUS)."""
+    for part in os.environ.get("DBUS_SYSTEM_BUS_ADDRESS", "").split(";"):
+        if part.startswith("unix:"):
+            opts = dict(kv.split("=", 1) for kv in part[5:].split(",") if "=" in kv)
+            if "path" in opts:
+                return opts["path"]
+    return SYSTEM_BUS
+
+
+class Bus:
+    """One authenticated connection; call() blocks for its reply, signals are queued for the caller."""
+
+    def __init__(self, path=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(CALL_TIMEOUT)
+        try:
+            self.sock.connect(path or system_bus_path())
+            self.buf = bytearray()
+            self.serial = 0
+            self.signals = deque()
+            self._auth()
+            (self.name,) = self.call(DBUS, DBUS_PATH, DBUS, "Hello")
+        except BaseException:
+            self.sock.close()
+            raise
+
+    def _auth(self):
+        uid = str(os.geteuid()).encode().hex().encode()
+        self.sock.sendall(b"\0AUTH EXTERNAL " + uid + b"\r\n")
+        while b"\r\n" not in self.buf:
+            self._read()
+        line, _, rest = bytes(self.buf).partition(b"\r\n")
+        if not line.startswith(b"OK "):
+            raise DBusError("org.freedesktop.DBus.Error.AuthFailed", line.decode(errors="replace"))
+        self.buf = bytearray(rest)
+        self.sock.sendall(b"BEGIN\r\n")
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+    def _read(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise ConnectionError("system bus closed the connection")
+        self.buf.extend(data)
+
+    def _next(self, block):
+        """The next complete message, reading as needed; None if not block and nothing complete is buffered."""
+        while True:
+            size = _message_size(self.buf)
+            if size is not None and len(self.buf) >= size:
+                msg = _decode(bytes(self.buf[:size]))
+                del self.buf[:size]
+                return msg
+            if not block and not select.select([self.sock], [], [], 0)[0]:
+                return None
+            self._read()
+
+    def call(self, dest, path, iface, member, sig="", *args):
+        """Method call; returns the reply body as a list, raises DBusError for an error reply."""
+        self.serial += 1
+        serial = self.serial
+        fields = {F_PATH: ("o", path), F_MEMBER: ("s", member), F_DESTINATION: ("s", dest)}
+        if iface:
+            fields[F_INTERFACE] = ("s", iface)
+        self.sock.sendall(_encode(METHOD_CALL, serial, fields, sig, args))
+        while True:
+            msg = self._next(block=True)
+            if msg.kind == SIGNAL:
+                self.signals.append(msg)
+            elif msg.kind in (METHOD_RETURN, ERROR) and msg.fields.get(F_REPLY_SERIAL) == serial:
+                if msg.kind == ERROR:
+                    raise DBusError(msg.fields.get(F_ERROR_NAME, "?"), msg.body[0] if msg.body else "")
+                return msg.body
+
+    def pending_signals(self):
+        """Signals queued so far plus any already readable on the socket (never blocks)."""
+        while (msg := self._next(block=False)) is not None:
+            if msg.kind == SIGNAL:
+                self.signals.append(msg)
+        out = list(self.signals)
+        self.signals.clear()
+        return out
+
+
+class UnitWatcher:
+    """ActiveState of systemd units, kept current by PropertiesChanged; thread-safe."""
+
+    def __init__(self, bus, units=()):
+        self.bus = bus
+        self.lock = threading.RLock()
+        self.units = {}  # object path -> unit name
+        self.states = {}  # unit name -> ActiveState
+        self._changed = False
+        for rule in MATCHES:
+            bus.call(DBUS, DBUS_PATH, DBUS, "AddMatch", "s", rule)
+        bus.call(SYSTEMD, SYSTEMD_PATH, MANAGER, "Subscribe")
+        for unit in units:
+            if unit:
+                self._load(unit)
+
+    def fileno(self):
+        return self.bus.fileno()
+
+    def close(self):
+        self.bus.close()
+
+    def _load(self, unit):
+        # LoadUnit (not GetUnit) so units that aren't running or don't exist still get an object
+        (path,) = self.bus.call(SYSTEMD, SYSTEMD_PATH, MANAGER, "LoadUnit", "s", unit)
+        self.units[path] = unit
+        self._refresh(path)
+
+    def _refresh(self, path):
+        (state,) = self.bus.call(SYSTEMD, path, PROPERTIES, "Get", "ss", UNIT, "ActiveState")
+        self.states[self.units[path]] = state
+
+    def _apply(self):
+        """Apply signals queued during calls or readable on the socket."""
+        with self.lock:
+            before = dict(self.states)
+            for msg in self.bus.pending_signals():
+                member, path = msg.fields.get(F_MEMBER), msg.fields.get(F_PATH)
+                if member == "Reloading" and msg.body and not msg.body[0]:
+                    for p in list(self.units):  # a daemon-reload finished: units may have new paths
+                        self._load(self.units.pop(p))
+                elif member == "PropertiesChanged" and path in self.units and msg.body[0] == UNIT:
+                    changed, invalidated = msg.body[1], msg.body[2]
+                    if "ActiveState" in changed:
+                        self.states[self.units[path]] = changed["ActiveState"]
+                    elif "ActiveState" in invalidated:
+                        self._refresh(path)
+            self._changed |= self.states != before
+
+    def poll(self):
+        """Apply queued signals; True if any watched unit changed state since the last poll()."""
+        with self.lock:
+            self._apply()
+            changed, self._changed = self._changed, False
+            return changed
+
+    def active_state(self, unit):
+        """`systemctl is-active` for unit (loaded and watched from the first ask on)."""
+        with self.lock:
+            self._apply()
+            if unit not in self.states:
+                self._load(unit)
+            return self.states[unit]
+
+    def all_states(self):
+        with self.lock:
+            self._apply()
+            return dict(self.states)
+
+    def _job(self, method, unit):
+        with self.lock:
+            (job,) = self.bus.call(SYSTEMD, SYSTEMD_PATH, MANAGER, method, "ss", unit, "replace")
+            self._apply()  # signals that came in with the reply are already off the socket
+            return job
+
+    def start(self, unit):
+        return self._job("StartUnit", unit)
+
+    def stop(self, unit):
+        return self._job("StopUnit", unit)
+
+    def restart(self, unit):
+        return self._job("RestartUnit", unit)
+
+    def reload_daemon(self):
+        with self.lock:
+            self.bus.call(SYSTEMD, SYSTEMD_PATH, MANAGER, "Reload")
+            self._apply()
+
+
+def connect(units=(), path=None):
+    """UnitWatcher for units on the system bus, or None if the bus or systemd isn't there."""
+    try:
+        bus = Bus(path)
+    except (OSError, DBusError):
+        return None
+    try:
+        return UnitWatcher(bus, units)
+    except (OSError, DBusError):
+        bus.close()
+        return None
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+SEER export drive verifier (installed as seer-verify-drive) — for whoever receives a drive
+- Checks every file listed in pcap/YYYYmmdd/MANIFEST.txt (--glob for other layouts) against its
+  sha256, in a process pool sized to the CPUs and the drive's I/O queue (seer_drives.disk_queue:
+  one stream per queue slot, at most two on spinning disks); hashing is seer_hash.sha256_file,
+  the helper the exporter itself uses, with large readinto() buffers or mmap (--method)
+- Also reports files in those directories the manifest doesn't list
+- Cross-checks TRANSFER.LOG: exported entries missing from the drive, sha256 prefixes that
+  disagree with the manifest, manifest files the log has no export entry for, and exports that
+  failed (VERIFY_FAIL/IO_ERROR/CANCELLED with no later success)
+- MERKLE.json trees (4 MiB leaves): a mismatched file is re-read to report which byte ranges are
+  corrupt; --sample spot-checks a share of each file's leaves, reading nothing else; each manifest
+  directory's Merkle root (over its file sha256s) is checked against the recorded one and any
+  --expect-root the sensor logged, and the report carries a drive root over them
+- --checkpoint makes a long verification resumable; --only narrows it to matching files
+- Progress on stderr; a JSON report on stdout (or --report); exit 0 when everything verified,
+  1 when anything is missing or mismatched
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+
+from seer_drives import disk_queue
+from seer_hash import HASH_CHUNK, METHODS, leaf_hashes, merkle_root, sha256_file, sha256_tree
+
+MANIFEST_GLOB = "pcap/*/MANIFEST.txt"
+MERKLE_FILE = "MERKLE.json"  # chunk hash trees next to each manifest (seer_manifest.write_merkle)
+EXPORTED = ("OK", "SKIP_EXISTS")  # TRANSFER.LOG results meaning the file is on the drive
+SPINNING_STREAMS = 2  # parallel sequential reads beyond this make a disk seek instead of stream
+PROGRESS_INTERVAL = 1.0
+
+_done_bytes = None  # per-worker handle on the shared progress counter
+
+
+def auto_jobs(drive):
+    """Worker count for this drive: CPUs, capped by its queue depth (and SPINNING_STREAMS if rotational)."""
+    cpus = os.cpu_count() or 1
+    try:
+        depth, rotational = disk_queue(drive)
+    except OSError:
+        return cpus
+    if rotational:
+        return max(1, min(cpus, SPINNING_STREAMS))
+    return max(1, min(cpus, depth)) if depth else cpus
+
+
+def read_manifest(path):
+    """{filename: sha256} from a MANIFEST.txt (sha256sum format, "#" comments)."""
+    entries = {}
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            sha, _, name = line.rstrip("\n").partition("  ")
+            entries[name] = sha.lower()
+    return entries
+
+
+def read_transfer_log(path):
+    """TRANSFER.LOG as ({dst: exported entry}, {dst: failed entry}); later lines win (re-exports)."""
+    exported, failed = {}, {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a yank
+                if not isinstance(e, dict) or not e.get("dst"):
+                    continue
+                if e.get("result") in EXPORTED:
+                    exported[e["dst"]] = e
+                    failed.pop(e["dst"], None)
+                else:
+                    failed[e["dst"]] = e
+                    exported.pop(e["dst"], None)
+    except FileNotFoundError:
+        pass
+    return exported, failed
+
+
+def _init_worker(counter):
+    global _done_bytes
+    _done_bytes = counter
+
+
+def _add_bytes(n):
+    with _done_bytes.get_lock():
+        _done_bytes.value += n
+
+
+def _bad_leaves(got, want):
+    return [i for i in range(max(len(got), len(want))) if i >= len(got) or i >= len(want) or got[i] != want[i]]
+
+
+def check_file(path, expected, tree, method, chunk):
+    """
+    ("ok" | "mismatch" | "unreadable", detail) for one file against its manifest sha256. On a
+    mismatch with a tree ({"leaf_bytes", "leaves"}), a second read finds the bad leaves (detail).
+    """
+    try:
+        if sha256_file(path, chunk=chunk, method=method, on_bytes=_add_bytes) == expected:
+            return ("ok", None)
+        if not tree:
+            return ("mismatch", None)
+        _sha, leaves = sha256_tree(path, leaf=tree["leaf_bytes"], method=method)
+        return ("mismatch", _bad_leaves(leaves, tree["leaves"]))
+    except OSError as e:
+        return ("unreadable", e.strerror or str(e))
+
+
+def sample_file(path, tree, indices):
+    """check_file for a spot check: only the given leaves are read and compared."""
+    try:
+        got = leaf_hashes(path, indices, tree["leaf_bytes"])
+    except OSError as e:
+        return ("unreadable", e.strerror or str(e))
+    _add_bytes(len(indices) * tree["leaf_bytes"])
+    bad = [i for i in indices if got[i] != tree["leaves"][i]]
+    return ("mismatch", bad) if bad else ("ok", None)
+
+
+def leaf_ranges(bad, leaf, size):
+    """Bad leaf indices as merged [start, end) byte ranges."""
+    ranges = []
+    for i in bad:
+        start, end = i * leaf, min((i + 1) * leaf, size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+
+def read_trees(directory, names):
+    """Usable MERKLE.json trees for a manifest directory: {name: {"leaf_bytes", "leaves", "size"}}, and its root."""
+    try:
+        with open(directory / MERKLE_FILE) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, None
+    leaf = data.get("leaf_bytes")
+    trees = {}
+    for name, t in data.get("files", {}).items():
+        # A tree only stands in for the file if it describes the content the manifest lists
+        if leaf and names.get(name) == t.get("sha256") and merkle_root(t.get("leaves", [])) == t.get("root"):
+            trees[name] = {"leaf_bytes": leaf, "leaves": t["leaves"], "size": t.get("size")}
+    return trees, data.get("root")
+
+
+class Checkpoint:
+    """
+    Files already verified by an earlier (interrupted) run, as JSON lines of {"path", "size",
+    "mtime_ns", "sha256"}; a file is skipped while all three still match.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        e = json.loads(line)
+                        self.done[e["path"]] = e
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        self.f = open(path, "a")
+
+    def verified(self, rel, st, sha):
+        e = self.done.get(rel)
+        return bool(e) and (e.get("size"), e.get("mtime_ns"), e.get("sha256")) == (st.st_size, st.st_mtime_ns, sha)
+
+    def add(self, rel, st, sha):
+        if self.path:
+            entry = {"path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+            self.f.write(json.dumps(entry) + "\n")
+            self.f.flush()
+
+    def close(self):
+        if self.path:
+            self.f.close()
+
+
+class Progress:
+    """One status line on stderr (rewritten in place on a terminal, every 10 s otherwise)."""
+
+    def __init__(self, total_files, total_bytes, quiet=False):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.quiet = quiet
+        self.tty = sys.stderr.isatty()
+        self.t0 = time.monotonic()
+        self.last = 0.0
+
+    def show(self, files, done, final=False):
+        now = time.monotonic()
+        if self.quiet or (not final and now - self.last < (PROGRESS_INTERVAL if self.tty else 10)):
+            return
+        self.last = now
+        elapsed = max(now - self.t0, 1e-6)
+        rate = done / elapsed
+        eta = (self.total_bytes - done) / rate if rate else 0
+        line = (
+            f"verified {files}/{self.total_files} files, {done / 1e9:.1f}/{self.total_bytes / 1e9:.1f} GB, "
+            f"{rate / 1e6:.0f} MB/s, ETA {eta:.0f}s"
+        )
+        end = "\n" if final or not self.tty else ""
+        print(("\r" if self.tty else "") + line, end=end, file=sys.stderr, flush=True)
+
+
+def cross_check(drive, log_entries, failed, listed, verified_dirs):
+    """TRANSFER.LOG against the manifests: missing files, sha256 disagreements, unlogged files."""
+    by_rel, missing = {}, []
+    for dst, e in log_entries.items():
+        parts = Path(dst).parts
+        # dst is an absolute path at the exporter's mountpoint, which need not be ours: take the
+        # longest suffix that lands in a verified directory (or exists on the drive at all)
+        for i in range(1, len(parts)):
+            rel = os.path.join(*parts[i:])
+            if os.path.dirname(rel) in verified_dirs or (Path(drive) / rel).exists():
+                by_rel[rel] = e
+                if rel not in listed and not (Path(drive) / rel).exists():
+                    missing.append(rel)
+                break
+        else:
+            missing.append(dst)
+    disagree = sorted(
+        rel
+        for rel, e in by_rel.items()
+        if rel in listed and e.get("sha256") and not listed[rel].startswith(e["sha256"].lower())
+    )
+    unlogged = sorted(rel for rel in listed if rel not in by_rel)
+    return {
+        "entries": len(log_entries),
+        "matched": len(by_rel),
+        "missing_on_drive": sorted(missing),
+        "sha256_disagrees_with_manifest": disagree,
+        "not_in_log": unlogged,
+        "failed_exports": sorted(f"{e['dst']}: {e.get('result')}" for e in failed.values()),
+    }
+
+
+def verify(
+    drive,
+    jobs=None,
+    method="readinto",
+    chunk=HASH_CHUNK,
+    pattern=MANIFEST_GLOB,
+    quiet=False,
+    sample=None,
+    only=None,
+    checkpoint=None,
+    expect_roots=None,
+):
+    """
+    Verify a drive; returns the report (see module docstring). sample (0-1] spot-checks that share
+    of each file's leaves instead of hashing whole files (files without a tree are still hashed in
+    full); only is an fnmatch pattern on drive-relative paths; expect_roots maps manifest
+    directories to the Merkle root the sensor logged.
+    """
+    drive = Path(drive)
+    started = datetime.now().isoformat()
+    t0 = time.monotonic()
+    manifests = sorted(drive.glob(pattern))
+    listed = {}  # rel path -> manifest sha256
+    trees = {}  # rel path -> chunk hash tree
+    roots = {}
+    unlisted = []
+    for manifest in manifests:
+        rel_dir = manifest.parent.relative_to(drive)
+        names = read_manifest(manifest)
+        dir_trees, recorded = read_trees(manifest.parent, names)
+        computed = merkle_root([names[n] for n in sorted(names)])
+        roots[str(rel_dir)] = {
+            "root": computed,
+            "recorded": recorded,
+            "expected": (expect_roots or {}).get(str(rel_dir)),
+        }
+        for name, sha in names.items():
+            listed[str(rel_dir / name)] = sha
+            if name in dir_trees:
+                trees[str(rel_dir / name)] = dir_trees[name]
+        unlisted += [
+            str(rel_dir / p.name)
+            for p in manifest.parent.iterdir()
+            if p.is_file()
+            and p.name not in names
+            and p.name not in (manifest.name, MERKLE_FILE)
+            and not p.name.endswith(".part")
+        ]
+
+    done = Checkpoint(checkpoint)
+    missing, stats, ok, resumed, mismatch, unreadable = [], {}, [], [], {}, {}
+    for rel in listed:
+        if only and not fnmatch(rel, only):
+            continue
+        try:
+            st = (drive / rel).stat()
+        except FileNotFoundError:
+            missing.append(rel)
+            continue
+        if done.verified(rel, st, listed[rel]):
+            resumed.append(rel)
+        elif sample and rel in trees and trees[rel]["size"] not in (None, st.st_size):
+            mismatch[rel] = None  # the tree says it was a different length
+        else:
+            stats[rel] = st
+
+    jobs = jobs or auto_jobs(drive)
+    counter = multiprocessing.Value("Q", 0)
+    rng = random.Random()
+    work = {}  # rel -> (function, args, bytes it will read)
+    for rel, st in stats.items():
+        tree = trees.get(rel)
+        if sample and tree and tree["leaves"]:
+            n = len(tree["leaves"])
+            picked = sorted(rng.sample(range(n), max(1, round(n * sample))))
+            work[rel] = (sample_file, (str(drive / rel), tree, picked), len(picked) * tree["leaf_bytes"])
+        else:
+            work[rel] = (check_file, (str(drive / rel), listed[rel], tree, method, chunk), st.st_size)
+    progress = Progress(len(work), sum(w[2] for w in work.values()), quiet)
+    sampled = 0
+    try:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(counter,)) as pool:
+            # Largest first, so one big segment doesn't start last and run alone
+            order = sorted(work, key=lambda rel: work[rel][2], reverse=True)
+            pending = {pool.submit(work[rel][0], *work[rel][1]): rel for rel in order}
+            finished = 0
+            while pending:
+                ready, _ = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for fut in ready:
+                    rel = pending.pop(fut)
+                    status, detail = fut.result()
+                    finished += 1
+                    sampled += work[rel][0] is sample_file
+                    if status == "ok":
+                        ok.append(rel)
+                        if work[rel][0] is check_file:
+                            done.add(rel, stats[rel], listed[rel])
+                    elif status == "mismatch":
+                        mismatch[rel] = detail
+                    else:
+                        unreadable[rel] = detail
+                progress.show(finished, counter.value)
+        progress.show(finished, counter.value, final=True)
+    finally:
+        done.close()
+
+    for rel_dir, r in roots.items():
+        in_dir = [rel for rel in listed if os.path.dirname(rel) == rel_dir]
+        r["files_verified"] = all(rel in ok or rel in resumed for rel in in_dir) and not sample
+        r["matches_recorded"] = r["recorded"] in (None, r["root"])
+        r["matches_expected"] = r["expected"] in (None, r["root"])
+
+    seconds = time.monotonic() - t0
+    read = counter.value
+    verified_dirs = {str(m.parent.relative_to(drive)) for m in manifests}
+    log_check = cross_check(drive, *read_transfer_log(drive / "TRANSFER.LOG"), listed, verified_dirs)
+    return {
+        "drive": str(drive),
+        "started": started,
+        "seconds": round(seconds, 3),
+        "jobs": jobs,
+        "method": method,
+        "sample": sample,
+        "manifests": [str(m.relative_to(drive)) for m in manifests],
+        "bytes": read,
+        "mb_per_sec": round(read / seconds / 1e6, 1) if seconds else None,
+        "files": {
+            "listed": len(listed),
+            "ok": len(ok),
+            "resumed": len(resumed),
+            "sampled": sampled,
+            "with_tree": len(trees),
+            "mismatch": {
+                rel: None
+                if bad is None
+                else leaf_ranges(bad, trees[rel]["leaf_bytes"], stats[rel].st_size if rel in stats else 0)
+                for rel, bad in sorted(mismatch.items())
+            },
+            "missing": sorted(missing),
+            "unreadable": unreadable,
+            "unlisted": sorted(unlisted),
+        },
+        "roots": roots,
+        "drive_root": merkle_root([r["root"] for _d, r in sorted(roots.items())]),
+        "transfer_log": log_check,
+        "ok": bool(manifests)
+        and not (
+            mismatch
+            or missing
+            or unreadable
+            or log_check["missing_on_drive"]
+            or log_check["sha256_disagrees_with_manifest"]
+            or not all(r["matches_recorded"] and r["matches_expected"] for r in roots.values())
+        ),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Verify a SEER export drive against its MANIFEST.txt files")
+    ap.add_argument("drive", help="Mountpoint of the export drive")
+    ap.add_argument("--jobs", type=int, help="Parallel hashers (default: CPUs capped by the drive's queue depth)")
+    ap.add_argument("--method", choices=METHODS, default="readinto", help="How files are read (default readinto)")
+    ap.add_argument("--chunk-mb", type=int, default=HASH_CHUNK // 1024**2, help="Read size per hash update")
+    ap.add_argument("--glob", default=MANIFEST_GLOB, help=f"Manifests to verify (default {MANIFEST_GLOB})")
+    ap.add_argument("--sample", type=float, help="Spot check: hash only this share (0-1] of each file's leaves")
+    ap.add_argument("--only", help="Only files whose drive-relative path matches this pattern (e.g. '*143000*')")
+    ap.add_argument("--checkpoint", help="Record verified files here and skip them when re-run (resumable)")
+    ap.add_argument(
+        "--expect-root",
+        action="append",
+        default=[],
+        metavar="DIR=ROOT",
+        help="Merkle root the sensor logged for a manifest directory, e.g. pcap/20251012=9c1f... (repeatable)",
+    )
+    ap.add_argument("--report", help="Write the JSON report here instead of stdout")
+    ap.add_argument("--quiet", action="store_true", help="No progress on stderr")
+    args = ap.parse_args()
+
+    if not os.path.isdir(args.drive):
+        ap.error(f"{args.drive} is not a directory")
+    if args.sample is not None and not 0 < args.sample <= 1:
+        ap.error("--sample must be in (0, 1]")
+    try:
+        expect_roots = dict(item.split("=", 1) for item in args.expect_root)
+    except ValueError:
+        ap.error("--expect-root takes DIR=ROOT")
+    report = verify(
+        args.drive,
+        args.jobs,
+        args.method,
+        args.chunk_mb * 1024**2,
+        args.glob,
+        args.quiet,
+        args.sample,
+        args.only,
+        args.checkpoint,
+        {d.strip("/"): r.lower() for d, r in expect_roots.items()},
+    )
+    text = json.dumps(report, indent=2)
+    if args.report:
+        Path(args.report).write_text(text + "\n")
+    else:
+        print(text)
+    if not args.quiet:
+        f = report["files"]
+        status = "OK" if report["ok"] else "FAILED"
+        print(
+            f"{status}: {f['ok']}/{f['listed']} files verified, {len(f['mismatch'])} mismatched, "
+            f"{len(f['missing'])} missing, {len(f['unreadable'])} unreadable in {report['seconds']}s "
+            f"({report['mb_per_sec']} MB/s, {report['jobs']} jobs)",
+            file=sys.stderr,
+        )
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+SEER Zeek log reader — shared fast path for json_spool consumers (rollup, summary, shipper)
+- Chunked readinto() into one reusable bytearray; lines are memoryview slices (no per-line copies)
+- Decoder backends: msgspec, orjson, stdlib json (auto-selects the fastest installed)
+- Field projection: with `fields`, records are tuples holding only those keys (missing -> None)
+- Resumable: `offset` tracks the end of the last complete line, so tailers can continue from it
+- LogTail follows a live log across rotation (summary, metrics)
+"""
+
+import json
+import os
+from pathlib import Path
+
+READ_BUFSIZE = 1 << 20
+
+try:
+    import msgspec
+except ImportError:  # optional backend
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional backend
+    orjson = None
+
+
+def available_backends():
+    """Installed decoder backends, fastest first."""
+    out = []
+    if msgspec is not None:
+        out.append("msgspec")
+    if orjson is not None:
+        out.append("orjson")
+    out.append("json")
+    return out
+
+
+def make_decoder(fields=None, backend="auto"):
+    """
+    Return (backend_name, decode) where decode(line) accepts a bytes-like line and returns
+    a dict (fields=None) or a tuple of the projected fields. Raises ValueError on bad JSON.
+    """
+    if backend == "auto":
+        backend = available_backends()[0]
+    if backend not in available_backends():
+        raise ValueError(f"decoder backend not available: {backend}")
+    fields = tuple(fields) if fields is not None else None
+
+    if backend == "msgspec":
+        if fields is None:
+            dec = msgspec.json.Decoder()
+            return backend, dec.decode
+        # Only the projected keys are materialized; everything else is skipped by the parser
+        names = [f"f{i}" for i in range(len(fields))]
+        proj = msgspec.defstruct(
+            "ZeekProjection",
+            [(n, object, None) for n in names],
+            rename=dict(zip(names, fields, strict=True)),
+        )
+        dec = msgspec.json.Decoder(proj)
+        astuple = msgspec.structs.astuple
+
+        def decode(line):
+            try:
+                return astuple(dec.decode(line))
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+
+        return backend, decode
+
+    if backend == "orjson":
+        loads = orjson.loads
+        if fields is None:
+            return backend, loads
+
+        def decode(line):
+            get = loads(line).get
+            return tuple(map(get, fields))
+
+        return backend, decode
+
+    # stdlib: decode the slice to str once and call the C scanner directly (skips
+    # json.loads' encoding sniffing and whitespace handling; Zeek lines are compact)
+    scan_once = json.JSONDecoder().scan_once
+
+    def load(line):
+        try:
+            return scan_once(str(line, "utf-8"), 0)[0]
+        except StopIteration as e:
+            raise ValueError("not a JSON document") from e
+
+    if fields is None:
+        return backend, load
+
+    def decode(line):
+        get = load(line).get
+        return tuple(map(get, fields))
+
+    return backend, decode
+
+
+class ZeekLogReader:
+    """
+    Iterate records of a line-delimited Zeek JSON log.
+
+    Lines handed out by lines() are memoryviews into the shared buffer and are only valid
+    until the next iteration step. A trailing partial line (still being written) is left
+    unconsumed; `offset` points at its start so a later reader can pick it up. Pass
+    complete=True for closed (rotated) files to treat an unterminated last line as a record.
+    """
+
+    def __init__(self, path, fields=None, backend="auto", offset=0, bufsize=READ_BUFSIZE, complete=False):
+        self.path = path
+        self.fields = fields
+        self.complete = complete
+        self.backend, self._decode = make_decoder(fields, backend)
+        self.offset = offset
+        self.bufsize = bufsize
+        self.bad_lines = 0
+
+    def lines(self):
+        buf = bytearray(self.bufsize)
+        view = memoryview(buf)
+        filled = 0
+        with open(self.path, "rb", buffering=0) as f:
+            f.seek(self.offset)
+            while True:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                end = filled + n
+                pos = 0
+                find = buf.find
+                while (nl := find(b"\n", pos, end)) >= 0:
+                    if nl > pos:
+                        yield view[pos:nl]
+                    pos = nl + 1
+                self.offset += pos
+                filled = end - pos
+                if filled == len(buf):
+                    # A single line larger than the buffer: grow (new buffer; old slices stay valid)
+                    view.release()
+                    buf = buf + bytearray(len(buf))
+                    view = memoryview(buf)
+                elif filled:
+                    buf[:filled] = buf[pos:end]
+        if self.complete and filled:
+            self.offset += filled
+            yield view[:filled]
+        view.release()
+
+    def __iter__(self):
+        decode = self._decode
+        for line in self.lines():
+            try:
+                yield decode(line)
+            except ValueError:
+                self.bad_lines += 1
+
+
+class LogTail:
+    """Follow a Zeek log across rotation/truncation, yielding projected records."""
+
+    def __init__(self, path, fields):
+        self.path = Path(path)
+        self.fields = fields
+        self.inode = None
+        self.offset = 0
+        self.bad_lines = 0
+
+    def poll(self):
+        """Yield records appended since the last poll (partial last line is left for later)."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            # New file (rotation) or truncated: start from the beginning
+            self.inode, self.offset = st.st_ino, 0
+        if st.st_size == self.offset:
+            return
+        reader = ZeekLogReader(self.path, fields=self.fields, offset=self.offset)
+        try:
+            yield from reader
+        finally:
+            self.offset = reader.offset
+            self.bad_lines += reader.bad_lines
+
+    def skip_to_end(self):
+        """Start tailing from the current end (no replay of history on service start)."""
+        try:
+            st = os.stat(self.path)
+            self.inode, self.offset = st.st_ino, st.st_size
+        except FileNotFoundError:
+            pass
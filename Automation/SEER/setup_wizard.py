@@ -23,10 +23,21 @@ DEFAULTS = {
     "zeek_workers": 2,
     "refresh_interval": 0.5,
     "buffer_threshold": 4,
+    # Mover: move every file needed to get back under buffer_threshold per run (false = one per run)
+    "mover_batch": True,
     "ring_dir": "/var/seer/pcap_ring",
     "dest_dir": "/opt/seer/var/queue",
     "backlog_dir": "/opt/seer/var/backlog",
+    # Backlog budget while no drive is attached (0 = only capture.disk_hard_pct applies);
+    # over budget the oldest PCAPs are: drop | downsample (to backlog_snaplen bytes) | compress
+    "backlog_max_bytes": 0,
+    "backlog_policy": "drop",
+    "backlog_snaplen": 68,
+    "backlog_cpu_budget": 0.5,  # share of the cores for downsample/compress rewrites
+    # Merge closed backlog PCAPs into one segment per this many seconds (0 = off; e.g. 3600 hourly)
+    "backlog_coalesce_seconds": 0,
     "json_spool": "/var/seer/json_spool",
+    "rollup_dir": "/var/seer/rollup",
     "mover_log": "/var/log/seer/mover.log",
     "capture": {
         "snaplen": 128,
@@ -38,6 +49,46 @@ DEFAULTS = {
         "mount_candidates": ["/mnt/seer_external", "/mnt/SEER_EXT", "/media/seer_external"],
         "min_free_pct": 2,
         "poll_interval": 2,
+        # Drives are detected from mount events; rescan this often (seconds) for free space
+        "rescan_interval": 30,
+        # Besides mount_candidates, export to mounts under these roots whose volume label matches
+        "discover_roots": ["/mnt", "/media"],
+        "label_patterns": ["SEER", "EXT"],
+        # Export plan order when the backlog won't all fit: oldest|newest
+        "plan_order": "oldest",
+    },
+    # Export/mover I/O (seer_io.py): I/O class idle|best-effort|none (level 0-7 for best-effort);
+    # copies are paced to disk_mbps (the ring SSD's sustained MB/s; 0 = unshaped) minus the capture
+    # write rate x (1 + headroom_pct/100), never below min_mbps
+    "io": {
+        "class": "idle",
+        "level": 7,
+        "disk_mbps": 200,
+        "headroom_pct": 25,
+        "min_mbps": 4,
+    },
+    # Zeek JSON -> columnar compaction (seer_rollup.py); format: auto|parquet|scol
+    "rollup": {
+        "logs": ["conn", "dns"],
+        "format": "auto",
+    },
+    # On-box traffic summary (seer_summary.py): sliding windows in seconds
+    "summary": {
+        "windows": [300, 3600],
+        "bucket_seconds": 60,
+        "capacity": 64,
+        "top_n": 5,
+    },
+    # OpenMetrics exporter (seer_metrics.py): "host:port" or "unix:/run/seer/metrics.sock"
+    "metrics": {
+        "listen": "127.0.0.1:9477",
+        "service_ttl": 15,
+    },
+    # Console trend history (seer_console.py): retention hours, seconds per sample bucket, sparkline span
+    "console": {
+        "history_hours": 24,
+        "history_step": 30,
+        "trend_window": 3600,
     },
     # How long (seconds) to wait for link at boot before starting capture
     "wait_link_timeout": 60,
@@ -51,6 +102,7 @@ REQUIRED_DIRS = [
     "/opt/seer/var/backlog",
     "/var/seer/pcap_ring",
     "/var/seer/json_spool",
+    "/var/seer/rollup",
     "/var/log/seer",
 ]
 
@@ -274,7 +326,7 @@ def main(non_interactive: bool = False) -> None:
     )
 
     # Paths
-    for k in ["ring_dir", "dest_dir", "backlog_dir", "json_spool", "mover_log"]:
+    for k in ["ring_dir", "dest_dir", "backlog_dir", "json_spool", "rollup_dir", "mover_log"]:
         cfg[k] = prompt_str(f"{k} path", cfg[k])
 
     # Disk guardrails
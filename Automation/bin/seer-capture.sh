@@ -3,29 +3,34 @@ set -euo pipefail
 
 iface="${1:?usage: seer-capture.sh <iface>}"
 
+# Overridable for test harnesses (Hardware/POC/benchmarks/bench_replay.py); systemd uses the defaults
+export SEER_CONFIG="${SEER_CONFIG:-/opt/seer/etc/seer.yml}"
+RING_DIR="${RING_DIR:-/var/seer/pcap_ring}"
+CAPTURE_USER="${CAPTURE_USER:-seer}"
+
 # Read settings from YAML (fall back to hard defaults if yaml or pyyaml missing)
 rotate="$(python3 - <<'PY'
-import sys, yaml
+import os, yaml
 try:
-    cfg = yaml.safe_load(open('/opt/seer/etc/seer.yml'))
+    cfg = yaml.safe_load(open(os.environ['SEER_CONFIG']))
     print(cfg.get('capture', {}).get('rotate_seconds', 20))
 except Exception:
     print(20)
 PY
 )"
 snap="$(python3 - <<'PY'
-import sys, yaml
+import os, yaml
 try:
-    cfg = yaml.safe_load(open('/opt/seer/etc/seer.yml'))
+    cfg = yaml.safe_load(open(os.environ['SEER_CONFIG']))
     print(cfg.get('capture', {}).get('snaplen', 128))
 except Exception:
     print(128)
 PY
 )"
 
-# Ensure ring dir exists and owned by seer
-mkdir -p /var/seer/pcap_ring
-chown seer:seer /var/seer/pcap_ring || true
+# Ensure ring dir exists and owned by the capture user
+mkdir -p "$RING_DIR"
+chown "$CAPTURE_USER":"$CAPTURE_USER" "$RING_DIR" || true
 
 # Find tcpdump dynamically
 TCPDUMP="$(command -v tcpdump || true)"
@@ -35,5 +40,5 @@ if [ -z "${TCPDUMP}" ] || [ ! -x "${TCPDUMP}" ]; then
 fi
 
 # Run tcpdump as root, let it drop privileges to 'seer' via -Z after opening
-exec "${TCPDUMP}" -i "$iface" -n -U -s "$snap" -G "$rotate" -Z seer \
-  -w /var/seer/pcap_ring/SEER-%Y%m%d-%H%M%S.pcap
+exec "${TCPDUMP}" -i "$iface" -n -U -s "$snap" -G "$rotate" -Z "$CAPTURE_USER" \
+  -w "$RING_DIR/SEER-%Y%m%d-%H%M%S.pcap"
@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 # SEER Split-Panel Console (Python, curses)
-import argparse
+# Unit states and start/stop go over D-Bus (seer_systemd.py; systemctl only when the bus is unavailable)
+# Started on every console login and looped by scripts (--once): module level stays cheap. argparse,
+# subprocess and PyYAML are imported when first needed, and seer.yml comes from seer_config's cache
 import curses
 import glob
 import json
+import locale
 import os
+import select
 import shlex
 import signal
-import subprocess
 import sys
+import threading
 import time
 from datetime import datetime
-from pathlib import Path
+
+# Shared SEER modules are installed next to the console; fall back to the repo layout
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "SEER"))
+import seer_config  # noqa: E402
+import seer_perf as perf  # noqa: E402
+import seer_series  # noqa: E402
+import seer_systemd  # noqa: E402
 
 # -------- Config (override via env) --------
 REFRESH = float(os.environ.get("REFRESH", "0.5"))
@@ -27,50 +37,130 @@ SHIPPER_SERVICE = os.environ.get("SHIPPER_SERVICE", "seer-shipper.service")
 AGENT_SERVICE = os.environ.get("AGENT_SERVICE", "seer-agent.service")
 HOTSWAP_SERVICE = os.environ.get("HOTSWAP_SERVICE", "seer-hotswap.service")
 HOTSWAP_STATE = os.environ.get("HOTSWAP_STATE", "/var/log/seer/hotswap_state.json")
-
-# CLI / env flags
-parser = argparse.ArgumentParser(add_help=False)
-parser.add_argument("--no-colors", dest="no_colors", action="store_true", help="Disable colors in the TUI")
-parser.add_argument("--once", dest="once", action="store_true", help="Print a one-shot textual status and exit")
-_args, _unknown = parser.parse_known_args()
-NO_COLORS = bool(_args.no_colors) or os.environ.get("NO_COLORS", "0") in ("1", "true", "True")
+SUMMARY_STATE = os.environ.get("SUMMARY_STATE", "/var/log/seer/summary.state")
+SUMMARY_WINDOW = os.environ.get("SUMMARY_WINDOW", "5m")
+HISTORY_FILE = os.environ.get("HISTORY_FILE", "/var/log/seer/console_history.bin")
+HISTORY_SAVE_SECONDS = 60  # how often the collector persists the trend history
+SLOW_POLL_SECONDS = float(os.environ.get("SLOW_POLL_SECONDS", "15"))  # JSON spool walk (recursive glob)
+# Trend rows: (snapshot key, label); every key is recorded into the history
+TRENDS = (("buff_count", "Ring"), ("back_count", "Backlog"), ("j_bytes", "JSON"), ("drive_pcap_count", "Drive"))
+MIN_FRAME_INTERVAL = float(os.environ.get("MIN_FRAME_INTERVAL", "0.05"))  # frame budget; raise on serial consoles
+STATUS_SECONDS = 5  # how long an action's status message stays up
+SYSTEMD_RETRY = 30.0  # seconds between system bus reconnect attempts (systemctl is used meanwhile)
+
+NO_COLORS = os.environ.get("NO_COLORS", "0") in ("1", "true", "True")
+COLORS = False  # set once render() has started colors
+_args = None  # CLI flags, parsed in main()
+
+
+def parse_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--no-colors", dest="no_colors", action="store_true", help="Disable colors in the TUI")
+    parser.add_argument("--once", dest="once", action="store_true", help="Print a one-shot textual status and exit")
+    parser.add_argument("--perf", dest="perf", action="store_true", help="With --once: also print hot-path timings")
+    parser.add_argument("--profile", dest="profile", action="store_true", help="cProfile/tracemalloc, dumped on exit")
+    args, _unknown = parser.parse_known_args()
+    return args
 
 
 def run(cmd):
+    import subprocess  # only without a system bus, or for a mount toggle
+
     return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
 
 
 def read_cfg():
     """Read /opt/seer/etc/seer.yml if present and return dict; safe fallback."""
-    path = "/opt/seer/etc/seer.yml"
     try:
-        import yaml
-
-        with open(path) as f:
-            cfg = yaml.safe_load(f) or {}
-        return cfg
+        return seer_config.load(seer_config.CONFIG_PATH)
     except Exception:
         return {}
 
 
-# Load config early so we can honor json_spool path from YAML
-_CFG_BOOT = read_cfg()
-if isinstance(_CFG_BOOT, dict):
-    JSON_SPOOL = _CFG_BOOT.get("json_spool", JSON_SPOOL) or JSON_SPOOL
-    _IFACE_BOOT = _CFG_BOOT.get("interface", "enp2s0")
-    # If CAPTURE_SERVICE not explicitly set via env, derive from YAML
-    if os.environ.get("CAPTURE_SERVICE") in (None, ""):
-        CAPTURE_SERVICE = f"seer-capture@{_IFACE_BOOT}.service"
+def load_boot_config():
+    """Settings fixed for the whole run: json_spool path and the interface behind the templated units."""
+    global JSON_SPOOL, CAPTURE_SERVICE, _IFACE_BOOT
+    cfg = read_cfg()
+    if isinstance(cfg, dict):
+        JSON_SPOOL = cfg.get("json_spool", JSON_SPOOL) or JSON_SPOOL
+        _IFACE_BOOT = cfg.get("interface", "enp2s0")
+        # If CAPTURE_SERVICE not explicitly set via env, derive from YAML
+        if os.environ.get("CAPTURE_SERVICE") in (None, ""):
+            CAPTURE_SERVICE = f"seer-capture@{_IFACE_BOOT}.service"
+
+
+_systemd = None
+_systemd_retry = 0.0
+
+
+def systemd():
+    """The shared D-Bus unit watcher (seer_systemd), or None while the system bus is unavailable."""
+    global _systemd, _systemd_retry
+    if _systemd is None and time.monotonic() >= _systemd_retry:
+        units = [CAPTURE_SERVICE, MOVER_SERVICE, MOVER_TIMER, HOTSWAP_SERVICE, zeek_unit()]
+        _systemd = seer_systemd.connect(units)
+        if _systemd is None:
+            _systemd_retry = time.monotonic() + SYSTEMD_RETRY
+    return _systemd
+
+
+def _systemd_lost():
+    global _systemd, _systemd_retry
+    if _systemd is not None:
+        _systemd.close()
+    _systemd = None
+    _systemd_retry = time.monotonic() + SYSTEMD_RETRY
+
+
+def systemd_changed():
+    """True if a watched unit changed state since the last call (no syscalls beyond a poll of the bus socket)."""
+    if _systemd is None:
+        return False
+    try:
+        return _systemd.poll()
+    except (OSError, seer_systemd.DBusError):
+        _systemd_lost()
+        return True
 
 
 def systemctl_is_active(unit):
     if not unit:
         return "inactive"
+    units = systemd()
+    if units is not None:
+        try:
+            return units.active_state(unit)
+        except (OSError, seer_systemd.DBusError):
+            _systemd_lost()
     r = run(["systemctl", "is-active", unit])
     s = (r.stdout or r.stderr or "").strip()
     return s if s else "inactive"
 
 
+def systemctl(action, *units):
+    """systemctl start/stop/restart/daemon-reload through the bus (queued jobs); True if accepted."""
+    watcher = systemd()
+    if watcher is not None:
+        try:
+            if action == "daemon-reload":
+                watcher.reload_daemon()
+            for unit in units:
+                getattr(watcher, action)(unit)
+            return True
+        except seer_systemd.DBusError:
+            pass  # e.g. access denied: let systemctl (and polkit) handle it
+        except OSError:
+            _systemd_lost()
+    return run(["systemctl", action, *units]).returncode == 0
+
+
+def zeek_unit():
+    # Prefer interface from YAML; fall back to env IFACE or enp2s0
+    return f"seer-zeek@{_IFACE_BOOT if '_IFACE_BOOT' in globals() else os.environ.get('IFACE', 'enp2s0')}.service"
+
+
 def badge_text(state):
     s = (state or "").lower()
     if s == "active":
@@ -91,6 +181,99 @@ def count_pcaps(path):
         return 0
 
 
+def count_tree_pcaps(root):
+    """PCAPs anywhere under root (an export drive's per-day directories)."""
+    return sum(1 for _dir, _dirs, files in os.walk(root) for name in files if ".pcap" in name)
+
+
+class DriveFileCount:
+    """
+    PCAPs on one export drive, from its verified-copy index (<drive>/.seer/index.jsonl, see
+    seer_copy.DriveIndex) tailed with seer_zeeklog.LogTail: a poll reads only the lines appended
+    since the last one instead of walking the drive.
+    """
+
+    def __init__(self, mount):
+        from seer_zeeklog import LogTail
+
+        self.tail = LogTail(os.path.join(mount, ".seer", "index.jsonl"), ("path",))
+        self.paths = set()
+
+    def count(self):
+        inode = self.tail.inode
+        records = list(self.tail.poll())
+        if self.tail.inode != inode:
+            self.paths = set()  # another drive (or a fresh index) at this mountpoint
+        self.paths.update(path for (path,) in records if isinstance(path, str) and ".pcap" in os.path.basename(path))
+        return len(self.paths)
+
+
+class FileCounts:
+    """
+    The TUI's file counts without rescanning every frame: ring and backlog from DirIndexes kept by
+    inotify (seer_backlog.py, as seer_metrics.py does; rescanned per poll only without inotify),
+    export drives from their copy index (DriveFileCount), the JSON spool every SLOW_POLL_SECONDS.
+    """
+
+    def __init__(self, cfg):
+        from seer_backlog import DirIndex, Inotify
+
+        self.ring = DirIndex(BUFF_DIR)
+        self.backlog = DirIndex(cfg.get("backlog_dir", "/opt/seer/var/backlog"))
+        try:
+            self.inotify = Inotify()
+        except (OSError, AttributeError):
+            self.inotify = None
+        self.drives = {}
+        self.j_bytes = 0
+        self.j_polled = None
+        for idx in (self.ring, self.backlog):
+            idx.rescan()
+
+    def fileno(self):
+        """inotify fd that becomes readable when the ring or backlog changes, or None."""
+        return self.inotify.fd if self.inotify else None
+
+    def sync(self):
+        """Apply pending directory events; rescan the directories inotify is not watching."""
+        from seer_backlog import IN_DELETE_SELF, IN_IGNORED, IN_MOVE_SELF, IN_Q_OVERFLOW
+
+        indexes = (self.ring, self.backlog)
+        for idx in indexes:
+            try:
+                watched = self.inotify is not None and idx.watch(self.inotify)
+            except OSError:
+                watched = False
+            if not watched:
+                idx.rescan()
+        if self.inotify is None:
+            return
+        by_wd = {idx.wd: idx for idx in indexes if idx.wd is not None}
+        now = time.time()
+        for wd, mask, name in self.inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                for idx in indexes:
+                    idx.rescan()
+            elif wd not in by_wd:
+                continue
+            elif mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                by_wd[wd].wd = None  # directory went away; re-watched on the next sync
+            else:
+                by_wd[wd].event(mask, name, now)
+
+    def drive_pcaps(self, mounts):
+        for mount in set(self.drives) - set(mounts):
+            del self.drives[mount]
+        return sum(self.drives.setdefault(mount, DriveFileCount(mount)).count() for mount in mounts)
+
+    def json_bytes(self):
+        now = time.monotonic()
+        if self.j_polled is None or now - self.j_polled >= SLOW_POLL_SECONDS:
+            self.j_bytes = json_stats(JSON_SPOOL)[1]
+            self.j_polled = now
+        return self.j_bytes
+
+
 def read_hotswap_state():
     """Read hotswap state file for export drive status."""
     try:
@@ -100,6 +283,62 @@ def read_hotswap_state():
         return {}
 
 
+def perf_lines(hs_state):
+    """Hot-path span timings: hotswap's (from its state file) and the mover's (accumulated across runs)."""
+    try:
+        with open(os.path.join(perf.PERF_DIR, "mover.json")) as f:
+            mover = json.load(f).get("spans", {})
+    except (OSError, ValueError):
+        mover = {}
+    lines = []
+    for who, spans in (("hotswap", hs_state.get("perf") or {}), ("mover", mover), ("console", perf.snapshot())):
+        for name, st in spans.items():
+            lines.append(
+                f"{who + '.' + name:<20} n={st['count']:<7} p50={st['p50_ms']:.1f}ms "
+                f"p99={st['p99_ms']:.1f}ms max={st['max_ms']:.1f}ms"
+            )
+    return lines
+
+
+def export_mounts(hs_state, cfg):
+    """Drives the hotswap service is exporting to (several when striping); else first mounted candidate."""
+    if hs_state.get("drives"):
+        return hs_state["drives"]
+    for candidate in cfg.get("export", {}).get("mount_candidates", ["/mnt/seer_external"]):
+        if os.path.ismount(candidate):
+            return [candidate]
+    return []
+
+
+def read_summary_state():
+    """Read traffic summary state (seer_summary.py) for top hosts/ports/protocols/DNS."""
+    try:
+        with open(SUMMARY_STATE) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def traffic_lines(summary, window=SUMMARY_WINDOW, n=2):
+    """Format one summary window as [(label, text), ...] for the TRAFFIC panel."""
+    win = (summary.get("windows") or {}).get(window)
+    if not win:
+        return []
+
+    def fmt(key, value_fmt=str):
+        items = win.get(key) or []
+        return "  ".join(f"{k} ({value_fmt(v)})" for k, v in items[:n]) or "-"
+
+    return [
+        ("Conns", f"{win.get('conn', 0)}  DNS {win.get('dns', 0)}  {human_bytes(win.get('bytes', 0))}"),
+        ("Hosts", fmt("top_hosts")),
+        ("Bytes", fmt("top_talkers", human_bytes)),
+        ("Ports", fmt("top_ports")),
+        ("Proto", fmt("top_services")),
+        ("DNS", fmt("top_dns")),
+    ]
+
+
 def json_stats(path):
     """Return (file_count, total_bytes, last_mtime_epoch) for JSON/log files.
     - Searches recursively to handle both flat and dated subdirs.
@@ -141,6 +380,21 @@ def human_bytes(n):
     return f"{v:.1f} {u[i]}"
 
 
+def export_progress_text(hs_state):
+    """One-line export status from hotswap state: progress/ETA while copying, then "safe to remove"."""
+    if not hs_state.get("drive_present"):
+        return ""
+    exp = hs_state.get("export") or {}
+    if exp.get("state") == "copying":
+        planned = exp.get("planned_bytes") or 0
+        pct = int(exp.get("done_bytes", 0) * 100 / planned) if planned else 0
+        eta = int(exp.get("eta_seconds") or 0)
+        return f"copying {pct}% ({human_bytes(exp.get('remaining_bytes', 0))} left, ETA {eta // 60}m{eta % 60:02d}s)"
+    if hs_state.get("safe_to_remove"):
+        return "safe to remove"
+    return ""
+
+
 def human_ago(epoch_ts):
     if not epoch_ts:
         return "n/a"
@@ -156,6 +410,46 @@ def human_ago(epoch_ts):
     return f"{h}h {m}m"
 
 
+def history_settings(cfg):
+    """(capacity, step, trend window) from the YAML 'console' section: retention is capacity * step seconds."""
+    section = cfg.get("console") or {}
+    step = max(1, int(section.get("history_step", 30)))
+    capacity = max(2, int(float(section.get("history_hours", 24)) * 3600 // step))
+    window = max(step, int(section.get("trend_window", 3600)))
+    return capacity, step, window
+
+
+def open_history(cfg):
+    capacity, step, _window = history_settings(cfg)
+    return seer_series.SeriesStore.load(HISTORY_FILE, capacity, step)
+
+
+def window_text(secs):
+    if secs % 3600 == 0:
+        return f"{secs // 3600}h"
+    return f"{secs // 60}m" if secs % 60 == 0 else f"{secs}s"
+
+
+def trend_ticks():
+    """Block characters when the terminal encoding can show them, ASCII otherwise."""
+    utf8 = locale.getpreferredencoding(False).lower().replace("-", "") == "utf8"
+    return seer_series.BLOCKS if utf8 else seer_series.ASCII_BLOCKS
+
+
+def trend_lines(history, window, now, width, ticks):
+    """[(label, sparkline, newest value text)] for each TRENDS metric with any history."""
+    lines = []
+    for key, label in TRENDS:
+        series = history.series.get(key)
+        if series is None or series.last is None:
+            continue
+        values = series.window(window, now)
+        newest = series.values[series.last % series.capacity]
+        text = human_bytes(newest) if key == "j_bytes" else f"{newest:.0f}"
+        lines.append((label, seer_series.sparkline(values, width, ticks), text))
+    return lines
+
+
 def safe_addstr(stdscr, y, x, text, attr=0):
     """Safely add string to screen, ignoring errors if out of bounds."""
     try:
@@ -173,32 +467,13 @@ def safe_addstr(stdscr, y, x, text, attr=0):
         pass  # Ignore curses errors
 
 
-def draw_text(stdscr, y, x, w, text):
-    try:
-        h, width = stdscr.getmaxyx()
-        if y < h and x < width:
-            safe_text = (text[:w]).ljust(w)[: width - x - 1]
-            stdscr.addstr(y, x, safe_text)
-    except curses.error:
-        pass  # Ignore curses errors from writing outside bounds
-
-
-def divider(stdscr, y, width, ch="-"):
-    try:
-        h, w = stdscr.getmaxyx()
-        if y < h:
-            stdscr.addstr(y, 0, (ch * width)[: min(width, w - 1)])
-    except curses.error:
-        pass
-
-
 def act_stop():
     units = [CAPTURE_SERVICE, MOVER_SERVICE]
     if MOVER_TIMER:
         units.append(MOVER_TIMER)
     if HOTSWAP_SERVICE:
         units.append(HOTSWAP_SERVICE)
-    run(["systemctl", "stop", *units])
+    systemctl("stop", *units)
 
 
 def act_clear(buff_dir):
@@ -217,24 +492,21 @@ def act_clear(buff_dir):
 
 
 def act_start():
-    run(["systemctl", "daemon-reload"])
+    systemctl("daemon-reload")
     # Restart capture service
     if CAPTURE_SERVICE:
-        r = run(["systemctl", "restart", CAPTURE_SERVICE])
-        if r.returncode != 0:
-            run(["systemctl", "start", CAPTURE_SERVICE])
+        if not systemctl("restart", CAPTURE_SERVICE):
+            systemctl("start", CAPTURE_SERVICE)
 
     # Restart timer (not the service - timer manages service activation)
     if MOVER_TIMER:
-        r = run(["systemctl", "restart", MOVER_TIMER])
-        if r.returncode != 0:
-            run(["systemctl", "start", MOVER_TIMER])
+        if not systemctl("restart", MOVER_TIMER):
+            systemctl("start", MOVER_TIMER)
 
     # Restart hotswap service
     if HOTSWAP_SERVICE:
-        r = run(["systemctl", "restart", HOTSWAP_SERVICE])
-        if r.returncode != 0:
-            run(["systemctl", "start", HOTSWAP_SERVICE])
+        if not systemctl("restart", HOTSWAP_SERVICE):
+            systemctl("start", HOTSWAP_SERVICE)
 
 
 def act_toggle_mount():
@@ -258,95 +530,45 @@ def act_toggle_mount():
                     return f"✓ Unmounted {target} (lazy - will complete when files close)"
             return f"✗ Failed to unmount {target}: {result.stderr.strip()}"
 
-    # Not mounted - try to mount
-    # Strategy: Find external drives by checking:
-    # 1. /dev/sd[b-z] (non-system disks)
-    # 2. Removable flag (RM=1)
-    # 3. USB connection (check /sys path)
-    # 4. Has filesystem
+    # Not mounted - pick a filesystem from the cached block-device inventory
+    # (/dev/disk/by-uuid|by-label and sysfs; no lsblk/blkid forks). Preference:
+    # 1. Volume label matching export.label_patterns (SEER/EXT)
+    # 2. Removable media
+    # 3. Anything larger than 1 GB
+    # Filesystems on the system disk (/, /boot) and active swap are never considered.
+    from seer_drives import LABEL_PATTERNS, DriveInventory
 
-    result = run(["lsblk", "-nrbo", "NAME,SIZE,TYPE,RM,MOUNTPOINT,FSTYPE"])
+    inventory = DriveInventory()
+    system_disks = inventory.system_disks()
+    patterns = [p.upper() for p in cfg.get("export", {}).get("label_patterns", LABEL_PATTERNS)]
 
     candidates = []
-
-    for line in result.stdout.splitlines():
-        parts = line.split()
-        if len(parts) < 4:
-            continue
-
-        dev_name = parts[0]
-        size = int(parts[1]) if parts[1].isdigit() else 0
-        dev_type = parts[2]
-        removable = parts[3]
-
-        # Parse optional mountpoint and fstype
-        # When no mountpoint, fstype shifts left
-        mountpoint = ""
-        fstype = ""
-        if len(parts) >= 5:
-            # Could be mountpoint or fstype
-            if parts[4] in ("ext4", "ext3", "ext2", "xfs", "btrfs", "ntfs", "vfat", "exfat", "fat32"):
-                fstype = parts[4]
-            else:
-                mountpoint = parts[4]
-                fstype = parts[5] if len(parts) > 5 else ""
-
-        # Skip if already mounted
-        if mountpoint:
-            continue
-
-        # Skip system disk (sda)
-        if dev_name.startswith("sda"):
+    for dev in inventory.unmounted():
+        if dev["disks"] & system_disks:
             continue
-
-        # Only consider disks (not partitions, loop, etc)
-        if dev_type != "disk":
-            continue
-
-        # Strategy: Accept any non-sda disk with a filesystem
-        # This includes USB-SATA cradles, external drives, etc.
-
-        # Prioritize: sdb* > removable > has filesystem > large
+        label = (dev.get("label") or "").upper()
         priority = 0
-
-        # Highest priority: /dev/sdb (most common external drive)
-        if dev_name.startswith("sdb"):
+        if any(p in label for p in patterns):
             priority = 10
-        # Medium priority: marked as removable
-        elif removable == "1":
+        elif dev["removable"]:
             priority = 5
-        # Low priority: has filesystem and large enough
-        elif fstype and size > 1000000000:  # >1GB with filesystem
+        elif dev["size"] > 1000000000:
             priority = 3
-        # Fallback: any disk over 1GB (even without filesystem shown)
-        elif size > 1000000000:
-            priority = 1
-
         if priority > 0:
-            candidates.append((priority, size, dev_name, dev_type))
+            candidates.append((priority, dev["size"], dev["node"], dev.get("label")))
 
     if not candidates:
-        # Debug: show what we found
-        debug_info = run(["lsblk", "-o", "NAME,SIZE,TYPE,RM,FSTYPE,MOUNTPOINT"])
+        # Debug: show what we found (only on failure)
+        debug_info = run(["lsblk", "-o", "NAME,SIZE,TYPE,RM,FSTYPE,LABEL,MOUNTPOINT"])
         return f"✗ No suitable drive found\n\nAvailable devices:\n{debug_info.stdout}"
 
     # Sort by priority (highest first), then size (largest first)
     candidates.sort(key=lambda x: (x[0], x[1]), reverse=True)
-    best_device = candidates[0][2]
-    device_path = f"/dev/{best_device}"
+    device_path = candidates[0][2]
 
     # Ensure mount point exists
     os.makedirs(target, exist_ok=True)
 
-    # Try to mount - first check if device exists
-    if not os.path.exists(device_path):
-        return f"✗ Device {device_path} not found"
-
-    # Check if device has a filesystem
-    blkid_result = run(["sudo", "blkid", device_path])
-    if blkid_result.returncode != 0:
-        return f"✗ No filesystem detected on {device_path}. Use: sudo mkfs.ext4 {device_path}"
-
     # Try to mount
     mount_result = run(["sudo", "mount", device_path, target])
 
@@ -385,17 +607,7 @@ def collect_status():
     mov_state = systemctl_is_active(MOVER_SERVICE)
     tim_state = systemctl_is_active(MOVER_TIMER) if MOVER_TIMER else "n/a"
     hot_state = systemctl_is_active(HOTSWAP_SERVICE)
-
-    # Prefer interface from YAML; fall back to env IFACE or enp2s0
-    iface = None
-    try:
-        iface = _IFACE_BOOT  # set at import from read_cfg()
-    except NameError:
-        iface = None
-    if not iface:
-        iface = os.environ.get("IFACE", "enp2s0")
-    zeek_unit = f"seer-zeek@{iface}.service"
-    zeek_state = systemctl_is_active(zeek_unit)
+    zeek_state = systemctl_is_active(zeek_unit())
 
     cfg = read_cfg()
     ring_dir = cfg.get("ring_dir", "/var/seer/pcap_ring")
@@ -413,6 +625,8 @@ def collect_status():
     last_export = hs_state.get("last_export_ts", None)
     total_exported = hs_state.get("total_exported", 0)
 
+    summary = read_summary_state()
+
     return {
         "cap_state": cap_state,
         "mov_state": mov_state,
@@ -426,7 +640,13 @@ def collect_status():
         "dest_count": dest_count,
         "back_count": back_count,
         "json": {"count": j_count, "bytes": j_bytes, "last": j_last},
-        "export": {"drive_present": drive_present, "last_export_ts": last_export, "total_exported": total_exported},
+        "export": {
+            "drive_present": drive_present,
+            "last_export_ts": last_export,
+            "total_exported": total_exported,
+            "progress": export_progress_text(hs_state),
+        },
+        "traffic": {"window": SUMMARY_WINDOW, "updated": summary.get("updated"), "lines": traffic_lines(summary)},
     }
 
 
@@ -475,8 +695,382 @@ def show_help(stdscr):
     stdscr.nodelay(True)
 
 
-def render(stdscr):
+def tui_snapshot(files):
+    """
+    Everything the TUI shows, as a plain comparable dict (built on the Collector thread); file
+    counts come from `files` (FileCounts), so a snapshot costs a few small reads, not directory walks.
+    """
+    cfg = read_cfg()
+    hs_state = read_hotswap_state()
+    drive_present = hs_state.get("drive_present", False)
+    files.sync()
+    mounts = export_mounts(hs_state, cfg) if drive_present else []
+    return {
+        "cap_state": systemctl_is_active(CAPTURE_SERVICE),
+        "mov_state": systemctl_is_active(MOVER_SERVICE),
+        "tim_state": systemctl_is_active(MOVER_TIMER) if MOVER_TIMER else "n/a",
+        "hot_state": systemctl_is_active(HOTSWAP_SERVICE),
+        "zeek_state": systemctl_is_active(zeek_unit()),
+        "buff_count": len(files.ring.files),
+        "back_count": len(files.backlog.files),
+        "j_bytes": files.json_bytes(),
+        "drive_present": drive_present,
+        "active_mount": ", ".join(mounts) or "drive",
+        "drive_pcap_count": files.drive_pcaps(mounts),
+        "export_text": export_progress_text(hs_state),
+        "traffic": traffic_lines(read_summary_state()),
+    }
+
+
+class Collector(threading.Thread):
+    """
+    Gathers tui_snapshot() every REFRESH seconds, and at once when a unit changes state on the bus,
+    a file lands in or leaves the ring or backlog (inotify), or kick() is called (after a key
+    action). The UI sleeps in select() on wake_fd, which only becomes readable when the snapshot
+    differs from the previous one. Each snapshot's TRENDS metrics are recorded into the ring
+    history, whose sparklines ride along in the snapshot.
+    """
+
+    def __init__(self):
+        super().__init__(name="collector", daemon=True)
+        self.wake_fd, self._wake_w = os.pipe()
+        self._kick_r, self._kick_w = os.pipe()
+        for fd in (self.wake_fd, self._wake_w, self._kick_r, self._kick_w):
+            os.set_blocking(fd, False)
+        self.lock = threading.Lock()
+        self.snapshot = None
+        cfg = read_cfg()
+        self.history = open_history(cfg)
+        self.trend_window = history_settings(cfg)[2]
+        self.trend_width = 24  # sparkline columns; render() sets it from the terminal width
+        self.ticks = trend_ticks()
+        self.saved = time.monotonic()
+
+    @staticmethod
+    def _poke(fd):
+        try:
+            os.write(fd, b"x")
+        except BlockingIOError:
+            pass  # already pending
+
+    @staticmethod
+    def _drain(fd):
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wake(self):
+        self._poke(self._wake_w)
+
+    def kick(self):
+        self._poke(self._kick_w)
+
+    def latest(self):
+        """The newest snapshot; also clears the wakeup."""
+        self._drain(self.wake_fd)
+        with self.lock:
+            return self.snapshot
+
+    def save_history(self):
+        with self.lock:
+            try:
+                self.history.save(HISTORY_FILE)
+            except OSError:
+                pass  # no /var/log/seer (not installed): trends just start over next time
+            self.saved = time.monotonic()
+
+    def run(self):
+        files = FileCounts(read_cfg())
+        while True:
+            t0 = time.perf_counter()
+            snap = tui_snapshot(files)
+            now = time.time()
+            with self.lock:
+                self.history.record(now, {key: snap[key] for key, _label in TRENDS})
+                snap["trends"] = trend_lines(self.history, self.trend_window, now, self.trend_width, self.ticks)
+            perf.observe("collect", time.perf_counter() - t0)
+            if time.monotonic() - self.saved >= HISTORY_SAVE_SECONDS:
+                self.save_history()
+            with self.lock:
+                changed = snap != self.snapshot
+                self.snapshot = snap
+            if changed:
+                self.wake()
+            watched = [self._kick_r] + ([_systemd] if _systemd is not None else [])
+            inotify_fd = files.fileno()
+            ready, _, _ = select.select(watched + ([inotify_fd] if inotify_fd is not None else []), [], [], REFRESH)
+            if self._kick_r in ready:
+                self._drain(self._kick_r)
+            if _systemd is not None and _systemd in ready:
+                systemd_changed()  # read the signals off the bus; the next snapshot has the new state
+            # inotify events are read by the next snapshot's files.sync()
+
+
+class Screen:
+    """
+    Differential renderer. A frame is put() as rows of (x, text, attr) segments; commit() clears and
+    redraws only the rows that differ from the last committed frame, then sends one doupdate().
+    """
+
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.rows = {}
+        self.drawn = {}
+
+    def put(self, y, x, text, attr=0):
+        self.rows.setdefault(y, []).append((x, text, attr))
+
+    def text(self, y, x, w, text, attr=0):
+        """Text padded/clipped to w columns (so a shorter value blanks the rest of the old one)."""
+        self.put(y, x, text[:w].ljust(w), attr)
+
+    def divider(self, y, width, ch="-"):
+        self.put(y, 0, ch * width)
+
+    def invalidate(self):
+        """Forget what is on the terminal (resize, after a pager): the next commit redraws everything."""
+        self.drawn = {}
+        self.stdscr.clear()
+
+    def commit(self):
+        """Draw the changed rows; returns how many there were."""
+        h, _w = self.stdscr.getmaxyx()
+        changed = [y for y in set(self.rows) | set(self.drawn) if self.rows.get(y) != self.drawn.get(y)]
+        for y in changed:
+            if y >= h:
+                continue
+            try:
+                self.stdscr.move(y, 0)
+                self.stdscr.clrtoeol()
+            except curses.error:
+                pass
+            for x, text, attr in self.rows.get(y, ()):
+                safe_addstr(self.stdscr, y, x, text, attr)
+        self.drawn, self.rows = self.rows, {}
+        if changed:
+            self.stdscr.noutrefresh()
+            curses.doupdate()
+        return len(changed)
+
+
+def color(pair, extra=0):
+    return (curses.color_pair(pair) | extra) if COLORS else extra
+
+
+def badge_attr(c):
+    return color(c, curses.A_BOLD if c == 2 else 0)
+
+
+def draw_compact(screen, snap, ui, w):
+    # COMPACT MODE - Show only PCAP info
+    screen.text(0, 0, w, f"SEER [{datetime.now().strftime('%H:%M:%S')}]")
+    screen.divider(1, w)
+
+    screen.put(2, 0, "PCAP:")
+    screen.put(3, 2, f"Ring    : {snap['buff_count']}")
+    screen.put(4, 2, f"Backlog : {snap['back_count']}")
+
+    # Drive status
+    if snap["drive_present"]:
+        screen.put(5, 2, "Drive   : ", color(2))
+        screen.put(5, 12, f"CONNECTED {snap['export_text']}"[: w - 12])
+        screen.put(6, 2, f"Mount   : {snap['active_mount'][: w - 12]}")
+        screen.put(7, 2, f"On Drive: {snap['drive_pcap_count']} files")
+    else:
+        screen.put(5, 2, "Drive   : ", color(3))
+        screen.put(5, 12, "not connected")
+
+    screen.divider(8, w)
+    screen.put(9, 0, "[2] Mount/Unmount  [q] Quit")
+
+    # Show status message if recent (within 5 seconds)
+    if ui["status"] and (time.time() - ui["status_time"] < STATUS_SECONDS):
+        screen.put(10, 0, f"Status: {ui['status'][: w - 8]}")
+    else:
+        screen.put(10, 0, f"Input: {ui['last_key']}")
+
+
+def draw_full(screen, snap, ui, w):
+    # FULL MODE - Show everything
+    now = datetime.now()
+    hdr = f"SEER MONITOR  [REF: {REFRESH:.1f}s]  [HOST: {ui['host']}]  [TIME: {now.strftime('%H:%M:%S  %b %d %Y')}]"
+    # Header: bold + accent color (pair 4)
+    screen.put(0, 0, hdr, color(4, curses.A_BOLD))
+    screen.divider(1, w)
+
+    left_w = w // 2 - 1
+    right_w = w - left_w - 3
+    # Section titles: bold + header color
+    screen.put(2, 0, f"+ SYSTEM {'-' * (max(0, left_w - 10))}", color(4, curses.A_BOLD))
+    screen.put(2, left_w + 1, f"+ CONTROLS {'-' * (max(0, right_w - 12))}", color(4, curses.A_BOLD))
+    for r in range(3, 12):
+        screen.put(r, left_w, "|")
+
+    s, c = badge_text(snap["cap_state"])
+    screen.put(3, 2, "  CAPTURE : ")
+    screen.put(3, 14, s, badge_attr(c))
+    s, c = badge_text(snap["mov_state"])
+    screen.put(4, 2, "  MOVER   : ")
+    screen.put(4, 14, s, badge_attr(c))
+    screen.put(5, 2, f"  TIMER   : {snap['tim_state']}")
+    screen.put(6, 2, f"  ZEEK    : {snap['zeek_state']}")
+    s, c = badge_text(snap["hot_state"])
+    screen.put(7, 2, "  HOTSWAP : ")
+    screen.put(7, 14, s, badge_attr(c))
+
+    screen.put(8, 0, "PCAP:")
+    # PCAP counts: make numeric values use the active/accent color for visibility
+    screen.put(9, 2, "  Ring        : ")
+    screen.put(9, 21, f"{snap['buff_count']:<5}", color(2, curses.A_BOLD))
+    screen.put(10, 2, "  Backlog     : ")
+    screen.put(10, 21, f"{snap['back_count']:<5}", color(3, curses.A_DIM))
+
+    # Show drive status and destination
+    if snap["drive_present"]:
+        # Drive connected: label in accent, value bold
+        screen.put(11, 2, "  Drive       : ", color(5))
+        screen.put(11, 17, "CONNECTED", color(2, curses.A_BOLD))
+        screen.put(12, 2, "  Mount       : ")
+        screen.put(12, 16, f"{snap['active_mount'][: w - 18]}", color(5))
+        screen.put(13, 2, "  On Drive    : ")
+        screen.put(13, 16, f"{snap['drive_pcap_count']} files", color(2))
+    else:
+        screen.put(11, 2, "  Drive       : ", color(3))
+        screen.put(11, 17, "not connected")
+
+    # JSON stats: size in accent color
+    screen.put(14, 0, "JSON:")
+    screen.put(15, 2, "  Captured    : ")
+    screen.put(15, 18, f"{human_bytes(snap['j_bytes']):<12}", color(2, curses.A_BOLD))
+
+    # Controls: make keys accent colored for quick scanning
+    x = left_w
+    screen.put(3, x + 2, "[1] ")
+    screen.put(3, x + 6, "Stop", color(1))
+    screen.put(3, x + 12, "   [3] ")
+    screen.put(3, x + 18, "Start", color(2, curses.A_BOLD))
+    screen.put(4, x + 2, "[2] ")
+    screen.put(4, x + 6, "Mount/Unmount Drive", color(5))
+    screen.put(5, x + 2, "[z] ")
+    screen.put(5, x + 6, "Zeek Start", color(2))
+    screen.put(5, x + 20, "[x] ")
+    screen.put(5, x + 24, "Stop", color(1))
+    screen.put(7, x + 2, "[c] ")
+    screen.put(7, x + 6, "Cap", color(5))
+    screen.put(7, x + 12, "[m] ")
+    screen.put(7, x + 16, "Mov", color(5))
+    screen.put(7, x + 22, "[h] ")
+    screen.put(7, x + 26, "Hot", color(5))
+    screen.put(8, x + 2, "[s] ")
+    screen.put(8, x + 6, "Status", color(5))
+    screen.put(8, x + 16, "[+/-] ")
+    screen.put(8, x + 22, "Speed", color(5))
+    screen.put(10, x + 2, "[?] ")
+    screen.put(10, x + 6, "Help", color(4, curses.A_BOLD))
+    screen.put(10, x + 16, "[q] ")
+    screen.put(10, x + 20, "Quit", color(5))
+
+    # Export progress / "safe to remove" (right column, between controls and traffic)
+    export_text = snap["export_text"]
+    if export_text:
+        attr = color(2, curses.A_BOLD) if export_text == "safe to remove" else color(5)
+        screen.put(11, x + 2, f"Export: {export_text}"[: max(0, right_w - 3)], attr)
+
+    # Traffic summary (right column, below controls)
+    screen.put(12, x + 1, f"+ TRAFFIC ({SUMMARY_WINDOW}) {'-' * (max(0, right_w - 16))}", color(4, curses.A_BOLD))
+    if snap["traffic"]:
+        for i, (label, text) in enumerate(snap["traffic"]):
+            screen.put(13 + i, x + 2, f"{label:<6}: {text}")
+    else:
+        screen.put(13, x + 2, "no summary (seer-summary.service)")
+
+    # Trends (left column, below JSON): ring, backlog and JSON spool over the trend window
+    label_w = 16
+    for i, (label, spark, text) in enumerate(snap["trends"][:3]):
+        screen.put(16 + i, 2, f"  {label:<8}{window_text(ui['trend_window']):>3} ")
+        screen.put(16 + i, label_w, spark[: max(0, left_w - label_w - 1)], color(2))
+    screen.divider(19, w)
+    # Show status message if recent (within 5 seconds); otherwise show last input
+    if ui["status"] and (time.time() - ui["status_time"] < STATUS_SECONDS):
+        screen.text(20, 0, w, f"Status: {ui['status']}")
+    else:
+        screen.text(20, 0, w, f"Input: {ui['last_key']}")
+
+
+def run_pager(screen, command):
+    """Leave curses for a shell command (pager, zeek control), then repaint everything."""
+    curses.def_prog_mode()
+    curses.endwin()
+    os.system(command)
+    curses.reset_prog_mode()
+    screen.invalidate()
+
+
+def handle_key(ch, screen, ui, collector, compact):
+    """One key press; returns False to quit."""
     global REFRESH
+    if ch in (ord("q"), ord("Q")):
+        return False
+    ui["last_key"] = chr(ch) if 32 <= ch < 127 else f"[{ch}]"
+
+    if ch == ord("2"):
+        # Mount/Unmount drive toggle (blocking; show that something is happening, stay in console)
+        ui["status"], ui["status_time"] = "Processing...", time.time()
+        snap = collector.latest()
+        if snap is not None:
+            (draw_compact if compact else draw_full)(screen, snap, ui, screen.stdscr.getmaxyx()[1])
+            screen.commit()
+        ui["status"], ui["status_time"] = act_toggle_mount(), time.time()
+        collector.kick()
+    elif compact:
+        pass  # compact mode only has [2] and [q]
+    elif ch == ord("1"):
+        act_stop()
+        collector.kick()
+    elif ch == ord("3"):
+        act_start()
+        collector.kick()
+    elif ch == ord("?"):
+        show_help(screen.stdscr)
+        screen.invalidate()
+    elif ch == ord("+"):
+        REFRESH = round(REFRESH + 0.5, 1)
+    elif ch == ord("-"):
+        REFRESH = round(max(0.5, REFRESH - 0.5), 1)
+        collector.kick()
+    elif ch in (ord("c"), ord("C")):
+        run_pager(screen, f"journalctl -u {shlex.quote(CAPTURE_SERVICE)} -n 400 --no-pager | less -SRX")
+    elif ch in (ord("m"), ord("M")):
+        run_pager(screen, f"journalctl -u {shlex.quote(MOVER_SERVICE)} -n 400 --no-pager | less -SRX")
+    elif ch in (ord("h"), ord("H")):
+        run_pager(screen, f"journalctl -u {shlex.quote(HOTSWAP_SERVICE)} -n 400 --no-pager | less -SRX")
+    elif ch in (ord("s"), ord("S")):
+        units = " ".join(
+            [shlex.quote(CAPTURE_SERVICE), shlex.quote(MOVER_SERVICE)]
+            + ([shlex.quote(MOVER_TIMER)] if MOVER_TIMER else [])
+        )
+        run_pager(screen, f"systemctl status {units} --no-pager -l | less -SRX")
+    elif ch in (ord("j"), ord("J")):
+        echo = f"ls -lt {shlex.quote(JSON_SPOOL)} | head -n 200"
+        run_pager(screen, echo + " | sed -n '1,200p' | less -SRX")
+    elif ch in (ord("p"), ord("P")):
+        run_pager(screen, f"systemctl status {shlex.quote(SHIPPER_SERVICE)} --no-pager -l | less -SRX")
+    elif ch in (ord("a"), ord("A")):
+        run_pager(screen, 'echo "Agent heuristics: (placeholder)\n- rule1: ...\n- rule2: ...\n" | less -SRX')
+    elif ch == ord("z"):
+        run_pager(screen, "sudo /usr/local/bin/seer-zeek.sh start; read -n 1 -s -r -p 'Press any key to continue.'")
+        collector.kick()
+    elif ch == ord("x"):
+        run_pager(screen, "sudo /usr/local/bin/seer-zeek.sh stop; read -n 1 -s -r -p 'Press any key to continue.'")
+        collector.kick()
+    # Removed verbose Zeek status viewer to keep UI minimal
+    return True
+
+
+def render(stdscr):
+    global COLORS
     curses.curs_set(0)
     stdscr.nodelay(True)
 
@@ -492,11 +1086,13 @@ def render(stdscr):
         stdscr.addstr(2, 0, "Minimum: 12x40")
         stdscr.addstr(3, 0, "Resize and restart")
         stdscr.refresh()
+        stdscr.nodelay(False)
         stdscr.getch()
         return
 
     if curses.has_colors() and not NO_COLORS:
         curses.start_color()
+        COLORS = True
         try:
             curses.use_default_colors()
         except Exception:
@@ -532,366 +1128,83 @@ def render(stdscr):
             except Exception:
                 pass
 
-    last_key = ""
-    status_message = ""  # For displaying action results
-    status_message_time = 0  # Timestamp when message was set
-    # rolling stats for JSON write rate estimation
-    last_json_bytes = None
-    last_json_ts = None
+    collector = Collector()
+    collector.start()
+    screen = Screen(stdscr)
+    ui = {
+        "host": os.uname().nodename,
+        "last_key": "",
+        "status": "",
+        "status_time": 0,
+        "trend_window": collector.trend_window,
+    }
+    resized = False
+    last_frame = 0.0
 
     def handle_winch(signum, frame):
-        curses.resizeterm(*stdscr.getmaxyx())
+        nonlocal resized
+        resized = True
+        collector.wake()
 
     signal.signal(signal.SIGWINCH, handle_winch)
-    while True:
-        h, w = stdscr.getmaxyx()
-        stdscr.erase()
-
-        host = os.uname().nodename
-        now = datetime.now()
-
-        # Gather data
-        cap_state = systemctl_is_active(CAPTURE_SERVICE)
-        mov_state = systemctl_is_active(MOVER_SERVICE)
-        tim_state = systemctl_is_active(MOVER_TIMER) if MOVER_TIMER else "n/a"
-        hot_state = systemctl_is_active(HOTSWAP_SERVICE)
-
-        # Prefer interface from YAML; fall back to env IFACE or enp2s0
-        zeek_unit = (
-            f"seer-zeek@{_IFACE_BOOT if '_IFACE_BOOT' in globals() else os.environ.get('IFACE', 'enp2s0')}.service"
-        )
-        zeek_state = systemctl_is_active(zeek_unit)
-
-        buff_count = count_pcaps(BUFF_DIR)
-
-        cfg = read_cfg()
-        backlog_dir = cfg.get("backlog_dir", "/opt/seer/var/backlog")
-        back_count = count_pcaps(backlog_dir)
-        j_count, j_bytes, j_last = json_stats(JSON_SPOOL)
-
-        # Read hotswap export state
-        hs_state = read_hotswap_state()
-        drive_present = hs_state.get("drive_present", False)
-
-        # Count actual files on drive if mounted
-        drive_pcap_count = 0
-        if drive_present:
-            mount_candidates = cfg.get("export", {}).get("mount_candidates", ["/mnt/seer_external"])
-            for candidate in mount_candidates:
-                if os.path.ismount(candidate):
-                    try:
-                        drive_pcap_count = sum(1 for _ in Path(candidate).rglob("*.pcap*"))
-                    except OSError:
-                        pass
-                    break
-
-        # Check if we should use compact mode (small screen)
-        if compact_mode or h < 20 or w < 60:
-            # COMPACT MODE - Show only PCAP info
-            hdr = f"SEER [{now.strftime('%H:%M:%S')}]"
-            draw_text(stdscr, 0, 0, w, hdr)
-            divider(stdscr, 1, w)
-
-            safe_addstr(stdscr, 2, 0, "PCAP:")
-            safe_addstr(stdscr, 3, 2, f"Ring    : {buff_count}")
-            safe_addstr(stdscr, 4, 2, f"Backlog : {back_count}")
-
-            # Drive status
-            if drive_present:
-                mount_candidates = cfg.get("export", {}).get("mount_candidates", ["/mnt/seer_external"])
-                active_mount = "drive"
-                for candidate in mount_candidates:
-                    if os.path.ismount(candidate):
-                        active_mount = candidate
-                        break
-                safe_addstr(stdscr, 5, 2, "Drive   : ", curses.color_pair(2) if curses.has_colors() else 0)
-                safe_addstr(stdscr, 5, 12, "CONNECTED")
-                safe_addstr(stdscr, 6, 2, f"Mount   : {active_mount[: w - 12]}")
-                safe_addstr(stdscr, 7, 2, f"On Drive: {drive_pcap_count} files")
-            else:
-                safe_addstr(stdscr, 5, 2, "Drive   : ", curses.color_pair(3) if curses.has_colors() else 0)
-                safe_addstr(stdscr, 5, 12, "not connected")
-
-            divider(stdscr, 8, w)
-            safe_addstr(stdscr, 9, 0, "[2] Mount/Unmount  [q] Quit")
-
-            # Show status message if recent (within 5 seconds)
-            if status_message and (time.time() - status_message_time < 5):
-                safe_addstr(stdscr, 10, 0, f"Status: {status_message[: w - 8]}")
-            else:
-                safe_addstr(stdscr, 10, 0, f"Input: {last_key}")
-
-            stdscr.refresh()
-
-            # Handle input (simplified for compact mode)
-            t_end = time.time() + REFRESH
-            while time.time() < t_end:
-                try:
-                    ch = stdscr.getch()
-                except curses.error:
-                    ch = -1
-                if ch == -1:
-                    time.sleep(0.02)
-                    continue
-                if ch in (ord("q"), ord("Q")):
-                    return
-                last_key = chr(ch) if 32 <= ch < 127 else f"[{ch}]"
-
-                if ch == ord("2"):
-                    # Mount/Unmount drive toggle - stay in console
-                    status_message = "Processing..."
-                    stdscr.refresh()
-                    msg = act_toggle_mount()
-                    status_message = msg
-                    status_message_time = time.time()
-                break
-            continue  # Skip full mode rendering
-
-        # FULL MODE - Show everything
-        hdr = f"SEER MONITOR  [REF: {REFRESH:.1f}s]  [HOST: {host}]  [TIME: {now.strftime('%H:%M:%S  %b %d %Y')}]"
-        # Header: bold + accent color (pair 4)
-        try:
-            safe_addstr(stdscr, 0, 0, hdr, curses.color_pair(4) | curses.A_BOLD)
-        except Exception:
-            draw_text(stdscr, 0, 0, w, hdr)
-        divider(stdscr, 1, w)
-        divider(stdscr, 1, w)
-
-        # compute a simple write rate (bytes/sec) over the last refresh
-        _rate_txt = "n/a"
-        now_ts = time.time()
-        if last_json_bytes is not None and last_json_ts is not None:
-            dt = max(0.001, now_ts - last_json_ts)
-            dbytes = max(0, j_bytes - last_json_bytes)
-            bps = dbytes / dt
-            # show per-minute if rate is low, else per-second
-            if bps < 1024:
-                _rate_txt = f"{human_bytes(bps * 60)}/min"
+    try:
+        while True:
+            if resized:
+                resized = False
+                size = os.get_terminal_size(sys.stdout.fileno())
+                curses.resizeterm(size.lines, size.columns)
+                screen.invalidate()
+
+            # Frame budget: at most one frame per MIN_FRAME_INTERVAL, however fast the data changes
+            snap = collector.latest()
+            since = time.monotonic() - last_frame
+            if snap is None or since < MIN_FRAME_INTERVAL:
+                timeout = None if snap is None else MIN_FRAME_INTERVAL - since
             else:
-                _rate_txt = f"{human_bytes(bps)}/s"
-        last_json_bytes = j_bytes
-        last_json_ts = now_ts
-
-        left_w = w // 2 - 1
-        right_w = w - left_w - 3
-        # Section titles: bold + header color
-        sec_left = f"+ SYSTEM {'-' * (max(0, left_w - 10))}"
-        sec_right = f"+ CONTROLS {'-' * (max(0, right_w - 12))}"
-        try:
-            safe_addstr(stdscr, 2, 0, sec_left, curses.color_pair(4) | curses.A_BOLD)
-            safe_addstr(stdscr, 2, left_w + 1, sec_right, curses.color_pair(4) | curses.A_BOLD)
-        except Exception:
-            draw_text(stdscr, 2, 0, left_w, sec_left)
-            draw_text(stdscr, 2, left_w + 1, right_w, sec_right)
-        for r in range(3, 12):
-            if left_w < w:
-                stdscr.addstr(r, left_w, "|")
-
-        s, c = badge_text(cap_state)
-        stdscr.addstr(3, 2, "  CAPTURE : ")
-        try:
-            attr = curses.color_pair(c) | (curses.A_BOLD if c == 2 else 0)
-        except Exception:
-            attr = curses.A_BOLD if c == 2 else 0
-        stdscr.addstr(3, 14, s, attr)
-        s, c = badge_text(mov_state)
-        stdscr.addstr(4, 2, "  MOVER   : ")
-        try:
-            attr = curses.color_pair(c) | (curses.A_BOLD if c == 2 else 0)
-        except Exception:
-            attr = curses.A_NORMAL
-        stdscr.addstr(4, 14, s, attr)
-        stdscr.addstr(5, 2, f"  TIMER   : {tim_state}")
-        stdscr.addstr(6, 2, f"  ZEEK    : {zeek_state}")
-        s, c = badge_text(hot_state)
-        stdscr.addstr(7, 2, "  HOTSWAP : ")
-        try:
-            attr = curses.color_pair(c) | (curses.A_BOLD if c == 2 else 0)
-        except Exception:
-            attr = curses.A_NORMAL
-        stdscr.addstr(7, 14, s, attr)
-
-        stdscr.addstr(8, 0, "PCAP:")
-        # PCAP counts: make numeric values use the active/accent color for visibility
-        try:
-            stdscr.addstr(9, 2, "  Ring        : ")
-            stdscr.addstr(9, 21, f"{buff_count:<5}", curses.color_pair(2) | curses.A_BOLD)
-            stdscr.addstr(10, 2, "  Backlog     : ")
-            stdscr.addstr(10, 21, f"{back_count:<5}", curses.color_pair(3) | curses.A_DIM)
-        except Exception:
-            stdscr.addstr(9, 2, f"  Ring        : {buff_count:<5}")
-            stdscr.addstr(10, 2, f"  Backlog     : {back_count:<5}")
-
-        # Show drive status and destination
-        if drive_present:
-            # Detect which mount is active
-            mount_candidates = cfg.get("export", {}).get("mount_candidates", ["/mnt/seer_external"])
-            active_mount = "drive"
-            for candidate in mount_candidates:
-                if os.path.ismount(candidate):
-                    active_mount = candidate
-                    break
-            try:
-                # Drive connected: label in accent, value bold
-                stdscr.addstr(11, 2, "  Drive       : ", curses.color_pair(5))
-                stdscr.addstr(11, 17, "CONNECTED", curses.color_pair(2) | curses.A_BOLD)
-                stdscr.addstr(12, 2, "  Mount       : ")
-                stdscr.addstr(12, 16, f"{active_mount}", curses.color_pair(5))
-                stdscr.addstr(13, 2, "  On Drive    : ")
-                stdscr.addstr(13, 16, f"{drive_pcap_count} files", curses.color_pair(2))
-            except Exception:
-                stdscr.addstr(11, 2, "  Drive       : CONNECTED")
-                stdscr.addstr(12, 2, f"  Mount       : {active_mount}")
-                stdscr.addstr(13, 2, f"  On Drive    : {drive_pcap_count} files")
-        else:
-            stdscr.addstr(11, 2, "  Drive       : ", curses.color_pair(3))
-            stdscr.addstr(11, 17, "not connected")
+                frame_t0 = time.perf_counter()
+                h, w = stdscr.getmaxyx()
+                compact = compact_mode or h < 20 or w < 60
+                collector.trend_width = max(8, w // 2 - 18)
+                (draw_compact if compact else draw_full)(screen, snap, ui, w)
+                if screen.commit():
+                    perf.observe("frame", time.perf_counter() - frame_t0)
+                last_frame = time.monotonic()
+                # Sleep until input, new data, the next clock second or the status message expiring
+                timeout = 1.0 - time.time() % 1.0
+                expires = ui["status_time"] + STATUS_SECONDS - time.time()
+                if ui["status"] and expires > 0:
+                    timeout = min(timeout, expires)
+
+            ready, _, _ = select.select([sys.stdin, collector.wake_fd], [], [], timeout)
+            if sys.stdin in ready:
+                while (ch := stdscr.getch()) != -1:
+                    if not handle_key(ch, screen, ui, collector, compact_mode or h < 20 or w < 60):
+                        return
+                last_frame = 0.0  # answer key presses without waiting out the frame budget
+
+    finally:
+        collector.save_history()
 
-        # JSON stats: size in accent color
-        try:
-            stdscr.addstr(14, 0, "JSON:")
-            stdscr.addstr(15, 2, "  Captured    : ")
-            stdscr.addstr(15, 18, f"{human_bytes(j_bytes):<12}", curses.color_pair(2) | curses.A_BOLD)
-        except Exception:
-            stdscr.addstr(14, 0, "JSON:")
-            stdscr.addstr(15, 2, f"  Captured    : {human_bytes(j_bytes):<12}")
-
-        # Controls: make keys accent colored for quick scanning
-        try:
-            stdscr.addstr(3, left_w + 2, "[1] ")
-            stdscr.addstr(3, left_w + 6, "Stop", curses.color_pair(1))
-            stdscr.addstr(3, left_w + 12, "   [3] ")
-            stdscr.addstr(3, left_w + 18, "Start", curses.color_pair(2) | curses.A_BOLD)
-
-            stdscr.addstr(4, left_w + 2, "[2] ")
-            stdscr.addstr(4, left_w + 6, "Mount/Unmount Drive", curses.color_pair(5))
-
-            stdscr.addstr(5, left_w + 2, "[z] ")
-            stdscr.addstr(5, left_w + 6, "Zeek Start", curses.color_pair(2))
-            stdscr.addstr(5, left_w + 20, "[x] ")
-            stdscr.addstr(5, left_w + 24, "Stop", curses.color_pair(1))
-
-            stdscr.addstr(7, left_w + 2, "[c] ")
-            stdscr.addstr(7, left_w + 6, "Cap", curses.color_pair(5))
-            stdscr.addstr(7, left_w + 12, "[m] ")
-            stdscr.addstr(7, left_w + 16, "Mov", curses.color_pair(5))
-            stdscr.addstr(7, left_w + 22, "[h] ")
-            stdscr.addstr(7, left_w + 26, "Hot", curses.color_pair(5))
-
-            stdscr.addstr(8, left_w + 2, "[s] ")
-            stdscr.addstr(8, left_w + 6, "Status", curses.color_pair(5))
-            stdscr.addstr(8, left_w + 16, "[+/-] ")
-            stdscr.addstr(8, left_w + 22, "Speed", curses.color_pair(5))
-
-            stdscr.addstr(10, left_w + 2, "[?] ")
-            stdscr.addstr(10, left_w + 6, "Help", curses.color_pair(4) | curses.A_BOLD)
-            stdscr.addstr(10, left_w + 16, "[q] ")
-            stdscr.addstr(10, left_w + 20, "Quit", curses.color_pair(5))
-        except Exception:
-            stdscr.addstr(3, left_w + 2, "[1] Stop   [3] Start")
-            stdscr.addstr(4, left_w + 2, "[2] Mount/Unmount Drive")
-            stdscr.addstr(5, left_w + 2, "[z] Zeek Start  [x] Stop")
-            stdscr.addstr(7, left_w + 2, "[c] Cap [m] Mov [h] Hot")
-            stdscr.addstr(8, left_w + 2, "[s] Status  [+/-] Speed")
-            stdscr.addstr(10, left_w + 2, "[?] Help    [q] Quit")
-
-        divider(stdscr, 19, w)
-        # Show status message if recent (within 5 seconds); otherwise show last input
-        if status_message and (time.time() - status_message_time < 5):
-            draw_text(stdscr, 20, 0, w, f"Status: {status_message}")
-        else:
-            draw_text(stdscr, 20, 0, w, f"Input: {last_key}")
-        stdscr.refresh()
 
-        t_end = time.time() + REFRESH
-        while time.time() < t_end:
-            try:
-                ch = stdscr.getch()
-            except curses.error:
-                ch = -1
-            if ch == -1:
-                time.sleep(0.02)
-                continue
-            if ch in (ord("q"), ord("Q")):
-                return
-            last_key = chr(ch) if 32 <= ch < 127 else f"[{ch}]"
-
-            if ch == ord("1"):
-                act_stop()
-            elif ch == ord("2"):
-                # Mount/Unmount drive toggle (non-blocking; stay in console)
-                status_message = "Processing..."
-                stdscr.refresh()
-                msg = act_toggle_mount()
-                status_message = msg
-                status_message_time = time.time()
-            elif ch == ord("3"):
-                act_start()
-            elif ch == ord("?"):
-                show_help(stdscr)
-            elif ch == ord("+"):
-                REFRESH = round(REFRESH + 0.5, 1)
-            elif ch == ord("-"):
-                REFRESH = round(max(0.5, REFRESH - 0.5), 1)
-            elif ch in (ord("c"), ord("C")):
-                curses.def_prog_mode()
-                curses.endwin()
-                os.system(f"journalctl -u {shlex.quote(CAPTURE_SERVICE)} -n 400 --no-pager | less -SRX")
-                curses.reset_prog_mode()
-            elif ch in (ord("m"), ord("M")):
-                curses.def_prog_mode()
-                curses.endwin()
-                os.system(f"journalctl -u {shlex.quote(MOVER_SERVICE)} -n 400 --no-pager | less -SRX")
-                curses.reset_prog_mode()
-            elif ch in (ord("h"), ord("H")):
-                curses.def_prog_mode()
-                curses.endwin()
-                os.system(f"journalctl -u {shlex.quote(HOTSWAP_SERVICE)} -n 400 --no-pager | less -SRX")
-                curses.reset_prog_mode()
-            elif ch in (ord("s"), ord("S")):
-                curses.def_prog_mode()
-                curses.endwin()
-                units = " ".join(
-                    [shlex.quote(CAPTURE_SERVICE), shlex.quote(MOVER_SERVICE)]
-                    + ([shlex.quote(MOVER_TIMER)] if MOVER_TIMER else [])
-                )
-                os.system(f"systemctl status {units} --no-pager -l | less -SRX")
-                curses.reset_prog_mode()
-            elif ch in (ord("j"), ord("J")):
-                curses.def_prog_mode()
-                curses.endwin()
-                echo = f"ls -lt {shlex.quote(JSON_SPOOL)} | head -n 200"
-                os.system(echo + " | sed -n '1,200p' | less -SRX")
-                curses.reset_prog_mode()
-            elif ch in (ord("p"), ord("P")):
-                curses.def_prog_mode()
-                curses.endwin()
-                os.system(f"systemctl status {shlex.quote(SHIPPER_SERVICE)} --no-pager -l | less -SRX")
-                curses.reset_prog_mode()
-            elif ch in (ord("a"), ord("A")):
-                curses.def_prog_mode()
-                curses.endwin()
-                cat = 'echo "Agent heuristics: (placeholder)\n- rule1: ...\n- rule2: ...\n" | less -SRX'
-                os.system(cat)
-                curses.reset_prog_mode()
-            elif ch == ord("z"):
-                curses.def_prog_mode()
-                curses.endwin()
-                os.system("sudo /usr/local/bin/seer-zeek.sh start; read -n 1 -s -r -p 'Press any key to continue.'")
-                curses.reset_prog_mode()
-            elif ch == ord("x"):
-                curses.def_prog_mode()
-                curses.endwin()
-                os.system("sudo /usr/local/bin/seer-zeek.sh stop; read -n 1 -s -r -p 'Press any key to continue.'")
-                curses.reset_prog_mode()
-            # Removed verbose Zeek status viewer to keep UI minimal
-            break
+def main():
+    global _args, NO_COLORS
+    _args = parse_args()
+    NO_COLORS = NO_COLORS or bool(_args.no_colors)
+    load_boot_config()
+    perf.install("console")
+    if _args.profile:
+        perf.start_profile("console")
+    try:
+        run_console()
+    finally:
+        perf.dump_profile()
 
 
-def main():
+def run_console():
     # One-shot textual status mode
     if getattr(_args, "once", False):
-        s = collect_status()
+        with perf.span("collect"):
+            s = collect_status()
         host = os.uname().nodename
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"SEER STATUS  host={host}  time={now}")
@@ -906,31 +1219,46 @@ def main():
         # Show drive status
         exp = s["export"]
         if exp["drive_present"]:
-            cfg = read_cfg()
-            mount_candidates = cfg.get("export", {}).get("mount_candidates", ["/mnt/seer_external"])
-            active_mount = "drive"
-            for candidate in mount_candidates:
-                if os.path.ismount(candidate):
-                    active_mount = candidate
-                    break
-            print(f"  DRIVE   : CONNECTED at {active_mount}")
-            # Count files on drive
-            try:
-                drive_count = sum(1 for _ in Path(active_mount).rglob("*.pcap*"))
-                print(f"  ON DRIVE: {drive_count} files")
-            except OSError:
-                print("  ON DRIVE: (unable to count)")
+            mounts = export_mounts(read_hotswap_state(), read_cfg())
+            print(f"  DRIVE   : CONNECTED at {', '.join(mounts) or 'drive'}")
+            if exp["progress"]:
+                print(f"  EXPORT  : {exp['progress']}")
+            # Count files on drive(s)
+            print(f"  ON DRIVE: {sum(count_tree_pcaps(mount) for mount in mounts)} files")
         else:
             print("  DRIVE   : not connected")
 
         j = s["json"]
         print(f"  JSON captured: {human_bytes(j['bytes'])}")
+
+        t = s["traffic"]
+        if t["lines"]:
+            print(f"  TRAFFIC ({t['window']}, updated {human_ago(t['updated'])} ago):")
+            for label, text in t["lines"]:
+                print(f"    {label:<6}: {text}")
+        else:
+            print("  TRAFFIC : no summary available")
+
+        # Trends from the history the interactive console keeps (none until it has run)
+        cfg = read_cfg()
+        window = history_settings(cfg)[2]
+        lines = trend_lines(open_history(cfg), window, time.time(), 48, trend_ticks())
+        print(f"  TRENDS ({window_text(window)}):" + ("" if lines else " no history yet"))
+        for label, spark, text in lines:
+            print(f"    {label:<8}{spark}  {text}")
+
+        if _args.perf:
+            lines = perf_lines(read_hotswap_state())
+            print("  TIMINGS :" + ("" if lines else " none recorded yet"))
+            for line in lines:
+                print(f"    {line}")
         return
 
     # Interactive TUI requires a TTY.
     if not (sys.stdin.isatty() and sys.stdout.isatty()):
         print("seer-console: not running in a TTY; interactive console requires a terminal.")
         return
+    locale.setlocale(locale.LC_ALL, "")  # so curses can draw the trend sparklines' block characters
     try:
         curses.wrapper(render)
     except curses.error as e:
@@ -9,10 +9,11 @@
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-CONSOLE_PY="$SCRIPT_DIR/seer_console.py"
+# Launch through the small seer-console stub so seer_console.py is imported from cached bytecode
+CONSOLE="$SCRIPT_DIR/seer-console"
 
-if [ ! -f "$CONSOLE_PY" ]; then
-  echo "ERROR: cannot find $CONSOLE_PY" >&2
+if [ ! -f "$SCRIPT_DIR/seer_console.py" ]; then
+  echo "ERROR: cannot find $SCRIPT_DIR/seer_console.py" >&2
   exit 2
 fi
 
@@ -54,4 +55,4 @@ if [ "${NO_COLORS:-}" = "1" ] || [ "${NO_COLORS:-}" = "true" ]; then
   export NO_COLORS=1
 fi
 
-exec python3 "$CONSOLE_PY" "${REST_ARGS[@]:-}"
+exec python3 "$CONSOLE" "${REST_ARGS[@]:-}"
@@ -68,9 +68,9 @@ confirm() {
 
 # What we'll do
 say "SEER uninstall plan:"
-echo "  - Stop & disable: seer-capture@*.service, seer-move-oldest.service, seer-move-oldest.timer, seer-zeek@*.service, seer-hotswap.service"
-echo "  - Remove units   : /etc/systemd/system/seer-capture@.service, seer-move-oldest.{service,timer}, seer-zeek@.service, seer-hotswap.service"
-echo "  - Remove binaries: /usr/local/bin/seer-capture.sh, /usr/local/bin/seer_console.py, /usr/local/bin/seer-console, /usr/local/bin/seer-zeek.sh, /usr/local/bin/seer_hotswap.py"
+echo "  - Stop & disable: seer-capture@*.service, seer-move-oldest.service, seer-move-oldest.timer, seer-zeek@*.service, seer-hotswap.service, seer-rollup.{service,timer}, seer-summary.service, seer-metrics.service"
+echo "  - Remove units   : /etc/systemd/system/seer-capture@.service, seer-move-oldest.{service,timer}, seer-zeek@.service, seer-hotswap.service, seer-rollup.{service,timer}, seer-summary.service, seer-metrics.service"
+echo "  - Remove binaries: /usr/local/bin/seer-capture.sh, /usr/local/bin/seer_console.py, /usr/local/bin/seer-console, /usr/local/bin/seer-zeek.sh, /usr/local/bin/seer_hotswap.py, /usr/local/bin/seer_rollup.py, /usr/local/bin/seer_summary.py, /usr/local/bin/seer_metrics.py, /usr/local/bin/seer_zeeklog.py, /usr/local/bin/seer_drives.py, /usr/local/bin/seer_perf.py, /usr/local/bin/seer_backlog.py, /usr/local/bin/seer_hash.py, /usr/local/bin/seer_systemd.py, /usr/local/bin/seer_series.py, /usr/local/bin/seer_config.py, /usr/local/bin/seer_copy.py, /usr/local/bin/seer_io.py, /usr/local/bin/seer_manifest.py, /usr/local/bin/seer-verify-drive"
 if [[ $PURGE -eq 1 ]]; then
   echo "  - PURGE config   : /opt/seer (incl. /opt/seer/etc/seer.yml backups)"
   echo "  - PURGE data     : /var/seer and /var/lib/tcpdump/pcap_ring (PCAPs WILL BE DELETED)"
@@ -92,10 +92,10 @@ stop_units "${CAPTURE_UNITS[@]:-}"
 stop_units "${ZEEK_UNITS[@]:-}"
 
 # Stop and disable mover units (timer then service)
-stop_units seer-move-oldest.timer seer-move-oldest.service seer-hotswap.service
+stop_units seer-move-oldest.timer seer-move-oldest.service seer-hotswap.service seer-rollup.timer seer-rollup.service seer-summary.service seer-metrics.service
 disable_units "${CAPTURE_UNITS[@]:-}"
 disable_units "${ZEEK_UNITS[@]:-}"
-disable_units seer-move-oldest.timer seer-move-oldest.service seer-hotswap.service
+disable_units seer-move-oldest.timer seer-move-oldest.service seer-hotswap.service seer-rollup.timer seer-rollup.service seer-summary.service seer-metrics.service
 ok "services/timer stopped & disabled (where present)"
 
 # Belt-and-suspenders: ensure no lingering processes remain before removing units
@@ -107,6 +107,8 @@ stop_units "${CAPTURE_UNITS[@]:-}" "${ZEEK_UNITS[@]:-}" seer-hotswap.service
 pkill -x tcpdump 2>/dev/null || true
 pkill -x zeek 2>/dev/null || true
 pkill -f seer_hotswap.py 2>/dev/null || true
+pkill -f seer_summary.py 2>/dev/null || true
+pkill -f seer_metrics.py 2>/dev/null || true
 
 # Wait briefly for termination
 for _ in 1 2 3 4 5; do
@@ -129,7 +131,11 @@ rm -f /etc/systemd/system/seer-capture@.service \
       /etc/systemd/system/seer-move-oldest.timer \
       /etc/systemd/system/seer-move-oldest.path \
       /etc/systemd/system/seer-zeek@.service \
-      /etc/systemd/system/seer-hotswap.service
+      /etc/systemd/system/seer-hotswap.service \
+      /etc/systemd/system/seer-rollup.service \
+      /etc/systemd/system/seer-rollup.timer \
+      /etc/systemd/system/seer-summary.service \
+      /etc/systemd/system/seer-metrics.service
 sc daemon-reload
 ok "systemd units removed and daemon reloaded"
 
@@ -140,12 +146,30 @@ rm -f /usr/local/bin/seer-capture.sh \
   /usr/local/bin/seer-zeek.sh \
   /usr/local/bin/seer-move-oldest.py \
   /usr/local/bin/seer_hotswap.py \
+  /usr/local/bin/seer_rollup.py \
+  /usr/local/bin/seer_summary.py \
+  /usr/local/bin/seer_metrics.py \
+  /usr/local/bin/seer_zeeklog.py \
+  /usr/local/bin/seer_drives.py \
+  /usr/local/bin/seer_perf.py \
+  /usr/local/bin/seer_backlog.py \
+  /usr/local/bin/seer_hash.py \
+  /usr/local/bin/seer_systemd.py \
+  /usr/local/bin/seer_series.py \
+  /usr/local/bin/seer_config.py \
+  /usr/local/bin/seer_copy.py \
+  /usr/local/bin/seer_io.py \
+  /usr/local/bin/seer_manifest.py \
+  /usr/local/bin/seer-verify-drive \
   /usr/local/bin/seer \
   /usr/local/bin/seer-toggle-drive \
   /usr/local/bin/seer-verify-install.sh
 # Remove legacy stray copy if it exists (some systems may have installed to /usr/bin)
 [[ -f /usr/bin/seer-capture.sh ]] && rm -f /usr/bin/seer-capture.sh || true
 [[ -f /usr/bin/seer-console ]] && rm -f /usr/bin/seer-console || true
+# Bytecode precompiled by the installer, and the parsed seer.yml cache
+rm -f /usr/local/bin/__pycache__/seer_*.pyc || true
+[[ -d /var/cache/seer ]] && rm -rf /var/cache/seer || true
 ok "binaries removed"
 
 if [[ $PURGE -eq 1 ]]; then
@@ -58,8 +58,10 @@ fi
 
 # Install console (TUI) to /usr/local/bin
 if [[ -f "$REPO_ROOT/Automation/bin/seer_console.py" ]]; then
+  # seer-console is a stub that imports seer_console.py, so the console starts from cached bytecode
   echo "Installing seer-console to /usr/local/bin/seer-console"
-  sudo install -m 0755 "$REPO_ROOT/Automation/bin/seer_console.py" /usr/local/bin/seer-console
+  sudo install -m 0644 "$REPO_ROOT/Automation/bin/seer_console.py" /usr/local/bin/seer_console.py
+  sudo install -m 0755 "$REPO_ROOT/Automation/bin/seer-console" /usr/local/bin/seer-console
   # Provide a simple wrapper so typing 'seer' launches the console
   echo "Installing wrapper /usr/local/bin/seer"
   sudo tee /usr/local/bin/seer >/dev/null <<'EOS'
@@ -92,9 +94,60 @@ if [[ -f "$REPO_ROOT/Automation/systemd/seer-hotswap.service" ]]; then
   sudo install -m 0644 "$REPO_ROOT/Automation/systemd/seer-hotswap.service" /etc/systemd/system/seer-hotswap.service
 fi
 
+# Install shared SEER Python modules next to the scripts that import them
+for mod in seer_zeeklog.py seer_drives.py seer_perf.py seer_backlog.py seer_hash.py seer_systemd.py seer_series.py seer_config.py seer_copy.py seer_io.py seer_manifest.py; do
+  if [[ -f "$REPO_ROOT/Automation/SEER/$mod" ]]; then
+    echo "Installing shared module $mod to /usr/local/bin/$mod"
+    sudo install -m 0644 "$REPO_ROOT/Automation/SEER/$mod" "/usr/local/bin/$mod"
+  fi
+done
+# Precompile them (and the console module): the seer user and operators can't write __pycache__ there
+sudo python3 -m compileall -q /usr/local/bin/seer_*.py || true
+
+# Install Zeek rollup (JSON -> columnar compaction) script and units
+if [[ -f "$REPO_ROOT/Automation/SEER/seer_rollup.py" ]]; then
+  echo "Installing seer_rollup.py to /usr/local/bin/seer_rollup.py"
+  sudo install -m 0755 "$REPO_ROOT/Automation/SEER/seer_rollup.py" /usr/local/bin/seer_rollup.py
+fi
+for unit in seer-rollup.service seer-rollup.timer; do
+  if [[ -f "$REPO_ROOT/Automation/systemd/$unit" ]]; then
+    echo "Installing $unit"
+    sudo install -m 0644 "$REPO_ROOT/Automation/systemd/$unit" "/etc/systemd/system/$unit"
+  fi
+done
+
+# Install traffic summary service (top talkers/protocols for the console)
+if [[ -f "$REPO_ROOT/Automation/SEER/seer_summary.py" ]]; then
+  echo "Installing seer_summary.py to /usr/local/bin/seer_summary.py"
+  sudo install -m 0755 "$REPO_ROOT/Automation/SEER/seer_summary.py" /usr/local/bin/seer_summary.py
+fi
+if [[ -f "$REPO_ROOT/Automation/systemd/seer-summary.service" ]]; then
+  echo "Installing seer-summary.service"
+  sudo install -m 0644 "$REPO_ROOT/Automation/systemd/seer-summary.service" /etc/systemd/system/seer-summary.service
+fi
+
+# Install metrics exporter (OpenMetrics endpoint for a local scrape agent)
+if [[ -f "$REPO_ROOT/Automation/SEER/seer_metrics.py" ]]; then
+  echo "Installing seer_metrics.py to /usr/local/bin/seer_metrics.py"
+  sudo install -m 0755 "$REPO_ROOT/Automation/SEER/seer_metrics.py" /usr/local/bin/seer_metrics.py
+fi
+if [[ -f "$REPO_ROOT/Automation/systemd/seer-metrics.service" ]]; then
+  echo "Installing seer-metrics.service"
+  sudo install -m 0644 "$REPO_ROOT/Automation/systemd/seer-metrics.service" /etc/systemd/system/seer-metrics.service
+fi
+
+# Install export drive verifier (for whoever receives a drive; also runnable on the sensor)
+if [[ -f "$REPO_ROOT/Automation/SEER/seer_verify_drive.py" ]]; then
+  echo "Installing seer_verify_drive.py to /usr/local/bin/seer-verify-drive"
+  sudo install -m 0755 "$REPO_ROOT/Automation/SEER/seer_verify_drive.py" /usr/local/bin/seer-verify-drive
+fi
+
 # Ensure log/state directory exists with correct ownership
 sudo mkdir -p /var/log/seer
 sudo chown seer:seer /var/log/seer || true
+# Parsed seer.yml cache (seer_config.py), shared by the console, mover and daemons
+sudo mkdir -p /var/cache/seer
+sudo chown seer:seer /var/cache/seer || true
 
 if [[ -f "$REPO_ROOT/Automation/systemd/seer-move-oldest.service" ]]; then
   echo "Installing seer-move-oldest.service"
@@ -215,6 +268,21 @@ if systemctl list-unit-files | grep -q seer-move-oldest.timer; then
   sudo systemctl enable --now seer-move-oldest.timer || true
 fi
 
+if [[ -f /etc/systemd/system/seer-rollup.timer ]]; then
+  echo "Enabling and starting seer-rollup.timer"
+  sudo systemctl enable --now seer-rollup.timer || true
+fi
+
+if [[ -f /etc/systemd/system/seer-summary.service ]]; then
+  echo "Enabling and starting seer-summary.service"
+  sudo systemctl enable --now seer-summary.service || true
+fi
+
+if [[ -f /etc/systemd/system/seer-metrics.service ]]; then
+  echo "Enabling and starting seer-metrics.service"
+  sudo systemctl enable --now seer-metrics.service || true
+fi
+
 # Enable and start hotswap unconditionally if the unit was installed
 if [[ -f /etc/systemd/system/seer-hotswap.service ]]; then
   echo "Enabling and starting seer-hotswap.service"
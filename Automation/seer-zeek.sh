@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 # seer-zeek.sh — start/stop/status/restart helper for Zeek with JSON logs
-# Expected env (overridable): IFACE, LOG_DIR, LOG_FLAT, SYSTEMD, PIDFILE, LOCKFILE
+# Expected env (overridable): IFACE, LOG_DIR, LOG_FLAT, SYSTEMD, PIDFILE, LOCKFILE, ZEEK_ROTATE_INTERVAL, SEER_CONFIG
 # Systemd usage: the service sets SYSTEMD=1 to run in foreground with exec
 
 set -euo pipefail
@@ -14,6 +14,9 @@ LOG_DIR="${LOG_DIR:-/var/log/zeek}"
 PIDFILE="${PIDFILE:-/run/zeek.pid}"
 LOCKFILE="${LOCKFILE:-/run/zeek-start.lock}"
 SYSTEMD="${SYSTEMD:-0}"
+# Seconds between log rotations (conn.log -> conn.<ts>.log); 0 disables. Rotated files feed seer_rollup.py
+ROTATE_INTERVAL="${ZEEK_ROTATE_INTERVAL:-0}"
+export SEER_CONFIG="${SEER_CONFIG:-/opt/seer/etc/seer.yml}"
 
 "${LOG_FLAT:-}" >/dev/null 2>&1 || true # silence shellcheck for unbound in debug
 
@@ -21,6 +24,7 @@ SYSTEMD="${SYSTEMD:-0}"
 ZEEKSCRIPTS=(
   base/protocols/conn/main.zeek
   base/protocols/dns/main.zeek
+  policy/misc/stats.zeek  # stats.log: packets processed/dropped (seer_metrics.py)
 )
 
 # ---- UTILS ----
@@ -86,9 +90,9 @@ start_zeek_live() {
   ZE_WORKERS="${ZEEK_WORKERS:-}"
   if [ -z "$ZE_WORKERS" ]; then
   ZE_WORKERS=$(python3 - <<'PY'
-import yaml
+import os, yaml
 try:
-    cfg=yaml.safe_load(open('/opt/seer/etc/seer.yml')) or {}
+    cfg=yaml.safe_load(open(os.environ['SEER_CONFIG'])) or {}
     print(int(cfg.get('zeek_workers',2)))
 except Exception:
     print(2)
@@ -96,9 +100,9 @@ PY
 )
   fi
   FANOUT_ID=$(python3 - <<'PY'
-import yaml
+import os, yaml
 try:
-    cfg=yaml.safe_load(open('/opt/seer/etc/seer.yml')) or {}
+    cfg=yaml.safe_load(open(os.environ['SEER_CONFIG'])) or {}
     print(int(cfg.get('fanout_id',42)))
 except Exception:
     print(42)
@@ -112,6 +116,9 @@ PY
 
   # Build AF_PACKET redefs
   AF_REDEFS="redef AF_Packet::fanout_id=${FANOUT_ID}; redef AF_Packet::interfaces += { [\$name=\"${IFACE}\", \$threads=${ZE_WORKERS}] };"
+  if [ "${ROTATE_INTERVAL}" -gt 0 ] 2>/dev/null; then
+    AF_REDEFS="${AF_REDEFS} redef Log::default_rotation_interval=${ROTATE_INTERVAL}secs;"
+  fi
 
   IFACE_MODE="${ZEEK_IFACE_MODE:-af_packet}"
   if [ "$IFACE_MODE" = "pcap" ]; then
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: seer-console cold start (`--once`, as login shells and status scripts run it)
+- Runs the launcher (default: the repo's Automation/bin/seer-console; pass --console
+  /usr/local/bin/seer-console on a sensor) --runs times after --warmup runs, which fill __pycache__
+  and the seer.yml cache (seer_config.py) as the first login after an install would
+- Reports wall ms (min/median/p90/max), the same for seer_console.py run directly as a script
+  (compiled from source every time), and the slowest imports from one `python3 -X importtime` run
+- Exits 1 when the launcher's median exceeds --budget-ms: the default budget is for the J4125
+  reference box with the system bus up (without it each unit state costs a systemctl fork)
+- PYTHONDONTWRITEBYTECODE is dropped from the children's environment so warm-up can cache bytecode
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(REPO / "Automation" / "SEER"))
+
+import seer_systemd  # noqa: E402
+
+BUDGET_MS = 200.0
+
+
+def child_env():
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def time_runs(cmd, runs, env):
+    """Wall ms of each run of cmd (stdout discarded); raises if one fails."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=env)
+        times.append((time.perf_counter() - t0) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(cmd)} failed (exit {proc.returncode}): {proc.stderr.strip()[-500:]}")
+    return times
+
+
+def summarize(times):
+    ordered = sorted(times)
+    return {
+        "runs": len(times),
+        "min_ms": round(ordered[0], 1),
+        "median_ms": round(statistics.median(ordered), 1),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+def slowest_imports(cmd, env, n):
+    """[(module, cumulative ms)] from one run under -X importtime: top-level imports and their direct imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *cmd[1:]],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    top = []
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S.*)$", line)
+        if m and len(m.group(2)) <= 2:
+            top.append((m.group(3), round(int(m.group(1)) / 1000, 2)))
+    return sorted(top, key=lambda kv: kv[1], reverse=True)[:n]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--console", default=str(REPO / "Automation" / "bin" / "seer-console"), help="Launcher to time")
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--warmup", type=int, default=2)
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="Fail if the median --once exceeds this")
+    ap.add_argument("--top", type=int, default=10, help="How many imports to list")
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+
+    env = child_env()
+    launcher = [sys.executable, args.console, "--once"]
+    script = [sys.executable, str(Path(args.console).resolve().parent / "seer_console.py"), "--once"]
+
+    first = time_runs(launcher, max(1, args.warmup), env)[0]
+    results = {
+        "bench": "console_startup",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "console": args.console,
+        "system_bus": os.path.exists(seer_systemd.system_bus_path()),
+        "first_run_ms": round(first, 1),
+        "launcher": summarize(time_runs(launcher, args.runs, env)),
+        "script": summarize(time_runs(script, args.runs, env)),
+        "slowest_imports_ms": slowest_imports(launcher, env, args.top),
+        "budget_ms": args.budget_ms,
+    }
+    results["within_budget"] = results["launcher"]["median_ms"] <= args.budget_ms
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    if not results["within_budget"]:
+        print(
+            f"seer-console --once median {results['launcher']['median_ms']} ms exceeds the {args.budget_ms} ms budget",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
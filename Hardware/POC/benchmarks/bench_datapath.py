@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mover/exporter data path (move_oldest.py, seer_hotswap.py)
+- Generates a synthetic PCAP ring (--files x --file-mb at --rate-mbps) with pcap_synth.py
+- Export target is a separate filesystem, so the cross-device copy path is what gets measured:
+  a loop-mounted ext4 image or tmpfs (root), /dev/shm otherwise, or --drive-path for a real drive
+- Each phase runs in a child process (os.wait4 rusage), so CPU seconds and peak RSS are per phase:
+    hash      compute_sha256 over the ring (MB/s)
+    evict     move_oldest.main() per file, ring -> backlog and ring -> drive (latency ms)
+    export    hotswap backlog drain to the drive (MB/s)
+    replug    same backlog again onto the same drive: resume/skip cost (seconds)
+- Prints/writes machine-readable JSON; run the same command on each hardware candidate
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SEER_DIR = Path(__file__).resolve().parents[3] / "Automation" / "SEER"
+sys.path.insert(0, str(SEER_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pcap_synth  # noqa: E402
+import yaml  # noqa: E402
+
+PHASES = ("hash", "evict_backlog", "evict_drive", "export", "replug")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith(("model name", "Model")):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def peak_rss_kb():
+    """This process's VmHWM. Unlike ru_maxrss it resets at exec, so it excludes the forking parent."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def write_config(work, ring, backlog, candidates):
+    """seer.yml for the mover child (SEER_CONFIG); label discovery off so host drives aren't touched."""
+    cfg = {
+        "ring_dir": str(ring),
+        "backlog_dir": str(backlog),
+        "buffer_threshold": 1,
+        "mover_log": str(work / "mover.log"),
+        "export": {"mount_candidates": candidates, "min_free_pct": 0, "discover_roots": []},
+    }
+    path = work / "seer.yml"
+    path.write_text(yaml.safe_dump(cfg))
+    return path
+
+
+# -------- Phases (run in child processes) --------
+
+
+def phase_hash(work, drive):
+    import seer_hotswap
+
+    files = sorted((work / "template").glob("*.pcap"))
+    t0 = time.perf_counter()
+    for f in files:
+        seer_hotswap.compute_sha256(str(f))
+    return {"bytes": sum(f.stat().st_size for f in files), "seconds": time.perf_counter() - t0}
+
+
+def phase_evict(work, drive):
+    # CFG is read at import, so SEER_CONFIG must point at the phase config first
+    import move_oldest
+    import seer_drives
+
+    seer_drives.DRIVE_STATS = str(work / "drives.state")
+    latencies = []
+    moved = 0
+    t0 = time.perf_counter()
+    while any(move_oldest.RING.glob("*.pcap")):
+        t = time.perf_counter()
+        move_oldest.main(batch=False)  # one file per call: per-file eviction latency
+        latencies.append((time.perf_counter() - t) * 1000)
+        moved += 1
+    dest = drive if move_oldest.MOUNT_CANDIDATES else move_oldest.BACKLOG
+    size = sum(p.stat().st_size for p in Path(dest).rglob("*.pcap"))
+    return {"bytes": size, "seconds": time.perf_counter() - t0, "files": moved, "latencies_ms": latencies}
+
+
+def phase_export(work, drive):
+    import logging
+
+    import seer_backlog
+    import seer_drives
+    import seer_hotswap
+
+    logging.getLogger("seer-hotswap").setLevel(logging.WARNING)
+    stats = str(work / "drives.state")
+    targets = seer_drives.list_export_targets([drive], 0)
+    if not targets:
+        # Plain directory on another filesystem (--drive shm): not a mountpoint, describe it directly
+        st = os.statvfs(drive)
+        free, total = st.f_bavail * st.f_frsize, st.f_blocks * st.f_frsize
+        targets = [{"mount": drive, "free": free, "total": total, "st_dev": os.stat(drive).st_dev}]
+    selector = seer_drives.DriveSelector(targets, 0, stats_path=stats)
+    indexes = {drive: seer_hotswap.DriveIndex(drive)}
+    backlog = seer_backlog.DirIndex(work / "backlog")
+    backlog.rescan()
+    jobs = {"PCAP": seer_hotswap.backlog_jobs(backlog, 0)}
+    size = sum(os.path.getsize(src) for src, _ in jobs["PCAP"])
+    t0 = time.perf_counter()
+    counts, _ = seer_hotswap.export_batch(jobs, selector, indexes)
+    dt = time.perf_counter() - t0
+    return {"bytes": size, "seconds": dt, "files": len(jobs["PCAP"]), "exported": counts.get("PCAP", (0, 0))[0]}
+
+
+PHASE_FUNCS = {
+    "hash": phase_hash,
+    "evict_backlog": phase_evict,
+    "evict_drive": phase_evict,
+    "export": phase_export,
+    "replug": phase_export,
+}
+
+
+# -------- Parent: setup, child runs, report --------
+
+
+@contextmanager
+def drive_target(kind, work, size_mb, path=None):
+    """Yield (mountpoint, kind) for the export target; unmounts on exit."""
+    if kind == "auto":
+        if os.geteuid() == 0 and shutil.which("mkfs.ext4"):
+            kind = "loop"
+        elif os.geteuid() == 0:
+            kind = "tmpfs"
+        else:
+            kind = "shm"
+
+    if kind == "path":
+        yield path, kind
+        return
+    if kind == "shm":
+        d = Path(tempfile.mkdtemp(prefix="seer-bench-drive-", dir="/dev/shm"))
+        try:
+            yield str(d), kind
+        finally:
+            shutil.rmtree(d, ignore_errors=True)
+        return
+
+    mnt = work / "drive"
+    mnt.mkdir()
+    if kind == "tmpfs":
+        subprocess.run(["mount", "-t", "tmpfs", "-o", f"size={size_mb}m", "seer-bench", str(mnt)], check=True)
+    else:
+        img = work / "drive.img"
+        with open(img, "wb") as f:
+            f.truncate(size_mb * 1024 * 1024)
+        subprocess.run(["mkfs.ext4", "-q", "-F", "-L", "SEER_BENCH", str(img)], check=True)
+        subprocess.run(["mount", "-o", "loop", str(img), str(mnt)], check=True)
+    try:
+        yield str(mnt), kind
+    finally:
+        subprocess.run(["umount", str(mnt)], check=False)
+
+
+def reset_dir(path, template=None):
+    shutil.rmtree(path, ignore_errors=True)
+    if template:
+        shutil.copytree(template, path)  # copy2 keeps the back-dated mtimes
+    else:
+        Path(path).mkdir(parents=True)
+
+
+def clear_drive(drive):
+    for p in Path(drive).iterdir():
+        if p.name != "lost+found":
+            shutil.rmtree(p) if p.is_dir() else p.unlink()
+
+
+def drop_caches():
+    subprocess.run(["sync"], check=False)
+    try:
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def run_phase(phase, work, drive, env):
+    """Run one phase in a child; return its result plus CPU seconds and peak RSS from wait4."""
+    cmd = [sys.executable, __file__, "--phase", phase, "--workdir", str(work), "--drive-path", drive]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, env=env)
+    out = proc.stdout.read()
+    _, status, ru = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"phase {phase} failed (exit {proc.returncode})")
+
+    res = json.loads(out.decode().strip().splitlines()[-1])
+    cpu = ru.ru_utime + ru.ru_stime
+    r = {"phase": phase, "seconds": round(res["seconds"], 3)}
+    if res.get("bytes") and res["seconds"] and phase != "replug":
+        r["mb_per_sec"] = round(res["bytes"] / res["seconds"] / 1e6, 1)
+    for k in ("files", "exported"):
+        if k in res:
+            r[k] = res[k]
+    if res.get("latencies_ms"):
+        lat = res["latencies_ms"]
+        r["latency_ms"] = {
+            "p50": round(percentile(lat, 50), 2),
+            "p95": round(percentile(lat, 95), 2),
+            "max": round(max(lat), 2),
+        }
+    r["cpu_seconds"] = round(cpu, 3)
+    r["cpu_pct"] = round(cpu / wall * 100, 1) if wall else None
+    r["peak_rss_kb"] = res.get("peak_rss_kb") or ru.ru_maxrss
+    return r
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=20, help="Ring files (default 20)")
+    ap.add_argument("--file-mb", type=int, default=64, help="Size of each ring file in MB (default 64)")
+    ap.add_argument("--rate-mbps", type=float, default=100, help="Simulated capture rate (default 100)")
+    ap.add_argument("--snaplen", type=int, default=128)
+    ap.add_argument("--drive", default="auto", choices=["auto", "loop", "tmpfs", "shm", "path"])
+    ap.add_argument("--drive-path", help="Export target for --drive path (e.g. a mounted USB drive)")
+    ap.add_argument("--workdir-root", default="/var/tmp", help="Where the ring lives (use the ring's disk)")
+    ap.add_argument("--phases", nargs="+", default=list(PHASES), choices=PHASES)
+    ap.add_argument("--cold", action="store_true", help="Drop page cache before each phase (root)")
+    ap.add_argument("--out", help="Write JSON results to this file")
+    ap.add_argument("--phase", help=argparse.SUPPRESS)
+    ap.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.phase:
+        res = PHASE_FUNCS[args.phase](Path(args.workdir), args.drive_path)
+        res["peak_rss_kb"] = peak_rss_kb()
+        print(json.dumps(res))
+        return
+    if args.drive == "path" and not args.drive_path:
+        ap.error("--drive path needs --drive-path")
+
+    file_size = args.file_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory(prefix="seer-bench-datapath-", dir=args.workdir_root) as tmp:
+        work = Path(tmp)
+        ring_info = pcap_synth.write_ring(work / "template", args.files, file_size, args.rate_mbps, args.snaplen)
+        ring_bytes = ring_info["bytes"]
+        drive_mb = int(ring_bytes * 1.5 / 1024**2) + 64
+
+        with drive_target(args.drive, work, drive_mb, args.drive_path) as (drive, drive_kind):
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SEER_DIR), os.environ.get("PYTHONPATH", "")]))
+            runs = []
+            for phase in args.phases:
+                if phase == "evict_drive" and drive_kind == "shm":
+                    # The mover only exports to mountpoints; a /dev/shm directory isn't one
+                    runs.append({"phase": phase, "skipped": "needs --drive loop|tmpfs|path"})
+                    continue
+                cold = drop_caches() if args.cold else False
+                if phase.startswith("evict"):
+                    reset_dir(work / "ring", work / "template")
+                    reset_dir(work / "backlog")
+                    if phase == "evict_drive":
+                        clear_drive(drive)
+                    candidates = [drive] if phase == "evict_drive" else []
+                    env["SEER_CONFIG"] = str(write_config(work, work / "ring", work / "backlog", candidates))
+                elif phase == "export":
+                    clear_drive(drive)
+                    reset_dir(work / "backlog", work / "template")
+                elif phase == "replug":
+                    # Drive already holds the export phase's files: re-plug should only skip
+                    reset_dir(work / "backlog", work / "template")
+                r = run_phase(phase, work, drive, env)
+                r["cold_cache"] = cold
+                runs.append(r)
+
+    # On-disk bytes the capture adds per second (snaplen-truncated), i.e. what the mover must keep up with
+    capture_mb_s = ring_bytes / args.files / ring_info["rotate_seconds"] / 1e6
+    results = {
+        "bench": "datapath",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "cpu": cpu_model(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "drive": drive_kind if args.drive != "path" else args.drive_path,
+        "ring": {
+            "files": args.files,
+            "file_mb": args.file_mb,
+            "bytes": ring_bytes,
+            "packets": ring_info["packets"],
+            "rate_mbps": args.rate_mbps,
+            "rotate_seconds": ring_info["rotate_seconds"],
+            "capture_mb_per_sec": round(capture_mb_s, 2),
+        },
+        "runs": runs,
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
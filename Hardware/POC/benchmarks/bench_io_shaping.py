@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Benchmark: capture write latency while a backlog drains off the same disk (seer_io.py shaping)
+- A capture writer child appends --capture-mbps to a ring directory in 64 KiB writes (tcpdump's
+  buffer) with an fdatasync every --flush-ms, rotating files every --rotate-seconds; every write and
+  every flush is timed
+- A drain child exports a backlog from the same disk with seer_copy.transfer_file (verify on) to
+  --drive-path (default a /dev/shm directory, so the source reads are what compete with capture)
+- Scenarios, --seconds each, backlog regenerated and dropped from the page cache before each:
+    capture_only  no drain: the reference latencies
+    unshaped      drain as before seer_io.py (no I/O class, no shaper)
+    ioprio        drain in the idle I/O class only
+    shaped        idle class + the capture-aware shaper (--disk-mbps, --headroom-pct, --min-mbps)
+- Reports flush and write latency p50/p99/max ms, the capture rate achieved and the drain MB/s
+- Put --workdir-root on the disk the ring lives on; the idle class needs a scheduler that honours it
+  (bfq, mq-deadline on recent kernels)
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SEER_DIR = Path(__file__).resolve().parents[3] / "Automation" / "SEER"
+sys.path.insert(0, str(SEER_DIR))
+
+import seer_copy  # noqa: E402
+import seer_io  # noqa: E402
+
+SCENARIOS = ("capture_only", "unshaped", "ioprio", "shaped")
+WRITE_BYTES = 64 * 1024
+MB = 1024**2
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def latency_ms(samples):
+    if not samples:
+        return None
+    return {
+        "p50": round(percentile(samples, 50) * 1000, 2),
+        "p99": round(percentile(samples, 99) * 1000, 2),
+        "max": round(max(samples) * 1000, 2),
+    }
+
+
+def scheduler(path):
+    """Active block I/O scheduler of the disk holding path (None when it can't be told)."""
+    dev = os.stat(path).st_dev
+    base = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    for sched in (f"{base}/queue/scheduler", f"{base}/../queue/scheduler"):
+        try:
+            with open(sched) as f:
+                text = f.read()
+            return text[text.index("[") + 1 : text.index("]")] if "[" in text else text.strip()
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def capture_writer(ring, rate_bps, flush_s, rotate_s, seconds, out):
+    """Paced appends + periodic fdatasync into ring/*.pcap; sends ({writes, flushes}, bytes) back."""
+    block = os.urandom(WRITE_BYTES)
+    writes, flushes = [], []
+    written = 0
+    t0 = time.monotonic()
+    end = t0 + seconds
+    next_flush = t0 + flush_s
+    seq = 0
+    f = None
+    opened = 0.0
+    while (now := time.monotonic()) < end:
+        if f is None or now - opened >= rotate_s:
+            if f is not None:
+                f.close()
+            old = sorted(ring.glob("*.pcap"))
+            for p in old[:-4]:  # keep a ring of a few rotations, as the mover would
+                p.unlink()
+            f = open(ring / f"cap-{seq:05d}.pcap", "wb", buffering=0)
+            seq += 1
+            opened = now
+        due = t0 + written / rate_bps
+        if due > now:
+            time.sleep(due - now)
+        t = time.perf_counter()
+        f.write(block)
+        writes.append(time.perf_counter() - t)
+        written += WRITE_BYTES
+        if time.monotonic() >= next_flush:
+            t = time.perf_counter()
+            os.fdatasync(f.fileno())
+            flushes.append(time.perf_counter() - t)
+            next_flush += flush_s
+    f.close()
+    out.put({"writes": writes, "flushes": flushes, "bytes": written, "seconds": time.monotonic() - t0})
+
+
+def drain(backlog, drive, io_cfg, ring, stop, out):
+    """Export the backlog with the copy engine under io_cfg until done or stop is set."""
+    shaper, desc = seer_io.configure({"io": io_cfg}, str(ring))
+    moved = 0
+    t0 = time.monotonic()
+    for src in sorted(backlog.glob("*.pcap")):
+        size = src.stat().st_size
+        result, _sha, _dst, _err = seer_copy.transfer_file(str(src), str(drive), verify=True, shaper=shaper, stop=stop)
+        if result != "OK":
+            break
+        moved += size
+    out.put(
+        {
+            "io": desc,
+            "bytes": moved,
+            "seconds": time.monotonic() - t0,
+            "shaper": shaper.snapshot() if shaper else None,
+        }
+    )
+
+
+def make_backlog(backlog, total_mb, file_mb):
+    """Backlog files on the ring's disk, fsynced and dropped from the page cache so the drain reads the disk."""
+    shutil.rmtree(backlog, ignore_errors=True)
+    backlog.mkdir(parents=True)
+    block = os.urandom(MB)
+    for i in range(max(1, total_mb // file_mb)):
+        with open(backlog / f"backlog-{i:04d}.pcap", "wb") as f:
+            for _ in range(file_mb):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def run_scenario(name, args, work, drive):
+    ring = work / "ring"
+    shutil.rmtree(ring, ignore_errors=True)
+    ring.mkdir()
+    for p in Path(drive).iterdir():
+        shutil.rmtree(p) if p.is_dir() else p.unlink()
+    make_backlog(work / "backlog", args.backlog_mb, args.file_mb)
+
+    ctx = mp.get_context("fork")
+    cap_q, drain_q, stop = ctx.Queue(), ctx.Queue(), ctx.Event()
+    cap = ctx.Process(
+        target=capture_writer,
+        args=(ring, args.capture_mbps * MB, args.flush_ms / 1000, args.rotate_seconds, args.seconds, cap_q),
+    )
+    cap.start()
+    drainer = None
+    if name != "capture_only":
+        io_cfg = {
+            "unshaped": {"class": "none", "disk_mbps": 0},
+            "ioprio": {"class": "idle", "disk_mbps": 0},
+            "shaped": {
+                "class": "idle",
+                "disk_mbps": args.disk_mbps,
+                "headroom_pct": args.headroom_pct,
+                "min_mbps": args.min_mbps,
+            },
+        }[name]
+        # Let capture establish its rate first (the shaper's first estimate reads the ring)
+        time.sleep(min(2.0, args.seconds / 4))
+        drainer = ctx.Process(target=drain, args=(work / "backlog", Path(drive), io_cfg, ring, stop, drain_q))
+        drainer.start()
+    captured = cap_q.get()
+    cap.join()
+    result = {
+        "scenario": name,
+        "flush_ms": latency_ms(captured["flushes"]),
+        "write_ms": latency_ms(captured["writes"]),
+        "capture_mb_per_sec": round(captured["bytes"] / captured["seconds"] / MB, 1),
+    }
+    if drainer:
+        stop.set()
+        drained = drain_q.get()
+        drainer.join()
+        result["io"] = drained["io"]
+        result["drain_mb_per_sec"] = round(drained["bytes"] / drained["seconds"] / MB, 1) if drained["seconds"] else 0
+        if drained["shaper"]:
+            result["shaper"] = drained["shaper"]
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--capture-mbps", type=float, default=40, help="Capture write rate, MB/s (default 40)")
+    ap.add_argument("--flush-ms", type=float, default=100, help="fdatasync interval of the capture writer")
+    ap.add_argument("--rotate-seconds", type=float, default=5)
+    ap.add_argument("--seconds", type=float, default=20, help="Length of each scenario")
+    ap.add_argument("--backlog-mb", type=int, default=2048, help="Backlog to drain (more than a scenario moves)")
+    ap.add_argument("--file-mb", type=int, default=64)
+    ap.add_argument("--disk-mbps", type=float, default=200, help="io.disk_mbps for the shaped scenario")
+    ap.add_argument("--headroom-pct", type=float, default=25)
+    ap.add_argument("--min-mbps", type=float, default=4)
+    ap.add_argument("--drive-path", help="Export target (default: a directory in /dev/shm)")
+    ap.add_argument("--workdir-root", default="/var/tmp", help="Where ring and backlog live (use the ring's disk)")
+    ap.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="seer-bench-io-", dir=args.workdir_root) as tmp:
+        work = Path(tmp)
+        drive = args.drive_path or tempfile.mkdtemp(prefix="seer-bench-drive-", dir="/dev/shm")
+        try:
+            runs = [run_scenario(name, args, work, drive) for name in args.scenarios]
+        finally:
+            if not args.drive_path:
+                shutil.rmtree(drive, ignore_errors=True)
+        sched = scheduler(tmp)
+
+    results = {
+        "bench": "io_shaping",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "scheduler": sched,
+        "drive": args.drive_path or "shm",
+        "capture_mbps": args.capture_mbps,
+        "flush_ms": args.flush_ms,
+        "runs": runs,
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
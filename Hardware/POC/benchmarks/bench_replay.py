@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Harness: end-to-end capture replay over a veth pair (seer-capture.sh, seer-zeek.sh, move_oldest.py)
+- Creates a veth pair; capture (tcpdump via seer-capture.sh) and Zeek (seer-zeek.sh) listen on one end
+- Replays a reference PCAP into the other end at each --rates step (Mbps): tcpreplay when installed,
+  otherwise a Python AF_PACKET sender with byte-rate pacing
+- The mover runs on its timer cadence (--mover-interval, 10s like seer-move-oldest.timer) into a backlog
+- Per step: packets sent vs written to PCAPs (and tcpdump kernel drops), Zeek conn/dns records,
+  ring fill, eviction lag and loss rate; the highest step within --max-loss is reported as sustainable
+- Needs root, iproute2 and tcpdump; Zeek is optional (its fields are null without it)
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[3]
+CAPTURE_SH = REPO / "Automation" / "bin" / "seer-capture.sh"
+ZEEK_SH = REPO / "Automation" / "seer-zeek.sh"
+MOVER = REPO / "Automation" / "SEER" / "move_oldest.py"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pcap_synth  # noqa: E402
+
+PCAP_HDR = struct.Struct("<IHHiIII")
+REC_HDR = struct.Struct("<IIII")
+
+
+def sh(*cmd, check=True):
+    return subprocess.run(cmd, check=check, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+@contextmanager
+def veth_pair(tx, rx):
+    """Create tx<->rx, bring both up, and silence IPv6 so only replayed frames are on the wire."""
+    sh("ip", "link", "del", tx, check=False)
+    sh("ip", "link", "add", tx, "type", "veth", "peer", "name", rx)
+    try:
+        for iface in (tx, rx):
+            try:
+                Path(f"/proc/sys/net/ipv6/conf/{iface}/disable_ipv6").write_text("1\n")
+            except OSError:
+                pass
+            sh("ip", "link", "set", iface, "up")
+        yield
+    finally:
+        sh("ip", "link", "del", tx, check=False)
+
+
+def pcap_packets(path):
+    """Packet records of a pcap as bytes; stops quietly at a truncated tail (file still being written)."""
+    data = Path(path).read_bytes()
+    if len(data) < PCAP_HDR.size:
+        return []
+    out = []
+    off = PCAP_HDR.size
+    while off + REC_HDR.size <= len(data):
+        _, _, caplen, _ = REC_HDR.unpack_from(data, off)
+        off += REC_HDR.size
+        if off + caplen > len(data):
+            break
+        out.append(data[off : off + caplen])
+        off += caplen
+    return out
+
+
+def count_pcap(path):
+    return len(pcap_packets(path))
+
+
+def send_python(iface, packets, rate_mbps, duration):
+    """Replay packets in a loop at rate_mbps for `duration` seconds. Returns (sent, failed, bytes, seconds)."""
+    s = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+    s.bind((iface, 0))
+    rate = rate_mbps * 1e6 / 8
+    sent = failed = sent_bytes = i = 0
+    n = len(packets)
+    start = time.monotonic()
+    try:
+        while (elapsed := time.monotonic() - start) < duration:
+            allowed = elapsed * rate
+            if sent_bytes >= allowed:
+                time.sleep(min(0.001, (sent_bytes - allowed) / rate))
+                continue
+            while sent_bytes < allowed:
+                pkt = packets[i % n]
+                i += 1
+                try:
+                    s.send(pkt)
+                    sent += 1
+                    sent_bytes += len(pkt)
+                except OSError:
+                    failed += 1
+                    break
+    finally:
+        s.close()
+    return sent, failed, sent_bytes, time.monotonic() - start
+
+
+def send_tcpreplay(iface, pcap, rate_mbps, duration):
+    """Replay with tcpreplay (looping) for `duration` seconds. Returns (sent, failed, bytes, seconds)."""
+    r = sh("tcpreplay", "-i", iface, f"--mbps={rate_mbps}", "--loop=0", f"--duration={duration}", str(pcap))
+    out = r.stdout + r.stderr
+    m = re.search(r"Actual: (\d+) packets \((\d+) bytes\) sent in ([\d.]+) seconds", out)
+    failed = re.search(r"Failed packets:\s+(\d+)", out)
+    if not m:
+        raise RuntimeError(f"could not parse tcpreplay output:\n{out}")
+    return int(m.group(1)), int(failed.group(1)) if failed else 0, int(m.group(2)), float(m.group(3))
+
+
+class MoverTimer(threading.Thread):
+    """Runs move_oldest.py every `interval` seconds like the systemd timer; samples ring fill and lag."""
+
+    def __init__(self, ring, env, interval):
+        super().__init__(daemon=True)
+        self.ring = Path(ring)
+        self.env = env
+        self.interval = interval
+        self.stop = threading.Event()
+        self.max_files = 0
+        self.max_bytes = 0
+        self.lags = []
+
+    def snapshot(self):
+        files = {}
+        for p in self.ring.glob("*.pcap"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            files[p.name] = (st.st_mtime, st.st_size)
+        return files
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            before = self.snapshot()
+            self.max_files = max(self.max_files, len(before))
+            self.max_bytes = max(self.max_bytes, sum(size for _, size in before.values()))
+            subprocess.run([sys.executable, str(MOVER)], env=self.env, check=False)
+            now = time.time()
+            after = self.snapshot()
+            # Lag: how long a file sat closed in the ring before the mover took it
+            self.lags += [now - mtime for name, (mtime, _) in before.items() if name not in after]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def zeek_records(log_dir, name):
+    total = 0
+    for p in Path(log_dir).glob(f"{name}*.log"):
+        with open(p, "rb") as f:
+            total += sum(1 for line in f if line.startswith(b"{"))
+    return total
+
+
+def run_step(rate, args, work, ref_pcap, packets, rx, tx):
+    step = work / f"step-{rate:g}"
+    ring, backlog, zeek_dir = step / "ring", step / "backlog", step / "zeek"
+    for d in (ring, backlog, zeek_dir):
+        d.mkdir(parents=True)
+    cfg = {
+        "ring_dir": str(ring),
+        "backlog_dir": str(backlog),
+        "buffer_threshold": args.threshold,
+        "mover_log": str(step / "mover.log"),
+        "zeek_workers": 1,
+        "capture": {"snaplen": args.snaplen, "rotate_seconds": args.rotate},
+        "export": {"mount_candidates": [], "discover_roots": []},
+    }
+    (step / "seer.yml").write_text(json.dumps(cfg))  # JSON is valid YAML; keeps the harness stdlib-only
+    env = dict(os.environ, SEER_CONFIG=str(step / "seer.yml"), RING_DIR=str(ring), CAPTURE_USER="root")
+
+    cap = subprocess.Popen(
+        ["bash", str(CAPTURE_SH), rx], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    zeek = None
+    if shutil.which("zeek") or Path("/opt/zeek/bin/zeek").exists():
+        zeek_env = dict(
+            env,
+            IFACE=rx,
+            LOG_DIR=str(zeek_dir),
+            LOG_FLAT="1",
+            SYSTEMD="1",
+            ZEEK_WORKERS="1",
+            ZEEK_IFACE_MODE="pcap",
+            PIDFILE=str(step / "zeek.pid"),
+            LOCKFILE=str(step / "zeek.lock"),
+        )
+        zeek = subprocess.Popen(
+            ["bash", str(ZEEK_SH), "start"], env=zeek_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    time.sleep(args.warmup)  # let tcpdump and Zeek open the interface
+
+    mover = MoverTimer(ring, env, args.mover_interval)
+    mover.start()
+    if shutil.which("tcpreplay") and not args.python_sender:
+        sender = "tcpreplay"
+        sent, failed, sent_bytes, seconds = send_tcpreplay(tx, ref_pcap, rate, args.duration)
+    else:
+        sender = "python"
+        sent, failed, sent_bytes, seconds = send_python(tx, packets, rate, args.duration)
+    time.sleep(args.drain)
+
+    cap.send_signal(signal.SIGINT)  # same as the unit's KillSignal; tcpdump prints its counters
+    _, cap_err = cap.communicate(timeout=30)
+    if zeek:
+        zeek.send_signal(signal.SIGTERM)
+        zeek.wait(timeout=60)
+    mover.stop.set()
+    mover.join()
+
+    counters = re.findall(r"(\d+) packets? (captured|received by filter|dropped by kernel)", cap_err)
+    stats = {k: int(v) for v, k in counters}
+    written = sum(count_pcap(p) for d in (ring, backlog) for p in d.glob("*.pcap"))
+    loss = max(0.0, 1 - written / sent) if sent else None
+    return {
+        "rate_mbps": rate,
+        "sender": sender,
+        "sent": sent,
+        "send_failed": failed,
+        "sent_mbps": round(sent_bytes * 8 / seconds / 1e6, 1) if seconds else None,
+        "pps": round(sent / seconds) if seconds else None,
+        "written": written,
+        "kernel_drops": stats.get("dropped by kernel"),
+        "loss": round(loss, 5) if loss is not None else None,
+        "zeek_conn": zeek_records(zeek_dir, "conn") if zeek else None,
+        "zeek_dns": zeek_records(zeek_dir, "dns") if zeek else None,
+        "ring_max_files": mover.max_files,
+        "ring_max_bytes": mover.max_bytes,
+        "ring_left_files": len(list(ring.glob("*.pcap"))),
+        "eviction_lag_s": {
+            "p50": round(percentile(mover.lags, 50), 1) if mover.lags else None,
+            "max": round(max(mover.lags), 1) if mover.lags else None,
+        },
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rates", type=float, nargs="+", default=[10, 50, 100, 200, 500], help="Mbps steps")
+    ap.add_argument("--duration", type=float, default=30, help="Seconds of replay per step")
+    ap.add_argument("--pcap", help="Reference PCAP to replay (default: synthetic full-size packets)")
+    ap.add_argument("--snaplen", type=int, default=128)
+    ap.add_argument("--rotate", type=int, default=5, help="capture.rotate_seconds for the run")
+    ap.add_argument("--threshold", type=int, default=4, help="buffer_threshold for the mover")
+    ap.add_argument("--mover-interval", type=float, default=10, help="Mover cadence (seer-move-oldest.timer)")
+    ap.add_argument("--warmup", type=float, default=3)
+    ap.add_argument("--drain", type=float, default=2, help="Seconds to wait after replay before stopping")
+    ap.add_argument("--max-loss", type=float, default=0.001, help="Loss fraction still counted as sustainable")
+    ap.add_argument("--python-sender", action="store_true", help="Use the AF_PACKET sender even with tcpreplay")
+    ap.add_argument("--iface-prefix", default="seerbench")
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+
+    if os.geteuid() != 0:
+        ap.error("needs root (veth, tcpdump)")
+    for tool in ("ip", "tcpdump"):
+        if not shutil.which(tool):
+            ap.error(f"{tool} not found")
+
+    tx, rx = f"{args.iface_prefix}0", f"{args.iface_prefix}1"
+    steps = []
+    with tempfile.TemporaryDirectory(prefix="seer-bench-replay-", dir="/var/tmp") as tmp:
+        work = Path(tmp)
+        if args.pcap:
+            ref_pcap = Path(args.pcap)
+        else:
+            ref = pcap_synth.write_ring(work / "ref", 1, 8 * 1024 * 1024, rate_mbps=100, snaplen=1514)
+            ref_pcap = ref["files"][0]
+        packets = pcap_packets(ref_pcap)
+
+        with veth_pair(tx, rx):
+            for rate in args.rates:
+                print(f"step {rate:g} Mbps ...", file=sys.stderr)
+                steps.append(run_step(rate, args, work, ref_pcap, packets, rx, tx))
+
+    ok = [s for s in steps if s["loss"] is not None and s["loss"] <= args.max_loss]
+    best = max(ok, key=lambda s: s["pps"] or 0) if ok else None
+    results = {
+        "bench": "replay",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "kernel": platform.release(),
+        "python": platform.python_version(),
+        "reference_pcap": str(args.pcap or "synthetic"),
+        "reference_packets": len(packets),
+        "snaplen": args.snaplen,
+        "rotate_seconds": args.rotate,
+        "max_loss": args.max_loss,
+        "sustainable": {"rate_mbps": best["rate_mbps"], "pps": best["pps"]} if best else None,
+        "steps": steps,
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Zeek JSON vs columnar rollup (seer_rollup.py)
+- Generates a synthetic rotated conn.log (or uses --conn-log)
+- Measures compaction time, on-disk size reduction and a top-talkers pivot
+  over the raw JSON vs the rollup part
+- Prints/writes machine-readable JSON results
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Automation" / "SEER"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import seer_rollup  # noqa: E402
+import zeek_synth  # noqa: E402
+
+
+def top_talkers_json(path, n=10):
+    counts = Counter()
+    with open(path, "rb") as f:
+        for line in f:
+            counts[json.loads(line).get("id.orig_h")] += 1
+    return counts.most_common(n)
+
+
+def timed(fn, *args, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200_000, help="Synthetic conn records (default 200000)")
+    ap.add_argument("--conn-log", help="Use a real rotated conn log instead of synthetic data")
+    ap.add_argument("--format", default="auto", choices=["auto", "scol", "parquet"])
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+
+    fmt = seer_rollup.resolve_format(args.format)
+    with tempfile.TemporaryDirectory(prefix="seer-bench-rollup-") as tmp:
+        spool = Path(tmp) / "spool"
+        rollup_dir = Path(tmp) / "rollup"
+        spool.mkdir()
+        src = spool / "conn.2025-01-01-00-00-00.log"
+        if args.conn_log:
+            src.write_bytes(Path(args.conn_log).read_bytes())
+        else:
+            zeek_synth.write_conn_log(src, args.rows)
+        old = time.time() - 3600
+        os.utime(src, (old, old))
+
+        seer_rollup.STATE_FILE = str(Path(tmp) / "rollup.state")
+        t0 = time.perf_counter()
+        _, rows = seer_rollup.compact(spool, rollup_dir, ["conn"], fmt)
+        compact_s = time.perf_counter() - t0
+
+        parts = list(seer_rollup.iter_parts(rollup_dir, "conn"))
+        json_bytes = src.stat().st_size
+        rollup_bytes = sum(p.stat().st_size for p in parts)
+
+        json_s, json_top = timed(top_talkers_json, src)
+        col_s, col_top = timed(seer_rollup.top_values, parts, "id.orig_h")
+        if [c for _, c in json_top] != [c for _, c in col_top]:
+            print("WARNING: top-talker counts differ between JSON and rollup", file=sys.stderr)
+
+    results = {
+        "bench": "rollup",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "format": fmt,
+        "rows": rows,
+        "json_bytes": json_bytes,
+        "rollup_bytes": rollup_bytes,
+        "size_ratio": round(json_bytes / rollup_bytes, 2) if rollup_bytes else None,
+        "compact_s": round(compact_s, 3),
+        "compact_rows_per_s": round(rows / compact_s) if compact_s else None,
+        "top_talkers_json_s": round(json_s, 4),
+        "top_talkers_rollup_s": round(col_s, 4),
+        "query_speedup": round(json_s / col_s, 1) if col_s else None,
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Harness: graceful shutdown of seer_hotswap.py during an active multi-GB drain
+- Writes --files x --file-mb of backlog (incompressible, back-dated) and a loop-mounted ext4 or
+  tmpfs export drive (root), then runs the real service (HotswapService) in a child process with
+  its state/lock/drive stats redirected into the work dir
+- Once --after-mb have been copied, sends SIGTERM and times the exit: shutdown_seconds is SIGTERM
+  to process exit (target: under a second); the service logs its own "Stopped in" figure
+- After the stop: every file in MANIFEST.txt is on the drive with that sha256, the in-flight file
+  left a checkpointed .part, the rest is still in the backlog
+- --resume starts the service again, waits for the drain to finish and checks every original
+  sha256 on the drive (the checkpointed copy must resume, not restart)
+- Prints/writes machine-readable JSON
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SEER_DIR = Path(__file__).resolve().parents[3] / "Automation" / "SEER"
+sys.path.insert(0, str(SEER_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_datapath import drive_target, write_config  # noqa: E402
+
+BLOCK = 8 * 1024 * 1024
+
+
+def write_backlog(backlog, files, file_mb):
+    """Back-dated SEER-*.pcap files; returns {name: sha256}."""
+    backlog.mkdir(parents=True)
+    block = os.urandom(BLOCK)
+    shas = {}
+    start = time.time() - 3600
+    for i in range(files):
+        path = backlog / time.strftime(f"SEER-%Y%m%d-%H%M{i:02d}.pcap", time.localtime(start))
+        h = hashlib.sha256()
+        with open(path, "wb") as f:
+            for n in range(file_mb * 1024 * 1024 // BLOCK):
+                chunk = n.to_bytes(8, "little") + block[8:]  # no two blocks alike
+                f.write(chunk)
+                h.update(chunk)
+        os.utime(path, (start + i, start + i))
+        shas[path.name] = h.hexdigest()
+    return shas
+
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(BLOCK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def run_child(work):
+    """The service itself, with everything host-wide redirected into work."""
+    import seer_drives
+    import seer_hotswap
+
+    seer_hotswap.STATE_FILE = str(work / "hotswap_state.json")
+    seer_hotswap.LOCK_FILE = str(work / "hotswap.lock")
+    seer_drives.DRIVE_STATS = str(work / "drives.state")
+    sys.argv = [sys.argv[0]]
+    seer_hotswap.main()
+
+
+def read_state(work):
+    try:
+        return json.loads((work / "hotswap_state.json").read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def start_service(work, env, tag):
+    out = open(work / f"service-{tag}.log", "wb")
+    cmd = [sys.executable, __file__, "--child", str(work)]
+    return subprocess.Popen(cmd, stdout=out, stderr=subprocess.STDOUT, env=env), work / f"service-{tag}.log"
+
+
+def wait_for(pred, timeout, step=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(step)
+    return False
+
+
+def stop(proc):
+    """SIGTERM; returns (seconds to exit, exit code)."""
+    t0 = time.perf_counter()
+    proc.send_signal(signal.SIGTERM)
+    try:
+        code = proc.wait(timeout=120)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        code = proc.wait()
+    return time.perf_counter() - t0, code
+
+
+def drive_report(drive, shas):
+    """What is on the drive: manifest entries checked against the originals, .part files."""
+    listed, bad = 0, []
+    for manifest in Path(drive).rglob("MANIFEST.txt"):
+        for line in manifest.read_text().splitlines():
+            if not line or line.startswith("#"):
+                continue
+            sha, _, name = line.partition("  ")
+            listed += 1
+            path = manifest.parent / name
+            if not path.exists() or sha != shas.get(name) or sha256(path) != sha:
+                bad.append(name)
+    parts = {p.name: p.stat().st_size for p in Path(drive).rglob("*.part")}
+    log_lines = sum(1 for _ in open(Path(drive) / "TRANSFER.LOG")) if (Path(drive) / "TRANSFER.LOG").exists() else 0
+    return {"manifest_files": listed, "manifest_mismatches": bad, "part_files": parts, "transfer_log_lines": log_lines}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=4, help="Backlog files (default 4)")
+    ap.add_argument("--file-mb", type=int, default=768, help="Size of each file in MB (default 768)")
+    ap.add_argument("--after-mb", type=int, default=1200, help="Send SIGTERM once this much was copied")
+    ap.add_argument("--drive", default="auto", choices=["auto", "loop", "tmpfs"])
+    ap.add_argument("--workdir-root", default="/var/tmp", help="Where the backlog lives")
+    ap.add_argument("--resume", action="store_true", help="Restart the service and check the drain completes")
+    ap.add_argument("--out", help="Write JSON results to this file")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        run_child(Path(args.child))
+        return
+    if os.geteuid() != 0:
+        ap.error("needs root (loop/tmpfs export drive)")
+
+    total_mb = args.files * args.file_mb
+    with tempfile.TemporaryDirectory(prefix="seer-bench-shutdown-", dir=args.workdir_root) as tmp:
+        work = Path(tmp)
+        shas = write_backlog(work / "backlog", args.files, args.file_mb)
+        with drive_target(args.drive, work, total_mb * 2 + 128) as (drive, drive_kind):
+            cfg = write_config(work, work / "ring", work / "backlog", [drive])
+            env = dict(os.environ, SEER_CONFIG=str(cfg), PYTHONPATH=str(SEER_DIR))
+
+            proc, log_path = start_service(work, env, "drain")
+            copying = wait_for(
+                lambda: (read_state(work).get("export") or {}).get("done_bytes", 0) >= args.after_mb * 1024**2,
+                timeout=600,
+            )
+            copied = (read_state(work).get("export") or {}).get("done_bytes", 0)
+            seconds, code = stop(proc)
+            service_log = log_path.read_text(errors="replace")
+            m = re.search(r"Stopped in ([\d.]+)s", service_log)
+            report = {
+                "ts": time.time(),
+                "host": os.uname().nodename,
+                "drive": drive_kind,
+                "backlog_mb": total_mb,
+                "sigterm_during_copy": copying,
+                "copied_mb_at_sigterm": round(copied / 1024**2),
+                "shutdown_seconds": round(seconds, 3),
+                "service_stopped_in_s": float(m.group(1)) if m else None,
+                "exit_code": code,
+                "after_stop": {
+                    **drive_report(drive, shas),
+                    "backlog_left": sorted(p.name for p in (work / "backlog").glob("*.pcap")),
+                },
+            }
+
+            if args.resume:
+                proc, log_path = start_service(work, env, "resume")
+                t0 = time.perf_counter()
+                done = wait_for(lambda: not any((work / "backlog").glob("*.pcap")), timeout=1800, step=0.2)
+                wait_for(lambda: (read_state(work).get("export") or {}).get("state") == "done", timeout=60)
+                drain_seconds = time.perf_counter() - t0
+                stop(proc)
+                resumed = re.findall(r"Resuming (\S+) at (\d+) MB", log_path.read_text(errors="replace"))
+                on_drive = {p.name: p for p in Path(drive).rglob("SEER-*.pcap")}
+                report["resume"] = {
+                    "drained": done,
+                    "seconds": round(drain_seconds, 3),
+                    "resumed": [{"file": f, "from_mb": int(mb)} for f, mb in resumed],
+                    "all_files_verified": all(n in on_drive and sha256(on_drive[n]) == s for n, s in shas.items()),
+                    **drive_report(drive, shas),
+                }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
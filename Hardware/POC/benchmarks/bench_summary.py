@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: traffic summary ingest (seer_summary.py)
+- Tails a synthetic conn.log end to end (read + JSON decode + sketch update)
+- Reports records/sec, and retained sketch memory for growing inputs to show
+  memory stays constant regardless of how many records were ingested
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Automation" / "SEER"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import seer_summary  # noqa: E402
+import zeek_synth  # noqa: E402
+
+
+def ingest(path, summary, now):
+    tail = seer_summary.LogTail(path, seer_summary.CONN_FIELDS)
+    n = 0
+    for rec in tail.poll():
+        summary.ingest_conn(rec, now)
+        n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[50_000, 100_000, 200_000])
+    ap.add_argument("--capacity", type=int, default=64)
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+
+    steps = []
+    with tempfile.TemporaryDirectory(prefix="seer-bench-summary-") as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"conn-{rows}.log"
+            zeek_synth.write_conn_log(path, rows)
+            now = time.time()
+
+            summary = seer_summary.TrafficSummary(args.capacity, 60, 61)
+            t0 = time.perf_counter()
+            n = ingest(path, summary, now)
+            dt = time.perf_counter() - t0
+
+            # Separate pass for memory: what the summary retains after ingesting everything
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            summary = seer_summary.TrafficSummary(args.capacity, 60, 61)
+            ingest(path, summary, now)
+            retained = tracemalloc.get_traced_memory()[0] - base
+            tracemalloc.stop()
+
+            steps.append(
+                {
+                    "rows": n,
+                    "seconds": round(dt, 3),
+                    "records_per_sec": round(n / dt) if dt else None,
+                    "retained_bytes": retained,
+                    "top_host": summary.dims["hosts"].top(300, now, 1),
+                }
+            )
+
+    results = {
+        "bench": "summary",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "capacity": args.capacity,
+        "steps": steps,
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backlog downsampling (seer_backlog.truncate_pcap, backlog_policy: downsample)
+- Generates --files x --file-mb of full-snaplen PCAPs with pcap_synth.py, then rewrites them to
+  --snaplen bytes per packet (headers only by default)
+- backends: each truncate_pcap backend (numpy when installed, stdlib) in this process over a warm
+  page cache: input GB/s per CPU second (= per core), output ratio; outputs are compared byte for byte
+- pool: the rewrite pool as BacklogManager runs it (niced processes) at each --workers count:
+  wall GB/s, and GB/s per worker
+- Prints/writes machine-readable JSON; run the same command on each hardware candidate
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+SEER_DIR = Path(__file__).resolve().parents[3] / "Automation" / "SEER"
+sys.path.insert(0, str(SEER_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pcap_synth  # noqa: E402
+import seer_backlog  # noqa: E402
+
+
+def warm(paths):
+    for p in paths:
+        with open(p, "rb") as f:
+            while f.read(8 * 1024 * 1024):
+                pass
+
+
+def bench_backend(backend, files, snaplen, out_dir):
+    warm(files)
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    outs = []
+    for src in files:
+        dst = out_dir / f"{backend}-{src.name}"
+        seer_backlog.truncate_pcap(src, dst, snaplen, backend=backend)
+        outs.append(dst)
+    wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+    size_in = sum(p.stat().st_size for p in files)
+    size_out = sum(p.stat().st_size for p in outs)
+    return outs, {
+        "backend": backend,
+        "seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "gb_per_s": round(size_in / wall / 1e9, 3),
+        "gb_per_s_per_core": round(size_in / max(cpu, 1e-9) / 1e9, 3),
+        "output_ratio": round(size_out / size_in, 4),
+    }
+
+
+def bench_pool(workers, files, snaplen, out_dir):
+    warm(files)
+    jobs = [("downsample", src, out_dir / f"pool{workers}-{src.name}", snaplen) for src in files]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=seer_backlog._worker_init) as pool:
+        for _ in pool.map(seer_backlog.rewrite_file, *zip(*jobs)):
+            pass
+    wall = time.perf_counter() - t0
+    for _, _, dst, _ in jobs:
+        dst.unlink()
+    size_in = sum(p.stat().st_size for p in files)
+    return {
+        "workers": workers,
+        "seconds": round(wall, 3),
+        "gb_per_s": round(size_in / wall / 1e9, 3),
+        "gb_per_s_per_worker": round(size_in / wall / 1e9 / workers, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=8, help="Backlog files (default 8)")
+    ap.add_argument("--file-mb", type=int, default=64, help="Size of each file in MB (default 64)")
+    ap.add_argument("--capture-snaplen", type=int, default=1514, help="Snaplen of the synthetic capture")
+    ap.add_argument("--snaplen", type=int, default=seer_backlog.HEADERS_SNAPLEN, help="Downsample target")
+    ap.add_argument("--workers", type=int, nargs="+", help="Pool sizes to try (default 1 and all cores)")
+    ap.add_argument("--workdir-root", default="/var/tmp", help="Where the files live (use the backlog's disk)")
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+    workers = args.workers or sorted({1, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory(prefix="seer-bench-truncate-", dir=args.workdir_root) as tmp:
+        work = Path(tmp)
+        ring = pcap_synth.write_ring(
+            work / "backlog", args.files, args.file_mb * 1024 * 1024, rate_mbps=1, snaplen=args.capture_snaplen
+        )
+        files = [Path(p) for p in ring["files"]]
+        out_dir = work / "out"
+        out_dir.mkdir()
+
+        backends = ["numpy", "stdlib"] if seer_backlog.np is not None else ["stdlib"]
+        results, outputs = [], {}
+        for backend in backends:
+            outputs[backend], res = bench_backend(backend, files, args.snaplen, out_dir)
+            results.append(res)
+        identical = None
+        if len(outputs) > 1:
+            identical = all(a.read_bytes() == b.read_bytes() for a, b in zip(*outputs.values()))
+        pool = [bench_pool(n, files, args.snaplen, out_dir) for n in workers]
+
+    report = {
+        "ts": time.time(),
+        "host": os.uname().nodename,
+        "cpu_count": os.cpu_count(),
+        "numpy": getattr(seer_backlog.np, "__version__", None),
+        "files": args.files,
+        "input_bytes": ring["bytes"],
+        "packets": ring["packets"],
+        "capture_snaplen": args.capture_snaplen,
+        "snaplen": args.snaplen,
+        "backends": results,
+        "backends_identical": identical,
+        "pool": pool,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
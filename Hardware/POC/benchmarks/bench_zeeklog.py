@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Zeek JSON decoding backends (seer_zeeklog.py)
+- Baseline: `for line in f: json.loads(line)` (what consumers did before)
+- ZeekLogReader with every installed backend (msgspec, orjson, json), full dicts and
+  with field projection (the 7 fields the traffic summary needs)
+- Pass --conn-log to run against a real conn.log; otherwise a synthetic one is generated
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "Automation" / "SEER"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import seer_zeeklog  # noqa: E402
+import zeek_synth  # noqa: E402
+
+PROJECTION = ("id.orig_h", "id.resp_h", "id.resp_p", "proto", "service", "orig_bytes", "resp_bytes")
+
+
+def baseline(path):
+    n = 0
+    with open(path, "rb") as f:
+        for line in f:
+            json.loads(line)
+            n += 1
+    return n
+
+
+def reader(path, backend, fields):
+    n = 0
+    for _ in seer_zeeklog.ZeekLogReader(path, fields=fields, backend=backend):
+        n += 1
+    return n
+
+
+def best_of(fn, *args, repeat=3):
+    best = None
+    n = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = fn(*args)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200_000, help="Synthetic conn records (default 200000)")
+    ap.add_argument("--conn-log", help="Benchmark against a real conn.log")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="Write JSON results to this file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="seer-bench-zeeklog-") as tmp:
+        path = Path(args.conn_log) if args.conn_log else Path(tmp) / "conn.log"
+        if not args.conn_log:
+            zeek_synth.write_conn_log(path, args.rows)
+        size = path.stat().st_size
+
+        runs = []
+        dt, n = best_of(baseline, path, repeat=args.repeat)
+        runs.append({"name": "baseline json.loads per line", "seconds": round(dt, 3), "records": n})
+        for backend in seer_zeeklog.available_backends():
+            for label, fields in (("full", None), ("projected", PROJECTION)):
+                dt, n = best_of(reader, path, backend, fields, repeat=args.repeat)
+                runs.append({"name": f"reader {backend} {label}", "seconds": round(dt, 3), "records": n})
+
+    base_s = runs[0]["seconds"]
+    for r in runs:
+        r["records_per_sec"] = round(r["records"] / r["seconds"]) if r["seconds"] else None
+        r["mb_per_sec"] = round(size / r["seconds"] / 1e6, 1) if r["seconds"] else None
+        r["speedup"] = round(base_s / r["seconds"], 2) if r["seconds"] else None
+
+    results = {
+        "bench": "zeeklog",
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "input": str(args.conn_log or "synthetic"),
+        "bytes": size,
+        "runs": runs,
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
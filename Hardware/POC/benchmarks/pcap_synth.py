@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Synthetic PCAP ring generator for the mover/exporter benchmarks
+- Valid libpcap files (Ethernet/IPv4/TCP+UDP, truncated to snaplen like seer-capture.sh)
+  named like tcpdump -G output: SEER-YYYYmmdd-HHMMSS.pcap
+- rate_mbps is the wire rate being captured: packet timestamps advance by wire_len / rate,
+  each file's mtime is its last packet, so rotation period = what the ring would see live
+- Files are back-dated so the mover treats them as closed
+"""
+
+import os
+import random
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+PCAP_HDR = struct.Struct("<IHHiIII")
+REC_HDR = struct.Struct("<IIII")
+LINKTYPE_ETHERNET = 1
+WIRE_SIZES = (64, 64, 90, 576, 1500, 1500, 1500)  # rough internet mix, bytes on the wire
+
+
+def _bodies(rng, snaplen, n=4096, n_hosts=500):
+    """Pool of (captured bytes, wire length) packets; reused across files to keep generation cheap."""
+    hosts = [bytes([10, rng.randrange(256), rng.randrange(256), rng.randrange(1, 255)]) for _ in range(n_hosts)]
+    out = []
+    for _ in range(n):
+        wire = rng.choice(WIRE_SIZES)
+        proto = rng.choice((6, 6, 6, 17))
+        eth = b"\x02\x00\x00\x00\x00\x01\x02\x00\x00\x00\x00\x02\x08\x00"
+        ip = struct.pack(
+            "!BBHHHBBH4s4s", 0x45, 0, wire - 14, rng.randrange(65536), 0, 64, proto, 0, *rng.sample(hosts, 2)
+        )
+        ports = struct.pack("!HH", rng.randrange(1024, 65536), rng.choice((53, 80, 123, 443, 443, 8080)))
+        l4 = ports + (rng.randbytes(16) if proto == 6 else struct.pack("!HH", wire - 34, 0))
+        pkt = eth + ip + l4 + rng.randbytes(max(0, wire - 14 - 20 - len(l4)))
+        out.append((pkt[:snaplen], wire))
+    return out
+
+
+def write_pcap(path, size, start_ts, rate_bps, bodies, rng):
+    """Write one pcap of about `size` bytes starting at start_ts. Returns (packets, end_ts)."""
+    snaplen = max(len(b) for b, _ in bodies)
+    ts = start_ts
+    written = PCAP_HDR.size
+    packets = 0
+    chunks = [PCAP_HDR.pack(0xA1B2C3D4, 2, 4, 0, 0, snaplen, LINKTYPE_ETHERNET)]
+    pack = REC_HDR.pack
+    choice = rng.choice
+    while written < size:
+        body, wire = choice(bodies)
+        sec = int(ts)
+        chunks.append(pack(sec, int((ts - sec) * 1e6), len(body), wire))
+        chunks.append(body)
+        written += REC_HDR.size + len(body)
+        ts += wire * 8 / rate_bps
+        packets += 1
+    with open(path, "wb") as f:
+        f.write(b"".join(chunks))
+    os.utime(path, (ts, ts))
+    return packets, ts
+
+
+def write_ring(ring_dir, count, file_size, rate_mbps=100, snaplen=128, seed=1, start_ts=None):
+    """
+    Write `count` consecutive ring files of ~file_size bytes into ring_dir.
+    Returns {"files": [paths], "packets", "bytes", "rotate_seconds"} (rotate = mean file period).
+    """
+    rng = random.Random(seed)
+    bodies = _bodies(rng, snaplen)
+    rate_bps = rate_mbps * 1e6
+    mean_cap = sum(len(b) + REC_HDR.size for b, _ in bodies) / len(bodies)
+    mean_wire = sum(w for _, w in bodies) / len(bodies)
+    rotate = file_size / mean_cap * mean_wire * 8 / rate_bps
+    # Back-date so the newest file is already older than the mover's quiet period
+    ts = start_ts if start_ts is not None else time.time() - count * rotate - 60
+
+    ring = Path(ring_dir)
+    ring.mkdir(parents=True, exist_ok=True)
+    files = []
+    packets = 0
+    for _ in range(count):
+        path = ring / f"SEER-{datetime.fromtimestamp(ts).strftime('%Y%m%d-%H%M%S')}.pcap"
+        n, ts = write_pcap(path, file_size, ts, rate_bps, bodies, rng)
+        packets += n
+        files.append(path)
+    return {
+        "files": files,
+        "packets": packets,
+        "bytes": sum(p.stat().st_size for p in files),
+        "rotate_seconds": round(rotate, 3),
+    }
@@ -0,0 +1,94 @@
+"""
+Synthetic Zeek JSON log generator for SEER benchmarks.
+- Skewed host/port popularity (a few heavy talkers, a long tail) like a real SPAN feed
+- Deterministic for a given seed so results are comparable across hardware
+"""
+
+import json
+import random
+import time
+
+
+def _hosts(rng, n, prefix):
+    return [f"{prefix}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(n)]
+
+
+def _skewed(rng, items):
+    # Zipf-like pick: low indexes are far more likely
+    return items[min(int(rng.paretovariate(1.2)) - 1, len(items) - 1)]
+
+
+def write_conn_log(path, rows, seed=1, start_ts=None, n_hosts=2000):
+    """Write `rows` line-delimited JSON conn records to path; returns bytes written."""
+    rng = random.Random(seed)
+    orig = _hosts(rng, n_hosts, "10.1")
+    resp = _hosts(rng, n_hosts, "172.16")
+    ports = [502, 443, 53, 80, 20000, 44818, 102, 22, 123, 161] + list(range(1024, 1100))
+    services = {502: "modbus", 443: "ssl", 53: "dns", 80: "http", 20000: "dnp3", 22: "ssh", 123: "ntp"}
+    ts = start_ts or time.time() - rows * 0.01
+    written = 0
+    with open(path, "w") as f:
+        for i in range(rows):
+            ts += rng.random() * 0.02
+            rp = _skewed(rng, ports)
+            rec = {
+                "ts": round(ts, 6),
+                "uid": f"C{i:016x}",
+                "id.orig_h": _skewed(rng, orig),
+                "id.orig_p": rng.randint(1024, 65535),
+                "id.resp_h": _skewed(rng, resp),
+                "id.resp_p": rp,
+                "proto": "udp" if rp in (53, 123, 161) else "tcp",
+                "duration": round(rng.random() * 30, 6),
+                "orig_bytes": rng.randint(0, 20000),
+                "resp_bytes": rng.randint(0, 200000),
+                "conn_state": rng.choice(["SF", "S0", "REJ", "RSTO", "OTH"]),
+                "missed_bytes": 0,
+                "history": rng.choice(["ShADadFf", "S", "ShR", "Dd"]),
+                "orig_pkts": rng.randint(1, 200),
+                "orig_ip_bytes": rng.randint(40, 30000),
+                "resp_pkts": rng.randint(0, 300),
+                "resp_ip_bytes": rng.randint(0, 300000),
+            }
+            if rp in services:
+                rec["service"] = services[rp]
+            line = json.dumps(rec) + "\n"
+            f.write(line)
+            written += len(line)
+    return written
+
+
+def write_dns_log(path, rows, seed=2, start_ts=None, n_names=5000):
+    """Write `rows` line-delimited JSON dns records to path; returns bytes written."""
+    rng = random.Random(seed)
+    names = [f"host{i}.plant{rng.randint(1, 9)}.example.com" for i in range(n_names)]
+    clients = _hosts(rng, 500, "10.1")
+    ts = start_ts or time.time() - rows * 0.01
+    written = 0
+    with open(path, "w") as f:
+        for i in range(rows):
+            ts += rng.random() * 0.02
+            rec = {
+                "ts": round(ts, 6),
+                "uid": f"D{i:016x}",
+                "id.orig_h": _skewed(rng, clients),
+                "id.orig_p": rng.randint(1024, 65535),
+                "id.resp_h": "10.0.0.53",
+                "id.resp_p": 53,
+                "proto": "udp",
+                "trans_id": rng.randint(0, 65535),
+                "rtt": round(rng.random() / 100, 6),
+                "query": _skewed(rng, names),
+                "qtype_name": rng.choice(["A", "AAAA", "PTR", "TXT"]),
+                "rcode_name": rng.choice(["NOERROR", "NOERROR", "NOERROR", "NXDOMAIN"]),
+                "AA": False,
+                "TC": False,
+                "RD": True,
+                "RA": True,
+                "answers": [f"10.2.{rng.randint(0, 255)}.{rng.randint(1, 254)}"],
+                "rejected": False,
+            }
+            line = json.dumps(rec) + "\n"
+            f.write(line)
+            written += len(line)
+    return written
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The SEER modules are installed flat into /usr/local/bin; import them from the source tree
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Automation" / "SEER"))
@@ -0,0 +1,38 @@
+import threading
+import time
+
+import seer_backlog
+
+
+def slow_rewrite(action, src, dst, snaplen):
+    with open(dst, "wb") as f:
+        f.write(b"partial")
+    time.sleep(60)
+
+
+def test_stop_kills_running_rewrites(tmp_path, monkeypatch):
+    for i in range(2):
+        (tmp_path / f"a{i}.pcap").write_bytes(b"x" * 4096)
+    monkeypatch.setattr(seer_backlog, "rewrite_file", slow_rewrite)
+    manager = seer_backlog.BacklogManager(tmp_path, max_bytes=1024, hard_pct=0, policy="compress")
+    stop = threading.Event()
+    threading.Timer(0.5, stop.set).start()
+    t0 = time.monotonic()
+    assert manager.enforce(stop) == []
+    assert time.monotonic() - t0 < 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a0.pcap", "a1.pcap"]
+
+
+def test_stop_abandons_merge(tmp_path):
+    stop = threading.Event()
+    stop.set()
+    srcs = []
+    for i in range(2):
+        srcs.append(tmp_path / f"a{i}.pcap")
+        srcs[-1].write_bytes(bytes.fromhex("d4c3b2a1020004000000000000000000ffff000001000000"))
+    try:
+        seer_backlog.merge_pcaps(srcs, tmp_path / "out.pcap", stop)
+    except InterruptedError:
+        pass
+    else:
+        raise AssertionError("merge_pcaps ignored stop")
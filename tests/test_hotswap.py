@@ -0,0 +1,90 @@
+import os
+import time
+
+import seer_backlog
+import seer_drives
+import seer_hotswap
+
+
+def make_export(tmp_path, names):
+    backlog, drive = tmp_path / "backlog", tmp_path / "drive"
+    backlog.mkdir()
+    drive.mkdir()
+    for i, name in enumerate(names):
+        (backlog / name).write_bytes(os.urandom(4096 + i))
+    target = {"mount": str(drive), "free": 1 << 30, "total": 1 << 30, "st_dev": os.stat(drive).st_dev}
+    selector = seer_drives.DriveSelector([target], 0, stats_path=str(tmp_path / "drives.state"))
+    indexes = {str(drive): seer_hotswap.DriveIndex(str(drive))}
+    jobs = [(str(backlog / name), "pcap/20250101") for name in names]
+    plan = seer_hotswap.plan_export(jobs, selector)
+    return drive, selector, indexes, plan
+
+
+def run_plan(plan, selector, indexes):
+    progress = seer_hotswap.ExportProgress(plan, selector)
+    results = seer_hotswap.stripe_transfers(plan, selector, indexes, progress)
+    return results, seer_hotswap.record_transfers(results, "PCAP", indexes)
+
+
+def test_source_gone_after_planning_fails_only_that_file(tmp_path):
+    drive, selector, indexes, plan = make_export(tmp_path, ["a.pcap", "b.pcap", "c.pcap"])
+    os.unlink(plan[1][0])
+    results, counts = run_plan(plan, selector, indexes)
+    assert [r[3] for r in results] == ["OK", "IO_ERROR", "OK"]
+    assert counts == (2, 1)
+    manifest = (drive / "pcap/20250101/MANIFEST.txt").read_text()
+    assert "a.pcap" in manifest and "c.pcap" in manifest
+    assert "b.pcap" in (drive / "TRANSFER.LOG").read_text()
+
+
+def test_unexpected_transfer_error_fails_only_that_file(tmp_path, monkeypatch):
+    drive, selector, indexes, plan = make_export(tmp_path, ["a.pcap", "b.pcap"])
+    real = seer_hotswap.transfer_file
+
+    def flaky(src, *args, **kwargs):
+        if src.endswith("a.pcap"):
+            raise RuntimeError("boom")
+        return real(src, *args, **kwargs)
+
+    monkeypatch.setattr(seer_hotswap, "transfer_file", flaky)
+    results, counts = run_plan(plan, selector, indexes)
+    assert [r[3] for r in results] == ["IO_ERROR", "OK"]
+    assert counts == (1, 1)
+    assert "b.pcap" in (drive / "pcap/20250101/MANIFEST.txt").read_text()
+
+
+def test_backlog_jobs_skip_leftovers_and_keep_sidecars(tmp_path):
+    backlog = tmp_path / "backlog"
+    backlog.mkdir()
+    names = ["a.pcap", "b.seg.pcap", "b.seg.pcap.idx", "c.pcap.part", "c.pcap.part.progress", ".d.pcap.tmp", ".e.pcap"]
+    for name in names:
+        (backlog / name).write_bytes(b"x")
+    manager = seer_backlog.BacklogManager(backlog)
+    jobs = [os.path.basename(src) for src, _rel_dir in seer_hotswap.backlog_jobs(manager.index, 0)]
+    assert jobs == ["a.pcap", "b.seg.pcap", "b.seg.pcap.idx"]
+    assert not (backlog / ".d.pcap.tmp").exists()
+
+
+def test_backlog_jobs_file_under_capture_day(tmp_path):
+    backlog = tmp_path / "backlog"
+    backlog.mkdir()
+    (backlog / "SEER-20250102-235959.pcap").write_bytes(b"x")
+    (backlog / "other.pcap").write_bytes(b"x")
+    os.utime(backlog / "other.pcap", (1735900000, 1735900000))  # no timestamp in the name: mtime
+    index = seer_backlog.DirIndex(backlog)
+    index.rescan()
+    jobs = {os.path.basename(src): rel_dir for src, rel_dir in seer_hotswap.backlog_jobs(index, 0)}
+    assert jobs["SEER-20250102-235959.pcap"] == "pcap/20250102"
+    assert jobs["other.pcap"] == "pcap/" + time.strftime("%Y%m%d", time.localtime(1735900000))
+
+
+def test_discard_stale_parts_keeps_resumable_and_fresh(tmp_path):
+    day = tmp_path / "pcap" / "20250101"
+    day.mkdir(parents=True)
+    old = time.time() - seer_hotswap.STALE_PART_SECONDS - 60
+    for name in ("gone.pcap.part", "gone.pcap.part.progress", "kept.pcap.part", "fresh.pcap.part"):
+        (day / name).write_bytes(b"x" * 10)
+        if not name.startswith("fresh"):
+            os.utime(day / name, (old, old))
+    assert seer_hotswap.discard_stale_parts(str(tmp_path), {"kept.pcap"}) == (1, 20)
+    assert sorted(p.name for p in day.iterdir()) == ["fresh.pcap.part", "kept.pcap.part"]
@@ -0,0 +1,49 @@
+import threading
+
+import seer_io
+
+
+class FixedCapture:
+    def __init__(self, bps):
+        self.bps = bps
+
+    def sample(self, now=None):
+        return self.bps
+
+
+def test_capture_above_disk_rate_still_paces(monkeypatch):
+    # min_bps 0 (io.min_mbps: 0) and capture above disk_mbps: the rate must stay positive
+    shaper = seer_io.Shaper(10 * seer_io.MB, 0, 0.25, FixedCapture(20 * seer_io.MB))
+    sleeps = []
+    monkeypatch.setattr(seer_io.time, "sleep", sleeps.append)
+    shaper.take(seer_io.MIN_RATE_BPS)
+    assert shaper.rate == seer_io.MIN_RATE_BPS
+    assert sleeps and 0 < sleeps[0] <= 1.0
+
+
+def test_stop_interrupts_throttle():
+    shaper = seer_io.Shaper(10 * seer_io.MB, 0, 0.25, FixedCapture(20 * seer_io.MB))
+    stop = threading.Event()
+    stop.set()
+    shaper.take(seer_io.MB, stop)  # 16 s of debt at the floor rate; returns at once
+    assert shaper.throttled > 1
+
+
+def test_configure_rejects_non_positive_min_mbps(tmp_path):
+    cfg = {"io": {"class": "none", "disk_mbps": 10, "min_mbps": 0}}
+    shaper, desc = seer_io.configure(cfg, str(tmp_path))
+    assert shaper.min_bps == seer_io.DEFAULT_MIN_MBPS * seer_io.MB
+    assert f"min {seer_io.DEFAULT_MIN_MBPS} MB/s" in desc
+
+
+def test_copy_under_capture_overload_succeeds(tmp_path):
+    import hashlib
+
+    import seer_copy
+
+    src = tmp_path / "ring.pcap"
+    src.write_bytes(b"x" * 4096)
+    shaper = seer_io.Shaper(10 * seer_io.MB, 0, 0.25, FixedCapture(20 * seer_io.MB))
+    sha = seer_copy.copy_resumable(str(src), str(tmp_path / "copy.pcap"), shaper=shaper)
+    assert sha == hashlib.sha256(src.read_bytes()).hexdigest()
+    assert shaper.throttled > 0
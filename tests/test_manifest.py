@@ -0,0 +1,36 @@
+import importlib
+import json
+import os
+import sys
+
+import seer_manifest
+
+
+def test_batches_merge_into_one_manifest(tmp_path):
+    (tmp_path / "b.pcap").write_bytes(b"b")
+    seer_manifest.write_manifest(str(tmp_path), [("a.pcap", "aa" * 32)])
+    root = seer_manifest.write_manifest(str(tmp_path), [("b.pcap", "bb" * 32)], {"b.pcap": ["cc" * 32]})
+    lines = [line for line in (tmp_path / "MANIFEST.txt").read_text().splitlines() if line and line[0] != "#"]
+    assert lines == ["aa" * 32 + "  a.pcap", "bb" * 32 + "  b.pcap"]
+    merkle = json.loads((tmp_path / "MERKLE.json").read_text())
+    assert merkle["root"] == root and list(merkle["files"]) == ["b.pcap"]
+
+
+def test_mover_writes_drive_bookkeeping(tmp_path, monkeypatch):
+    ring, drive = tmp_path / "ring", tmp_path / "drive"
+    ring.mkdir()
+    drive.mkdir()
+    config = tmp_path / "seer.yml"
+    config.write_text(f"ring_dir: {ring}\nbuffer_threshold: 1\nmover_log: {tmp_path / 'mover.log'}\n")
+    monkeypatch.setenv("SEER_CONFIG", str(config))
+    sys.modules.pop("move_oldest", None)
+    move_oldest = importlib.import_module("move_oldest")
+    (ring / "SEER-20250101-000000.pcap").write_bytes(os.urandom(8192))
+    dest = drive / "pcap" / "20250101"
+    moved, failed = move_oldest.move_group("export", dest, str(drive), [("SEER-20250101-000000.pcap", 8192)], None)
+    assert len(moved) == 1 and not failed
+    sha = moved[0][3]
+    assert f"{sha}  SEER-20250101-000000.pcap" in (dest / "MANIFEST.txt").read_text()
+    assert "SEER-20250101-000000.pcap" in json.loads((dest / "MERKLE.json").read_text())["files"]
+    entry = json.loads((drive / "TRANSFER.LOG").read_text())
+    assert entry["result"] == "OK" and entry["dst"] == str(dest / "SEER-20250101-000000.pcap")
@@ -0,0 +1,54 @@
+import json
+import re
+
+import pytest
+import seer_metrics
+
+# metricname{labels} value, per the OpenMetrics text format (labels optional)
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\\n]|\\.)*",?)*\})? -?[0-9.eE+-]+$')
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    for d in ("ring", "backlog", "spool"):
+        (tmp_path / d).mkdir()
+    state = tmp_path / "hotswap_state.json"
+    monkeypatch.setattr(seer_metrics, "HOTSWAP_STATE", str(state))
+    cfg = {
+        "ring_dir": str(tmp_path / "ring"),
+        "backlog_dir": str(tmp_path / "backlog"),
+        "json_spool": str(tmp_path / "spool"),
+        "interface": "seer-test0",
+    }
+    return seer_metrics.Collector(cfg), state
+
+
+def exposition_lines(text):
+    lines = text.splitlines()
+    assert lines[-1] == "# EOF"
+    for line in lines[:-1]:
+        if not line.startswith("#"):
+            assert SAMPLE.match(line), f"invalid OpenMetrics sample: {line!r}"
+    return lines
+
+
+def test_render_while_export_copying(collector):
+    col, state = collector
+    export = {
+        "state": "copying",
+        "write_bps": {"/mnt/a": 31457280, '/media/odd "name"': 1},
+        "copy_bps": {"/mnt/a": 29360128, '/media/odd "name"': 1048576},
+    }
+    state.write_text(json.dumps({"drives": ["/mnt/a", '/media/odd "name"'], "export": export, "counters": {}}))
+    lines = exposition_lines(col.render())
+    assert 'seer_export_write_bytes_per_second{drive="/mnt/a"} 29360128' in lines
+    assert 'seer_export_write_bytes_per_second{drive="/media/odd \\"name\\""} 1048576' in lines
+    assert "seer_export_in_progress 1" in lines
+
+
+def test_render_after_export_done(collector):
+    col, state = collector
+    state.write_text(json.dumps({"export": {"state": "done", "copy_bps": {"/mnt/a": 0}}, "counters": {}}))
+    lines = exposition_lines(col.render())
+    assert not any(line.startswith("seer_export_write_bytes_per_second") for line in lines)
+    assert "seer_export_in_progress 0" in lines